@@ -0,0 +1,100 @@
+"""
+Rules to decide which price anomalies are sent as alerts.
+An anomaly is sent when it is a new breach, or an escalation of a breach
+(for example from the 3-month to the 12-month minimum). The same breach is
+sent again only after a cooldown. A symbol back within the bounds of every
+period clears its alerts, so its next breach is new.
+"""
+import datetime
+from typing import Optional
+
+from src.alerts.store import AlertStore
+from src.common.types import Alert, Period, PriceAnomaly
+
+# days before the same breach is sent again
+COOLDOWN_DAYS = 7
+
+
+def get_new_anomalies(store: AlertStore, symbols: list[str],
+                      anomalies: list[Optional[PriceAnomaly]],
+                      cooldown_days: Optional[int] = COOLDOWN_DAYS
+                      ) -> list[Optional[PriceAnomaly]]:
+    """
+    Return the anomalies that should be sent, and record them in the store.
+    :param store: Store of the alerts sent before.
+    :param symbols: Symbols of the portfolio.
+    :param anomalies: Price anomaly of each symbol, None if there is none.
+    :param cooldown_days: Days before the same breach is sent again, None
+    never sends it again while the breach lasts.
+    :return: The anomaly of each symbol, None if it should not be sent.
+    """
+    new_anomalies, updated_alerts = get_pending_anomalies(
+        store, symbols, anomalies, cooldown_days)
+    store.replace(updated_alerts)
+    return new_anomalies
+
+
+def get_pending_anomalies(store: AlertStore, symbols: list[str],
+                          anomalies: list[Optional[PriceAnomaly]],
+                          cooldown_days: Optional[int] = COOLDOWN_DAYS
+                          ) -> tuple[list[Optional[PriceAnomaly]],
+                                     dict[str, list[Alert]]]:
+    """
+    Return the anomalies that should be sent, without recording them in the
+    store, so they are recorded only once they are delivered.
+    :param store: Store of the alerts sent before.
+    :param symbols: Symbols of the portfolio.
+    :param anomalies: Price anomaly of each symbol, None if there is none.
+    :param cooldown_days: Days before the same breach is sent again, None
+    never sends it again while the breach lasts.
+    :return: The anomaly of each symbol, None if it should not be sent, and
+    the alerts of the symbols to replace in the store after the delivery.
+    """
+    previous_alerts = store.get_alerts(symbols)
+    new_anomalies: list[Optional[PriceAnomaly]] = []
+    updated_alerts: dict[str, list[Alert]] = {}
+    for symbol, anomaly in zip(symbols, anomalies):
+        previous = previous_alerts.get(symbol, [])
+        if anomaly is None:
+            new_anomalies.append(None)
+            if previous:
+                updated_alerts[symbol] = []  # the breach ended
+            continue
+
+        direction = anomaly.get_direction()
+        # a breach in the other direction ends the previous breaches
+        alerts = [alert for alert in previous if alert.direction == direction]
+        if _should_send(alerts, anomaly, cooldown_days):
+            alerts = [alert for alert in alerts if alert.period != anomaly.period]
+            alerts.append(Alert(symbol, anomaly.period, direction,
+                                anomaly.current_price.date))
+            new_anomalies.append(anomaly)
+        else:
+            new_anomalies.append(None)
+
+        if alerts != previous:
+            updated_alerts[symbol] = alerts
+
+    return new_anomalies, updated_alerts
+
+
+# private functions
+
+
+def _should_send(alerts: list[Alert], anomaly: PriceAnomaly,
+                 cooldown_days: Optional[int]) -> bool:
+    # alerts of the same or a longer period already cover this breach
+    covering = [alert for alert in alerts
+                if _RANKS[alert.period] >= _RANKS[anomaly.period]]
+    if not covering:
+        return True
+
+    if cooldown_days is None:
+        return False
+
+    last_date = max(alert.date for alert in covering)
+    elapsed = anomaly.current_price.date - last_date
+    return elapsed >= datetime.timedelta(days=cooldown_days)
+
+
+_RANKS = {period: rank for rank, period in enumerate(Period)}
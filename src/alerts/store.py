@@ -0,0 +1,113 @@
+"""
+Stores of the last alert sent per symbol, period and direction, so the
+monitor does not send the same alert again on every run.
+"""
+import datetime
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from collections import defaultdict
+
+from src.common.types import Alert, Direction, Period
+
+
+class AlertStore(ABC):
+    """
+    Base class of the alert stores, a backend implements how the alerts are
+    persisted.
+    """
+
+    @abstractmethod
+    def get_alerts(self, symbols: list[str]) -> dict[str, list[Alert]]:
+        """
+        Return the alerts of each symbol, symbols without alerts are missing.
+        """
+
+    @abstractmethod
+    def replace(self, alerts: dict[str, list[Alert]]) -> None:
+        """
+        Replace all the alerts of each given symbol, an empty list removes
+        the alerts of a symbol.
+        """
+
+
+class MemoryAlertStore(AlertStore):
+    """
+    Keeps the alerts in memory, they are lost when the process ends.
+    """
+
+    def __init__(self) -> None:
+        self.alerts: dict[str, list[Alert]] = {}
+
+    def get_alerts(self, symbols: list[str]) -> dict[str, list[Alert]]:
+        return {symbol: list(self.alerts[symbol])
+                for symbol in symbols if symbol in self.alerts}
+
+    def replace(self, alerts: dict[str, list[Alert]]) -> None:
+        for symbol, symbol_alerts in alerts.items():
+            if symbol_alerts:
+                self.alerts[symbol] = list(symbol_alerts)
+            else:
+                self.alerts.pop(symbol, None)
+
+
+class SQLiteAlertStore(AlertStore):
+    """
+    Keeps the alerts in a local SQLite database.
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        :param path: File of the database, it is created if it does not exist.
+        """
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self.connection:
+            self.connection.execute(
+                'CREATE TABLE IF NOT EXISTS alerts ('
+                'symbol TEXT NOT NULL, period TEXT NOT NULL, '
+                'direction TEXT NOT NULL, date TEXT NOT NULL, '
+                'PRIMARY KEY (symbol, period, direction))'
+            )
+
+    def get_alerts(self, symbols: list[str]) -> dict[str, list[Alert]]:
+        alerts = defaultdict(list)
+        with self._lock:
+            # one query per batch keeps the number of variables under the limit
+            for batch in _get_batches(symbols, size=500):
+                placeholders = ', '.join('?' * len(batch))
+                rows = self.connection.execute(
+                    f'SELECT symbol, period, direction, date FROM alerts '
+                    f'WHERE symbol IN ({placeholders})', batch)
+                for symbol, period, direction, date in rows:
+                    alerts[symbol].append(Alert(
+                        symbol, Period(period), Direction(direction),
+                        datetime.date.fromisoformat(date)))
+
+        return dict(alerts)
+
+    def replace(self, alerts: dict[str, list[Alert]]) -> None:
+        if not alerts:
+            return
+
+        rows = [(alert.symbol, alert.period.value, alert.direction.value,
+                 alert.date.isoformat())
+                for symbol_alerts in alerts.values() for alert in symbol_alerts]
+        # a single transaction for all the symbols
+        with self._lock, self.connection:
+            self.connection.executemany(
+                'DELETE FROM alerts WHERE symbol = ?',
+                [(symbol,) for symbol in alerts])
+            self.connection.executemany(
+                'INSERT INTO alerts (symbol, period, direction, date) '
+                'VALUES (?, ?, ?, ?)', rows)
+
+    def close(self) -> None:
+        self.connection.close()
+
+
+# private functions
+
+
+def _get_batches(values: list[str], size: int) -> list[list[str]]:
+    return [values[start:start + size] for start in range(0, len(values), size)]
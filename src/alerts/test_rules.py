@@ -0,0 +1,109 @@
+import datetime
+import unittest
+
+from src.alerts import rules
+from src.alerts.store import MemoryAlertStore
+from src.common.types import ClosePrice, Period, PriceAnomaly
+
+
+class RulesTests(unittest.TestCase):
+
+    def setUp(self):
+        self.store = MemoryAlertStore()
+        self.symbols = ['AMZN']
+
+    def test_get_new_anomalies_given_new_breach_return_the_anomaly(self):
+        # arrange
+        anomaly = self._get_min_anomaly(Period.QUARTER, '2022-08-01')
+        # act
+        anomalies = rules.get_new_anomalies(self.store, self.symbols, [anomaly])
+        # assert
+        self.assertEqual(anomalies, [anomaly])
+
+    def test_get_new_anomalies_given_same_breach_next_day_return_none(self):
+        # arrange
+        rules.get_new_anomalies(
+            self.store, self.symbols,
+            [self._get_min_anomaly(Period.YEAR, '2022-08-01')])
+        anomaly = self._get_min_anomaly(Period.YEAR, '2022-08-02')
+        # act
+        anomalies = rules.get_new_anomalies(self.store, self.symbols, [anomaly])
+        # assert
+        self.assertEqual(anomalies, [None])
+
+    def test_get_new_anomalies_given_escalated_breach_return_the_anomaly(self):
+        # arrange
+        rules.get_new_anomalies(
+            self.store, self.symbols,
+            [self._get_min_anomaly(Period.QUARTER, '2022-08-01')])
+        year_anomaly = self._get_min_anomaly(Period.YEAR, '2022-08-02')
+        month_anomaly = self._get_min_anomaly(Period.MONTH, '2022-08-03')
+        # act
+        anomalies = [
+            rules.get_new_anomalies(self.store, self.symbols, [anomaly])[0]
+            for anomaly in [year_anomaly, month_anomaly]
+        ]
+        # assert
+        self.assertEqual(anomalies, [year_anomaly, None])
+
+    def test_get_new_anomalies_given_cooldown_elapsed_return_the_anomaly(self):
+        # arrange
+        rules.get_new_anomalies(
+            self.store, self.symbols,
+            [self._get_min_anomaly(Period.YEAR, '2022-08-01')])
+        anomaly = self._get_min_anomaly(Period.YEAR, '2022-08-08')
+        # act
+        anomalies = rules.get_new_anomalies(self.store, self.symbols,
+                                            [anomaly], cooldown_days=7)
+        # assert
+        self.assertEqual(anomalies, [anomaly])
+
+    def test_get_new_anomalies_given_breach_ended_alert_next_breach(self):
+        # arrange
+        rules.get_new_anomalies(
+            self.store, self.symbols,
+            [self._get_min_anomaly(Period.YEAR, '2022-08-01')])
+        rules.get_new_anomalies(self.store, self.symbols, [None])
+        anomaly = self._get_min_anomaly(Period.YEAR, '2022-08-03')
+        # act
+        anomalies = rules.get_new_anomalies(self.store, self.symbols, [anomaly])
+        # assert
+        self.assertEqual(anomalies, [anomaly])
+        self.assertEqual(len(self.store.get_alerts(self.symbols)['AMZN']), 1)
+
+    def test_get_new_anomalies_given_other_direction_return_the_anomaly(self):
+        # arrange
+        rules.get_new_anomalies(
+            self.store, self.symbols,
+            [self._get_min_anomaly(Period.YEAR, '2022-08-01')])
+        anomaly = PriceAnomaly(
+            Period.MONTH,
+            min_price=ClosePrice('2022-07-01', 90.0),
+            current_price=ClosePrice('2022-08-02', 120.0),
+            max_price=ClosePrice('2022-08-02', 120.0),
+        )
+        # act
+        anomalies = rules.get_new_anomalies(self.store, self.symbols, [anomaly])
+        # assert
+        self.assertEqual(anomalies, [anomaly])
+        self.assertEqual(len(self.store.get_alerts(self.symbols)['AMZN']), 1)
+
+    def test_get_pending_anomalies_given_new_breach_store_not_updated(self):
+        # arrange
+        anomaly = self._get_min_anomaly(Period.YEAR, '2022-08-01')
+        # act
+        anomalies, alerts = rules.get_pending_anomalies(
+            self.store, self.symbols, [anomaly])
+        # assert
+        self.assertEqual(anomalies, [anomaly])
+        self.assertEqual(list(alerts), ['AMZN'])
+        self.assertEqual(self.store.get_alerts(self.symbols), {})
+
+    @staticmethod
+    def _get_min_anomaly(period: Period, date: str) -> PriceAnomaly:
+        return PriceAnomaly(
+            period,
+            min_price=ClosePrice(date, 90.0),
+            current_price=ClosePrice(date, 90.0),
+            max_price=ClosePrice('2022-07-01', 120.0),
+        )
@@ -0,0 +1,67 @@
+import datetime
+import tempfile
+import unittest
+from pathlib import Path
+
+from src.alerts.store import AlertStore, MemoryAlertStore, SQLiteAlertStore
+from src.common.types import Alert, Direction, Period
+
+
+class AlertStoreTests(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.stores = [
+            MemoryAlertStore(),
+            SQLiteAlertStore(str(Path(self.directory.name) / 'alerts.db')),
+        ]
+        self.alert = Alert('AMZN', Period.YEAR, Direction.MIN,
+                           datetime.date(2022, 8, 1))
+
+    def tearDown(self):
+        self.stores[1].close()
+        self.directory.cleanup()
+
+    def test_init_given_base_store_raise_type_error(self):
+        # act and assert
+        with self.assertRaises(TypeError):
+            AlertStore()  # type: ignore[abstract]
+
+    def test_get_alerts_given_no_alerts_return_empty_alerts(self):
+        for store in self.stores:
+            # act
+            alerts = store.get_alerts(['AMZN'])
+            # assert
+            self.assertEqual(alerts, {})
+
+    def test_replace_given_new_alerts_get_the_same_alerts(self):
+        # arrange
+        other_alert = Alert('AMZN', Period.MONTH, Direction.MIN,
+                            datetime.date(2022, 7, 1))
+        for store in self.stores:
+            # act
+            store.replace({'AMZN': [self.alert, other_alert]})
+            # assert
+            alerts = store.get_alerts(['AMZN', 'MSFT'])
+            self.assertCountEqual(alerts['AMZN'], [self.alert, other_alert])
+            self.assertNotIn('MSFT', alerts)
+
+    def test_replace_given_empty_alerts_remove_the_alerts_of_the_symbol(self):
+        for store in self.stores:
+            # arrange
+            store.replace({'AMZN': [self.alert]})
+            # act
+            store.replace({'AMZN': []})
+            # assert
+            self.assertEqual(store.get_alerts(['AMZN']), {})
+
+    def test_get_alerts_given_saved_database_read_the_alerts_again(self):
+        # arrange
+        path = str(Path(self.directory.name) / 'saved.db')
+        store = SQLiteAlertStore(path)
+        store.replace({'AMZN': [self.alert]})
+        store.close()
+        # act
+        alerts = SQLiteAlertStore(path).get_alerts(['AMZN'])
+        # assert
+        self.assertEqual(alerts, {'AMZN': [self.alert]})
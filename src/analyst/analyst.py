@@ -1,10 +1,15 @@
 import math
-from typing import Optional
+from typing import Optional, Sequence
 
+import numpy as np
 from pandas import DataFrame
 
+from src.analyst import indicators, kernel, range_index
+from src.analyst.kernel import WindowStats
 from src.common.constants import DECIMAL_PLACES
+from src.common.periods import TRADING_DAYS
 from src.common.types import (
+    Indicator,
     Period,
     AnnualStats,
     ClosePrice,
@@ -16,62 +21,139 @@ from src.common.types import (
 )
 
 
-def get_return_stats(prices: DataFrame) -> AnnualStats:
+def get_window_stats(prices: DataFrame) -> WindowStats:
+    """
+    Compute the statistics of every period in a single pass over the prices.
+    The result can be given to the other functions of this module to avoid
+    computing the statistics again. The range index of the prices is used
+    when it was built, see range_index.get_index.
+    :param prices: Dataframe containing historical price information.
+    :return: A WindowStats object, the position i belongs to list(Period)[i].
+    """
+    return kernel.compute(
+        prices.Close.to_numpy(dtype=float),
+        prices.change.to_numpy(dtype=float),
+        prices.log_return.to_numpy(dtype=float),
+        _WINDOWS,
+        index=range_index.find_index(prices),
+    )
+
+
+def get_windows() -> np.ndarray:
+    """
+    Return the trading days of every period, in the order of the Period enum.
+    """
+    return _WINDOWS
+
+
+def get_position(period: Period) -> int:
+    """
+    Return the position of a period in the arrays of WindowStats.
+    """
+    return _POSITIONS[period]
+
+
+def get_return_stats(prices: DataFrame,
+                     stats: Optional[WindowStats] = None) -> AnnualStats:
+    stats = _get_or_compute(prices, stats)
     return AnnualStats(
-        month=_get_return_in_period(prices, Period.MONTH),
-        quarter=_get_return_in_period(prices, Period.QUARTER),
-        half=_get_return_in_period(prices, Period.HALF),
-        year=_get_return_in_period(prices, Period.YEAR),
+        month=_get_return_in_period(prices, stats, Period.MONTH),
+        quarter=_get_return_in_period(prices, stats, Period.QUARTER),
+        half=_get_return_in_period(prices, stats, Period.HALF),
+        year=_get_return_in_period(prices, stats, Period.YEAR),
     )
 
 
 def get_current_price(prices: DataFrame) -> ClosePrice:
-    today_row = prices.iloc[0]
-    return ClosePrice(today_row.Date, today_row.Close)
+    return ClosePrice(prices.Date.iloc[0], prices.Close.iloc[0])
 
 
-def get_price_stats(prices: DataFrame) -> AnnualPriceStats:
+def get_price_stats(prices: DataFrame,
+                    stats: Optional[WindowStats] = None) -> AnnualPriceStats:
+    stats = _get_or_compute(prices, stats)
     return AnnualPriceStats(
-        month=_get_price_stats_in_period(prices, Period.MONTH),
-        quarter=_get_price_stats_in_period(prices, Period.QUARTER),
-        half=_get_price_stats_in_period(prices, Period.HALF),
-        year=_get_price_stats_in_period(prices, Period.YEAR),
+        month=_get_price_stats_in_period(prices, stats, Period.MONTH),
+        quarter=_get_price_stats_in_period(prices, stats, Period.QUARTER),
+        half=_get_price_stats_in_period(prices, stats, Period.HALF),
+        year=_get_price_stats_in_period(prices, stats, Period.YEAR),
     )
 
 
-def get_volatility_stats(prices: DataFrame) -> AnnualStats:
+def get_volatility_stats(prices: DataFrame,
+                         stats: Optional[WindowStats] = None) -> AnnualStats:
+    stats = _get_or_compute(prices, stats)
     return AnnualStats(
-        month=_get_volatility_in_period(prices, Period.MONTH),
-        quarter=_get_volatility_in_period(prices, Period.QUARTER),
-        half=_get_volatility_in_period(prices, Period.HALF),
-        year=_get_volatility_in_period(prices, Period.YEAR),
+        month=_get_volatility_in_period(stats, Period.MONTH),
+        quarter=_get_volatility_in_period(stats, Period.QUARTER),
+        half=_get_volatility_in_period(stats, Period.HALF),
+        year=_get_volatility_in_period(stats, Period.YEAR),
     )
 
 
-def get_price_anomaly(prices: DataFrame) -> Optional[PriceAnomaly]:
+def get_price_difference(a_price: ClosePrice,
+                         other_price: ClosePrice) -> float:
+    """
+    Return the change from the oldest to the most recent of the two prices.
+    """
+    if a_price.date <= other_price.date:
+        initial, final = a_price, other_price
+    else:
+        initial, final = other_price, a_price
+
+    return final.value / initial.value - 1
+
+
+def get_volatility(daily_std: np.ndarray, period: Period) -> np.ndarray:
+    """
+    Return volatility defined as sigma(p) = daily sigma * sqrt(p),
+    where p = trading days in the given period.
+    See: https://en.wikipedia.org/wiki/Volatility_(finance)#Mathematical_definition
+    :param daily_std: Standard deviation of the daily logarithmic returns, of
+    one symbol or many symbols.
+    """
+    volatility = daily_std * math.sqrt(TRADING_DAYS[period])
+    return np.round(volatility, DECIMAL_PLACES)
+
+
+def get_price_anomaly(prices: DataFrame,
+                      stats: Optional[WindowStats] = None,
+                      triggers: Sequence[Indicator] = ()
+                      ) -> Optional[PriceAnomaly]:
+    """
+    Return the anomaly of the longest period whose bounds contain the
+    current price, or None if there is none.
+    :param triggers: Indicators checked when the price is within the
+    bounds of every period, see indicators.get_anomaly.
+    """
+    stats = _get_or_compute(prices, stats)
     current_price = get_current_price(prices)
     for period in reversed(Period):  # from year to month
         if period in [Period.THREE_WEEKS, Period.TWO_WEEKS, Period.WEEK]:
             continue
-        min_price = _get_min_price(prices, period)
-        max_price = _get_max_price(prices, period)
+        min_price = _get_min_price(prices, stats, period)
+        max_price = _get_max_price(prices, stats, period)
         if _is_out_of_bounds(min_price, current_price, max_price):
             return PriceAnomaly(period, min_price, current_price, max_price)
 
+    if triggers:
+        return indicators.get_anomaly(
+            current_price, indicators.get_indicators(prices), triggers)
     return None
 
 
-def get_symbol_report(symbol: str, prices: DataFrame) -> SymbolReport:
+def get_symbol_report(symbol: str, prices: DataFrame,
+                      stats: Optional[WindowStats] = None) -> SymbolReport:
+    stats = _get_or_compute(prices, stats)
     return SymbolReport(
         symbol=symbol,
         current_price=get_current_price(prices).value,
-        week=_get_report_in_period(prices, Period.WEEK),
-        two_weeks=_get_report_in_period(prices, Period.TWO_WEEKS),
-        three_weeks=_get_report_in_period(prices, Period.THREE_WEEKS),
-        month=_get_report_in_period(prices, Period.MONTH),
-        quarter=_get_report_in_period(prices, Period.QUARTER),
-        half=_get_report_in_period(prices, Period.HALF),
-        year=_get_report_in_period(prices, Period.YEAR),
+        week=_get_report_in_period(prices, stats, Period.WEEK),
+        two_weeks=_get_report_in_period(prices, stats, Period.TWO_WEEKS),
+        three_weeks=_get_report_in_period(prices, stats, Period.THREE_WEEKS),
+        month=_get_report_in_period(prices, stats, Period.MONTH),
+        quarter=_get_report_in_period(prices, stats, Period.QUARTER),
+        half=_get_report_in_period(prices, stats, Period.HALF),
+        year=_get_report_in_period(prices, stats, Period.YEAR),
     )
 
 
@@ -80,87 +162,63 @@ def get_symbol_report(symbol: str, prices: DataFrame) -> SymbolReport:
 # -----------------------------------------------------------------------------
 
 
-def _get_return_in_period(prices: DataFrame, period: Period) -> float:
-    today_price = get_current_price(prices)
-    first_row_in_period = min(len(prices), _get_trading_days(period))
-    initial_row = prices.iloc[first_row_in_period - 1]
-    initial_price = ClosePrice(initial_row.Date, initial_row.Close)
-    return _get_price_difference(today_price, initial_price)
+def _get_or_compute(prices: DataFrame,
+                    stats: Optional[WindowStats]) -> WindowStats:
+    return get_window_stats(prices) if stats is None else stats
 
 
-def _get_price_stats_in_period(prices: DataFrame, period: Period) -> PriceStats:
+def _get_return_in_period(prices: DataFrame, stats: WindowStats,
+                          period: Period) -> float:
+    today_price = prices.Close.iloc[0]
+    initial_row = stats.initial_row[_POSITIONS[period]]
+    return today_price / prices.Close.iloc[initial_row] - 1
+
+
+def _get_price_stats_in_period(prices: DataFrame, stats: WindowStats,
+                               period: Period) -> PriceStats:
     """
     Return price statistics in a given time period.
     :param prices: Dataframe containing historical price information.
+    :param stats: Statistics of every period computed from the prices.
     :param period: Period to get the statistics from the prices dataframe.
     :return: A PriceStats object containing the required information.
     """
-    min_price = _get_min_price(prices, period)
-    max_price = _get_max_price(prices, period)
+    min_price = _get_min_price(prices, stats, period)
+    max_price = _get_max_price(prices, stats, period)
 
-    difference = _get_price_difference(min_price, max_price)
+    difference = get_price_difference(min_price, max_price)
 
-    trading_days = _get_trading_days(period)
-    max_negative_change = prices.change[:trading_days].min()
-    max_positive_change = prices.change[:trading_days].max()
+    position = _POSITIONS[period]
+    max_negative_change = float(stats.max_negative_change[position])
+    max_positive_change = float(stats.max_positive_change[position])
 
     return PriceStats(min_price, max_price, difference,
                       max_negative_change, max_positive_change)
 
 
-def _get_price_difference(a_price: ClosePrice,
-                          other_price: ClosePrice) -> float:
-    if a_price.date <= other_price.date:
-        initial, final = a_price, other_price
-    else:
-        initial, final = other_price, a_price
+def _get_min_price(prices: DataFrame, stats: WindowStats,
+                   period: Period) -> ClosePrice:
+    return _get_close_price(prices, int(stats.min_row[_POSITIONS[period]]))
 
-    return final.value / initial.value - 1
 
+def _get_max_price(prices: DataFrame, stats: WindowStats,
+                   period: Period) -> ClosePrice:
+    return _get_close_price(prices, int(stats.max_row[_POSITIONS[period]]))
 
-def _get_min_price(prices: DataFrame, period: Period) -> ClosePrice:
-    trading_days = _get_trading_days(period)
-    row_id = prices.Close[:trading_days].idxmin()
-    row = prices.iloc[row_id]
-    return ClosePrice(row.Date, row.Close)
 
+def _get_close_price(prices: DataFrame, row: int) -> ClosePrice:
+    return ClosePrice(prices.Date.iloc[row], prices.Close.iloc[row])
 
-def _get_max_price(prices: DataFrame, period: Period) -> ClosePrice:
-    trading_days = _get_trading_days(period)
-    row_id = prices.Close[:trading_days].idxmax()
-    row = prices.iloc[row_id]
-    return ClosePrice(row.Date, row.Close)
 
+def _get_volatility_in_period(stats: WindowStats, period: Period) -> float:
+    # daily logarithmic return std was computed by the kernel
+    daily_std = stats.log_return_std[_POSITIONS[period]]
+    return float(get_volatility(daily_std, period))
 
-def _get_volatility_in_period(prices: DataFrame, period: Period) -> float:
-    """
-    Return volatility defined as sigma(p) = daily sigma * sqrt(p),
-    where p = trading days in the given period.
-    See: https://en.wikipedia.org/wiki/Volatility_(finance)#Mathematical_definition
-    """
-    # calculate daily logarithmic return
-    trading_days = _get_trading_days(period)
-    daily_std = prices.log_return[:trading_days].std()
-    volatility = daily_std * math.sqrt(trading_days)
-    return round(volatility, DECIMAL_PLACES)
-
-
-def _get_trading_days(period: Period) -> int:
-    if period == Period.WEEK:
-        return 6
-    elif period == Period.TWO_WEEKS:
-        return 11
-    elif period == Period.THREE_WEEKS:
-        return 16
-    elif period == Period.MONTH:
-        return 22
-    elif period == Period.QUARTER:
-        return 63
-    elif period == Period.HALF:
-        return 126
-    else:
-        # Return year by default
-        return 252
+
+# the kernel computes one window per period, in the order of the enum
+_POSITIONS = {period: position for position, period in enumerate(Period)}
+_WINDOWS = np.array([TRADING_DAYS[period] for period in Period])
 
 
 def _is_out_of_bounds(min_price: ClosePrice,
@@ -170,10 +228,11 @@ def _is_out_of_bounds(min_price: ClosePrice,
            or current_price.value >= max_price.value
 
 
-def _get_report_in_period(prices: DataFrame, period: Period) -> ReportInPeriod:
+def _get_report_in_period(prices: DataFrame, stats: WindowStats,
+                          period: Period) -> ReportInPeriod:
     return ReportInPeriod(
         period=period,
-        min_price=_get_min_price(prices, period),
-        max_price=_get_max_price(prices, period),
-        change_in_period=_get_return_in_period(prices, period)
+        min_price=_get_min_price(prices, stats, period),
+        max_price=_get_max_price(prices, stats, period),
+        change_in_period=_get_return_in_period(prices, stats, period)
     )
@@ -0,0 +1,99 @@
+"""
+Price bounds of the anomaly periods, precomputed once per session.
+The window of a period ends with the current session, so the bounds of a
+live price are the minimum and maximum closes of the previous sessions of
+the window. A tick of many symbols is checked against the bounds with
+vectorized operations, the anomalies are the same ones that
+analyst.get_price_anomaly returns for the prices with the live price as the
+close of the current session.
+"""
+import datetime
+from typing import NamedTuple
+
+import numpy as np
+
+from src.analyst import analyst, kernel
+from src.analyst.portfolio import ANOMALY_PERIODS, PortfolioPrices
+from src.common.types import ClosePrice, PriceAnomaly
+
+
+class PeriodBounds(NamedTuple):
+    """
+    Bounds per anomaly period (rows, from year to month) and symbol
+    (columns). The dates are ordinals, see types.get_ordinals.
+    """
+    symbols: list[str]
+    min_close: np.ndarray
+    min_date: np.ndarray
+    max_close: np.ndarray
+    max_date: np.ndarray
+
+
+def compute(prices: PortfolioPrices) -> PeriodBounds:
+    """
+    Compute the bounds of every anomaly period.
+    :param prices: Prices of the sessions before the current session.
+    """
+    # the current session is part of every window
+    windows = np.array([analyst.get_windows()[analyst.get_position(period)]
+                        for period in ANOMALY_PERIODS]) - 1
+    stats = kernel.compute(prices.close, prices.change, prices.log_return,
+                           windows, prices.lengths)
+
+    columns = np.arange(len(prices.symbols))
+    return PeriodBounds(
+        symbols=prices.symbols,
+        min_close=prices.close[stats.min_row, columns],
+        min_date=prices.dates[stats.min_row, columns],
+        max_close=prices.close[stats.max_row, columns],
+        max_date=prices.dates[stats.max_row, columns],
+    )
+
+
+def get_breaches(bounds: PeriodBounds, prices: np.ndarray) -> np.ndarray:
+    """
+    Return the position in ANOMALY_PERIODS of the first period (from year to
+    month) whose bounds are breached by the price of each symbol, or -1.
+    :param prices: Price of each symbol, NaN prices do not breach.
+    """
+    with np.errstate(invalid='ignore'):
+        out_of_bounds = ((prices <= bounds.min_close)
+                         | (prices >= bounds.max_close))
+    return np.where(out_of_bounds.any(axis=0),
+                    out_of_bounds.argmax(axis=0), -1)
+
+
+def get_price_anomalies(bounds: PeriodBounds, prices: np.ndarray,
+                        today: datetime.date) -> dict[str, PriceAnomaly]:
+    """
+    Return the price anomaly of each symbol whose price breaches a bound.
+    :param prices: Price of each symbol.
+    :param today: Date of the prices.
+    """
+    breaches = get_breaches(bounds, prices)
+    anomalies = {}
+    for column in np.flatnonzero(breaches >= 0).tolist():
+        position = int(breaches[column])
+        current_price = ClosePrice(today, float(prices[column]))
+        min_price = _get_close_price(bounds.min_close, bounds.min_date,
+                                     position, column)
+        max_price = _get_close_price(bounds.max_close, bounds.max_date,
+                                     position, column)
+        # ties are resolved with the most recent session, like the analyst
+        if current_price.value <= min_price.value:
+            min_price = current_price
+        if current_price.value >= max_price.value:
+            max_price = current_price
+        anomalies[bounds.symbols[column]] = PriceAnomaly(
+            ANOMALY_PERIODS[position], min_price, current_price, max_price)
+
+    return anomalies
+
+
+# private functions
+
+
+def _get_close_price(close: np.ndarray, dates: np.ndarray, position: int,
+                     column: int) -> ClosePrice:
+    return ClosePrice.from_ordinal(int(dates[position, column]),
+                                   float(close[position, column]))
@@ -0,0 +1,136 @@
+"""
+Correlation and covariance of the daily returns of a portfolio.
+The logarithmic returns of every symbol are aligned by date, a symbol that
+did not trade on a date (a holiday of its market) has NaN on that date. Like
+pandas DataFrame.cov and corr, each pair of symbols uses the dates where both
+have a return: the sums of every pair are matrix products of the returns and
+of the masks of the valid returns.
+The windows of the periods are prefixes of the rows, so the rows are
+multiplied once, in blocks between the ends of the windows, and the sums of
+each window are the running sums of the blocks.
+"""
+from typing import NamedTuple, Optional, Sequence
+
+import numpy as np
+
+from src.analyst import analyst
+from src.analyst.portfolio import PortfolioPrices
+from src.common.types import ANNUAL_PERIODS, Period
+
+
+class PeriodCorrelation(NamedTuple):
+    """
+    Matrices of the daily returns of a period, with a row and a column per
+    symbol, and the volatility of the portfolio in the period.
+    """
+    period: Period
+    covariance: np.ndarray
+    correlation: np.ndarray
+    volatility: float
+
+
+def align_returns(prices: PortfolioPrices) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Return the dates of all the symbols in descending order, and the
+    logarithmic returns with a row per date and a column per symbol.
+    """
+    is_valid = prices.dates > 0
+    dates = np.unique(prices.dates[is_valid])[::-1]
+    # the rows of the dates in descending order
+    rows = len(dates) - 1 - np.asarray(np.searchsorted(dates[::-1],
+                                                       prices.dates))
+    columns = np.broadcast_to(np.arange(len(prices.symbols)),
+                              prices.dates.shape)
+    returns = np.full((len(dates), len(prices.symbols)), np.nan)
+    returns[rows[is_valid], columns[is_valid]] = prices.log_return[is_valid]
+    return dates, returns
+
+
+def compute(prices: PortfolioPrices,
+            periods: Sequence[Period] = ANNUAL_PERIODS,
+            weights: Optional[np.ndarray] = None) -> list[PeriodCorrelation]:
+    """
+    Compute the covariance and correlation matrices of the daily
+    logarithmic returns, and the volatility of the portfolio, of each period.
+    :param prices: Prices of the portfolio, see portfolio.align.
+    :param periods: Periods to compute, the window of each period is its
+    number of trading days in the most recent dates.
+    :param weights: Weight of each symbol in the portfolio, defaults to the
+    same weight for every symbol.
+    """
+    _, returns = align_returns(prices)
+    symbols_count = len(prices.symbols)
+    if weights is None:
+        weights = np.full(symbols_count, 1 / max(symbols_count, 1))
+
+    windows = [int(analyst.get_windows()[analyst.get_position(period)])
+               for period in periods]
+    is_valid = ~np.isnan(returns)
+    values = np.where(is_valid, returns, 0.0)
+    mask = is_valid * 1.0
+    # for each period p and pair (i, j), over the dates where both i and j
+    # have a return: the sum of the returns of i, the sum of their squares,
+    # and the number of dates
+    sums, squares, counts = np.split(
+        _get_window_sums(np.hstack((values, values * values, mask)), mask,
+                         windows), 3, axis=1)
+    products = _get_window_sums(values, values, windows)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        means = sums / counts
+        covariance = (products - sums * means.transpose(0, 2, 1)) \
+            / (counts - 1)
+        variance = (squares - sums * means) / (counts - 1)
+        correlation = covariance \
+            / np.sqrt(variance * variance.transpose(0, 2, 1))
+    covariance[counts < 2] = np.nan
+    correlation[counts < 2] = np.nan
+    np.clip(correlation, -1.0, 1.0, out=correlation)
+    # the correlation of a symbol with itself is exactly 1
+    diagonal = np.arange(symbols_count)
+    correlation[:, diagonal, diagonal] = np.where(
+        np.isnan(correlation[:, diagonal, diagonal]), np.nan, 1.0)
+
+    correlations = []
+    for position, period in enumerate(periods):
+        portfolio_variance = weights @ covariance[position] @ weights
+        daily_std = np.sqrt(max(portfolio_variance, 0.0))
+        correlations.append(PeriodCorrelation(
+            period, covariance[position], correlation[position],
+            float(analyst.get_volatility(daily_std, period))))
+
+    return correlations
+
+
+def get_most_correlated(correlation: np.ndarray,
+                        count: int) -> list[tuple[int, int]]:
+    """
+    Return the columns of the pairs of different symbols with the highest
+    correlation, from the highest to the lowest.
+    """
+    first, second = np.triu_indices(len(correlation), k=1)
+    values = correlation[first, second]
+    order = np.argsort(-np.nan_to_num(values, nan=-np.inf), kind='stable')
+    order = order[:count]
+    return [(int(first[pair]), int(second[pair])) for pair in order
+            if not np.isnan(values[pair])]
+
+
+# private functions
+
+
+def _get_window_sums(left: np.ndarray, right: np.ndarray,
+                     windows: list[int]) -> np.ndarray:
+    """
+    Return the product left.T @ right over the first rows of each window,
+    with shape (windows, left columns, right columns).
+    """
+    ends = [min(window, len(left)) for window in windows]
+    window_sums = {}
+    total = np.zeros((left.shape[1], right.shape[1]))
+    start = 0
+    for end in sorted(set(ends)):
+        total = total + left[start:end].T @ right[start:end]
+        window_sums[end] = total
+        start = end
+    return np.stack([window_sums[end] for end in ends])
@@ -0,0 +1,306 @@
+"""
+Streaming detection of price anomalies.
+Each symbol keeps the rolling minimum and maximum close of every anomaly
+period in monotonic deques, so a new close is processed in O(1) amortized
+time instead of scanning the whole history again. The detector returns the
+same PriceAnomaly as analyst.get_price_anomaly for the same prices.
+The state of the symbols can be saved as JSON and loaded in the next run,
+a symbol whose state does not match its prices is rebuilt from its history.
+"""
+import json
+import math
+import os
+from collections import deque
+from itertools import takewhile
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+from pandas import DataFrame
+
+from src.analyst import analyst
+from src.analyst.portfolio import ANOMALY_PERIODS
+from src.common.types import ClosePrice, Period, PriceAnomaly, get_ordinals
+
+STATE_VERSION = 1
+
+# index of the session, ordinal date, close
+Entry = tuple[int, int, float]
+
+
+class RollingWindow:
+    """
+    Minimum and maximum close of the last sessions of a period.
+    The deques are ordered by session, the minimum deque has increasing
+    closes and the maximum deque decreasing closes, so the extremes are at
+    the front. Ties keep the most recent session, like the analyst.
+    """
+
+    def __init__(self, size: int) -> None:
+        """
+        :param size: Trading days of the window.
+        """
+        self.size = size
+        self.minimum: deque[Entry] = deque()
+        self.maximum: deque[Entry] = deque()
+
+    def push(self, entry: Entry) -> None:
+        index, _, close = entry
+        while self.minimum and self.minimum[-1][2] >= close:
+            self.minimum.pop()
+        self.minimum.append(entry)
+        while self.maximum and self.maximum[-1][2] <= close:
+            self.maximum.pop()
+        self.maximum.append(entry)
+        self.expire(index - self.size + 1)
+
+    def expire(self, first_index: int) -> None:
+        """
+        Remove the sessions before the given session index.
+        """
+        for entries in (self.minimum, self.maximum):
+            while entries and entries[0][0] < first_index:
+                entries.popleft()
+
+
+class SymbolDetector:
+    """
+    Rolling state of the anomaly periods of a symbol.
+    """
+
+    def __init__(self) -> None:
+        self.windows = {
+            period: RollingWindow(_get_window_size(period))
+            for period in ANOMALY_PERIODS
+        }
+        # sessions kept by the longest window
+        self.size = max(window.size for window in self.windows.values())
+        self.index = -1
+        self.first_index = 0
+        self.dates: deque[int] = deque()  # ordinal date of each session
+        self.last_close = math.nan
+
+    def push(self, ordinal: int, close: float) -> None:
+        """
+        Add the close of a new session.
+        :param ordinal: Date of the session, see types.get_ordinals.
+        :param close: Close price of the session.
+        """
+        self.index += 1
+        self.dates.append(ordinal)
+        self.last_close = close
+        if not math.isnan(close):  # like the analyst, NaN closes are skipped
+            for window in self.windows.values():
+                window.push((self.index, ordinal, close))
+        self._expire(self.index - self.size + 1)
+
+    def expire_before(self, ordinal: int) -> None:
+        """
+        Remove the sessions before the given date, so the windows do not
+        contain sessions older than the history of the symbol.
+        """
+        older = sum(1 for _ in takewhile(lambda date: date < ordinal,
+                                         self.dates))
+        self._expire(self.first_index + older)
+
+    def get_anomaly(self) -> Optional[PriceAnomaly]:
+        """
+        Return the anomaly of the last close, or None if it is within the
+        bounds of every period.
+        """
+        if not self.dates:
+            return None
+
+        current_price = ClosePrice.from_ordinal(self.dates[-1],
+                                                self.last_close)
+        for period in ANOMALY_PERIODS:
+            window = self.windows[period]
+            if not window.minimum:
+                continue
+            min_price = _get_close_price(window.minimum[0])
+            max_price = _get_close_price(window.maximum[0])
+            if (current_price.value <= min_price.value
+                    or current_price.value >= max_price.value):
+                return PriceAnomaly(period, min_price, current_price,
+                                    max_price)
+
+        return None
+
+    def to_json(self) -> dict:
+        return {
+            'index': self.index,
+            'first_index': self.first_index,
+            'dates': list(self.dates),
+            'last_close': _to_json_float(self.last_close),
+            'windows': {
+                str(window.size): {
+                    'min': [list(entry) for entry in window.minimum],
+                    'max': [list(entry) for entry in window.maximum],
+                }
+                for window in self.windows.values()
+            },
+        }
+
+    @classmethod
+    def from_json(cls, content: dict) -> Optional['SymbolDetector']:
+        """
+        Return the detector saved with to_json, or None if it was saved
+        with other windows.
+        """
+        detector = cls()
+        windows = content['windows']
+        if set(windows) != {str(window.size)
+                            for window in detector.windows.values()}:
+            return None
+
+        detector.index = content['index']
+        detector.first_index = content['first_index']
+        detector.dates = deque(content['dates'])
+        detector.last_close = _from_json_float(content['last_close'])
+        for window in detector.windows.values():
+            entries = windows[str(window.size)]
+            window.minimum = deque(_to_entry(entry) for entry in entries['min'])
+            window.maximum = deque(_to_entry(entry) for entry in entries['max'])
+
+        return detector
+
+    # private methods
+
+    def _expire(self, first_index: int) -> None:
+        while self.first_index < first_index and self.dates:
+            self.dates.popleft()
+            self.first_index += 1
+        for window in self.windows.values():
+            window.expire(first_index)
+
+
+class AnomalyDetector:
+    """
+    Detects the price anomalies of many symbols, updating the state of each
+    symbol with the sessions it has not processed yet.
+    """
+
+    def __init__(self, path: Optional[str] = None) -> None:
+        """
+        :param path: Optional JSON file to load and save the state of the
+        symbols between runs.
+        """
+        self.path = Path(path) if path else None
+        self.symbols: dict[str, SymbolDetector] = {}
+        self.updates = 0
+        self.rebuilds = 0
+        if self.path is not None and self.path.exists():
+            self._load(self.path)
+
+    def detect(self, symbol: str, prices: DataFrame) -> Optional[PriceAnomaly]:
+        """
+        Return the price anomaly of the last close of a symbol, like
+        analyst.get_price_anomaly.
+        :param symbol: Symbol of the stock.
+        :param prices: Historical data in descending order.
+        """
+        if prices.empty:
+            return None
+
+        ordinals = get_ordinals(prices.Date)
+        closes = prices.Close.to_numpy(dtype=float)
+        key = symbol.upper()
+        detector = self.symbols.get(key)
+        new_rows = _get_new_rows(detector, ordinals, closes)
+        if detector is None or new_rows is None:
+            detector = SymbolDetector()
+            self.symbols[key] = detector
+            new_rows = len(prices)
+            self.rebuilds += 1
+        else:
+            self.updates += 1
+
+        for row in range(new_rows - 1, -1, -1):  # from old to new sessions
+            detector.push(int(ordinals[row]), float(closes[row]))
+        detector.expire_before(int(ordinals[-1]))
+        return detector.get_anomaly()
+
+    def save(self) -> None:
+        """
+        Save the state of the symbols in the JSON file of the detector.
+        """
+        if self.path is None:
+            return
+
+        content = {
+            'version': STATE_VERSION,
+            'symbols': {symbol: detector.to_json()
+                        for symbol, detector in self.symbols.items()},
+        }
+        # write to a temporary file first, readers never see a partial file
+        temporary_path = self.path.with_suffix('.tmp')
+        temporary_path.write_text(json.dumps(content))
+        os.replace(temporary_path, self.path)
+
+    def summary(self) -> str:
+        return f'detector: {len(self.symbols)} symbols, ' \
+               f'{self.updates} updates, {self.rebuilds} rebuilds'
+
+    # private methods
+
+    def _load(self, path: Path) -> None:
+        content = json.loads(path.read_text())
+        if content.get('version') != STATE_VERSION:
+            return  # every symbol is rebuilt from its history
+
+        for symbol, symbol_content in content['symbols'].items():
+            detector = SymbolDetector.from_json(symbol_content)
+            if detector is not None:
+                self.symbols[symbol] = detector
+
+
+# private functions
+
+
+def _get_new_rows(detector: Optional[SymbolDetector], ordinals: np.ndarray,
+                  closes: np.ndarray) -> Optional[int]:
+    """
+    Return the number of rows after the last session of the detector, or
+    None if the detector does not match the prices: the last session is not
+    in the prices, its close changed (dividends and splits adjust the whole
+    history), or the prices have older sessions that the detector lacks.
+    """
+    if detector is None or not detector.dates:
+        return None
+
+    last_date = detector.dates[-1]
+    # the ordinals are in descending order
+    row = int(np.searchsorted(-ordinals, -last_date))
+    if row == len(ordinals) or ordinals[row] != last_date:
+        return None
+
+    sessions = min(len(ordinals), detector.size) - row
+    if len(detector.dates) < sessions:
+        return None
+
+    close = closes[row]
+    same_close = close == detector.last_close or (
+        math.isnan(close) and math.isnan(detector.last_close))
+    return row if same_close else None
+
+
+def _get_window_size(period: Period) -> int:
+    return int(analyst.get_windows()[analyst.get_position(period)])
+
+
+def _get_close_price(entry: Entry) -> ClosePrice:
+    _, ordinal, close = entry
+    return ClosePrice.from_ordinal(ordinal, close)
+
+
+def _to_entry(values: list) -> Entry:
+    index, ordinal, close = values
+    return int(index), int(ordinal), float(close)
+
+
+def _to_json_float(value: float) -> Optional[float]:
+    return None if math.isnan(value) else value
+
+
+def _from_json_float(value: Optional[float]) -> float:
+    return math.nan if value is None else float(value)
@@ -0,0 +1,324 @@
+"""
+Technical indicators of the close prices: moving average, exponential
+average, Bollinger bands, RSI and drawdown.
+The prices are in descending order (today's row is 0), like in the kernel,
+and the indicators are the values of the last close. The moving averages are
+means of the first rows, the exponential averages are weighted sums of the
+rows, so the indicators of every symbol of a portfolio (rows x symbols) are
+computed with the same column operations.
+The exponential averages are seeded with the oldest value, like pandas ewm
+with adjust=False, and the RSI uses Wilder's smoothing (alpha = 1 / window).
+An IndicatorState updates the indicators of a symbol when a new close
+arrives, without reading the history again.
+"""
+import math
+from typing import NamedTuple, Optional, Sequence
+
+import numpy as np
+from pandas import DataFrame
+
+from src.common.periods import TRADING_DAYS
+from src.common.types import (
+    ClosePrice, Indicator, Period, PriceAnomaly, get_ordinals
+)
+
+# rows of the moving averages and the Bollinger bands
+AVERAGE_WINDOW = TRADING_DAYS[Period.MONTH]
+BOLLINGER_WIDTH = 2.0
+# returns of the RSI, its anomalies are reported as 3-week anomalies
+RSI_WINDOW = 14
+RSI_OVERSOLD = 30.0
+RSI_OVERBOUGHT = 70.0
+DRAWDOWN_WINDOW = TRADING_DAYS[Period.YEAR]
+
+# period of the anomalies of each indicator
+INDICATOR_PERIODS = {
+    Indicator.BOLLINGER: Period.MONTH,
+    Indicator.RSI: Period.THREE_WEEKS,
+}
+
+
+class Indicators(NamedTuple):
+    """
+    Indicators of the last close, of one symbol or of each symbol. An
+    indicator is NaN when the symbol does not have enough rows.
+    """
+    moving_average: np.ndarray
+    exponential_average: np.ndarray
+    lower_band: np.ndarray
+    upper_band: np.ndarray
+    rsi: np.ndarray
+    drawdown: np.ndarray  # from the highest close of the year
+    max_drawdown: np.ndarray  # in the year
+
+
+def compute(close: np.ndarray,
+            lengths: Optional[np.ndarray] = None) -> Indicators:
+    """
+    Compute the indicators of the last close.
+    :param close: Close prices in descending order, 1-D or 2-D (rows x
+    symbols).
+    :param lengths: Number of rows of each symbol for 2-D prices, the rows
+    after the length of a symbol must be NaN. Defaults to all the rows.
+    """
+    if lengths is None:
+        lengths = np.full(close.shape[1:], len(close))
+
+    moving_average, lower_band, upper_band = _get_bands(close)
+    changes: np.ndarray = close[:-1] - close[1:]
+    average_gain = _get_exponential_average(
+        np.fmax(changes, 0), lengths - 1, 1 / RSI_WINDOW, RSI_WINDOW)
+    average_loss = _get_exponential_average(
+        np.fmax(-changes, 0), lengths - 1, 1 / RSI_WINDOW, RSI_WINDOW)
+    drawdown, max_drawdown = _get_drawdowns(close[:DRAWDOWN_WINDOW])
+    return Indicators(
+        moving_average=moving_average,
+        exponential_average=_get_exponential_average(
+            close, lengths, _get_alpha(AVERAGE_WINDOW), AVERAGE_WINDOW),
+        lower_band=lower_band,
+        upper_band=upper_band,
+        rsi=_get_rsi(average_gain, average_loss),
+        drawdown=drawdown,
+        max_drawdown=max_drawdown,
+    )
+
+
+def get_indicators(prices: DataFrame) -> Indicators:
+    """
+    Return the indicators of the last close of a symbol.
+    :param prices: Dataframe containing historical price information.
+    """
+    return compute(prices.Close.to_numpy(dtype=float))
+
+
+def get_anomaly(current_price: ClosePrice, indicators: Indicators,
+                triggers: Sequence[Indicator]) -> Optional[PriceAnomaly]:
+    """
+    Return the anomaly of the first indicator out of its bounds: the close
+    out of the Bollinger bands, or an RSI in the oversold or overbought
+    zone. None if no indicator is out of its bounds.
+    :param current_price: Last close price of the symbol.
+    :param indicators: Indicators of the symbol, see get_indicators.
+    :param triggers: Indicators to check, in order.
+    """
+    for indicator in triggers:
+        lower, value, upper = _get_bounds(indicator, current_price.value,
+                                          indicators)
+        if value <= lower or value >= upper:
+            return PriceAnomaly(
+                period=INDICATOR_PERIODS[indicator],
+                min_price=ClosePrice(current_price.date, lower),
+                current_price=ClosePrice(current_price.date, value),
+                max_price=ClosePrice(current_price.date, upper),
+                indicator=indicator,
+            )
+
+    return None
+
+
+class IndicatorState:
+    """
+    Indicators of a symbol updated with each new close. The exponential
+    averages are updated in O(1), the averages and the drawdowns read the
+    closes of their window only.
+    """
+
+    def __init__(self, ordinals: np.ndarray, close: np.ndarray) -> None:
+        """
+        :param ordinals: Ordinal dates of the prices in descending order,
+        see types.get_ordinals.
+        :param close: Close prices in descending order.
+        """
+        length = len(close)
+        changes: np.ndarray = close[:-1] - close[1:]
+        self.length = length
+        self.last_ordinal = int(ordinals[0]) if length else 0
+        self.close = close[:DRAWDOWN_WINDOW].copy()
+        self.exponential_average = float(_get_exponential_average(
+            close, np.array(length), _get_alpha(AVERAGE_WINDOW)))
+        self.average_gain = float(_get_exponential_average(
+            np.fmax(changes, 0), np.array(length - 1), 1 / RSI_WINDOW))
+        self.average_loss = float(_get_exponential_average(
+            np.fmax(-changes, 0), np.array(length - 1), 1 / RSI_WINDOW))
+
+    def push(self, ordinal: int, close: float) -> None:
+        """
+        Add the close of a new session.
+        :param ordinal: Date of the session, see types.get_ordinals.
+        :param close: Close price of the session.
+        """
+        if self.length:
+            change = close - self.close[0]
+            self.average_gain = _update_average(
+                self.average_gain, max(change, 0.0), self.length - 1,
+                1 / RSI_WINDOW)
+            self.average_loss = _update_average(
+                self.average_loss, max(-change, 0.0), self.length - 1,
+                1 / RSI_WINDOW)
+        self.exponential_average = _update_average(
+            self.exponential_average, close, self.length,
+            _get_alpha(AVERAGE_WINDOW))
+        self.length += 1
+        self.last_ordinal = ordinal
+        self.close = np.concatenate(([close], self.close[:DRAWDOWN_WINDOW - 1]))
+
+    def get_indicators(self) -> Indicators:
+        """
+        Return the indicators of the last close.
+        """
+        moving_average, lower_band, upper_band = _get_bands(self.close)
+        drawdown, max_drawdown = _get_drawdowns(self.close)
+        is_rsi_ready = self.length > RSI_WINDOW
+        is_average_ready = self.length >= AVERAGE_WINDOW
+        return Indicators(
+            moving_average=moving_average,
+            exponential_average=np.asarray(
+                self.exponential_average if is_average_ready else math.nan),
+            lower_band=lower_band,
+            upper_band=upper_band,
+            rsi=_get_rsi(
+                np.asarray(self.average_gain if is_rsi_ready else math.nan),
+                np.asarray(self.average_loss)),
+            drawdown=drawdown,
+            max_drawdown=max_drawdown,
+        )
+
+
+class IndicatorCache:
+    """
+    Indicator states of many symbols, each state is updated with the
+    sessions it has not processed yet.
+    """
+
+    def __init__(self) -> None:
+        self.symbols: dict[str, IndicatorState] = {}
+        self.updates = 0
+        self.rebuilds = 0
+
+    def get(self, symbol: str, prices: DataFrame) -> Indicators:
+        """
+        Return the indicators of the last close of a symbol, like
+        get_indicators.
+        :param symbol: Symbol of the stock.
+        :param prices: Historical data in descending order.
+        """
+        ordinals = get_ordinals(prices.Date)
+        closes = prices.Close.to_numpy(dtype=float)
+        key = symbol.upper()
+        state = self.symbols.get(key)
+        new_rows = _get_new_rows(state, ordinals, closes)
+        if state is None or new_rows is None:
+            self.symbols[key] = IndicatorState(ordinals, closes)
+            self.rebuilds += 1
+            return self.symbols[key].get_indicators()
+
+        self.updates += 1
+        for row in range(new_rows - 1, -1, -1):  # from old to new sessions
+            state.push(int(ordinals[row]), float(closes[row]))
+        return state.get_indicators()
+
+    def summary(self) -> str:
+        return f'indicators: {len(self.symbols)} symbols, ' \
+               f'{self.updates} updates, {self.rebuilds} rebuilds'
+
+
+# private functions
+
+
+def _get_alpha(window: int) -> float:
+    # the smoothing of an exponential average of a span of n rows
+    return 2 / (window + 1)
+
+
+def _get_bands(close: np.ndarray
+               ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Return the moving average and the Bollinger bands of the first rows,
+    NaN when there are fewer rows than the window.
+    """
+    window = close[:AVERAGE_WINDOW]
+    if len(window) < AVERAGE_WINDOW:
+        window = np.full((AVERAGE_WINDOW, *close.shape[1:]), np.nan)
+    average = window.mean(axis=0)
+    width = BOLLINGER_WIDTH * window.std(axis=0)
+    return average, average - width, average + width
+
+
+def _get_exponential_average(values: np.ndarray, lengths: np.ndarray,
+                             alpha: float,
+                             min_rows: int = 1) -> np.ndarray:
+    """
+    Return the exponential average of the first row, seeded with the row
+    of the length of each column: the row k weighs alpha * (1 - alpha)^k,
+    and the seed the remaining (1 - alpha)^(length - 1).
+    :param min_rows: Rows needed by the average, NaN for shorter columns.
+    """
+    rows = np.arange(len(values)).reshape(-1, *[1] * (values.ndim - 1))
+    weights = np.where(rows < lengths - 1, alpha * (1 - alpha) ** rows,
+                       np.where(rows == lengths - 1, (1 - alpha) ** rows, 0.0))
+    # the rows after the length of a symbol are NaN
+    average = (weights * np.where(rows < lengths, values, 0.0)).sum(axis=0)
+    return np.where(lengths >= min_rows, average, np.nan)
+
+
+def _update_average(average: float, value: float, length: int,
+                    alpha: float) -> float:
+    """
+    Return the exponential average after a new value, the first value seeds
+    the average.
+    """
+    if length < 1:
+        return value
+    return alpha * value + (1 - alpha) * float(average)
+
+
+def _get_rsi(average_gain: np.ndarray, average_loss: np.ndarray) -> np.ndarray:
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return 100 - 100 / (1 + np.divide(average_gain, average_loss))
+
+
+def _get_drawdowns(close: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Return the drawdown of the first row and the maximum drawdown of the
+    rows, each drawdown is measured from the highest previous close.
+    """
+    # the running maximum from the oldest row, NaN rows are skipped
+    peaks = np.fmax.accumulate(close[::-1], axis=0)[::-1]
+    drawdowns = close / peaks - 1
+    return drawdowns[0], np.fmin.reduce(drawdowns, axis=0)
+
+
+def _get_bounds(indicator: Indicator, close: float,
+                indicators: Indicators) -> tuple[float, float, float]:
+    """
+    Return the lower bound, the value and the upper bound of an indicator.
+    """
+    if indicator == Indicator.BOLLINGER:
+        return (float(indicators.lower_band), close,
+                float(indicators.upper_band))
+    return RSI_OVERSOLD, float(indicators.rsi), RSI_OVERBOUGHT
+
+
+def _get_new_rows(state: Optional[IndicatorState], ordinals: np.ndarray,
+                  closes: np.ndarray) -> Optional[int]:
+    """
+    Return the number of rows after the last session of the state, or None
+    if the state does not match the prices: the last session is not in the
+    prices, its close changed (dividends and splits adjust the whole
+    history), or the prices have older sessions that the state lacks.
+    """
+    if state is None or not state.length:
+        return None
+
+    # the ordinals are in descending order
+    row = int(np.searchsorted(-ordinals, -state.last_ordinal))
+    if row == len(ordinals) or ordinals[row] != state.last_ordinal:
+        return None
+
+    if state.length < min(len(ordinals) - row, DRAWDOWN_WINDOW):
+        return None
+
+    close = closes[row]
+    same_close = close == state.close[0] or (
+        math.isnan(close) and math.isnan(state.close[0]))
+    return row if same_close else None
@@ -0,0 +1,117 @@
+"""
+Single pass computation of the statistics of many windows.
+The prices are in descending order (today's row is 0), so every window is a
+prefix of the arrays: the window of n trading days contains the rows [0, n).
+Running minima, maxima and prefix sums over the rows give the statistics of
+all the windows at once.
+The arrays can be 1-D (one symbol) or 2-D (rows x symbols), in which case the
+statistics of every symbol are computed with the same column operations.
+"""
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+from src.analyst.range_index import RangeIndex
+
+
+class WindowStats(NamedTuple):
+    """
+    Statistics per window, the position i of each array belongs to window i.
+    Rows are indexes of the prices arrays. For 2-D prices each array has a
+    column per symbol.
+    """
+    min_row: np.ndarray
+    max_row: np.ndarray
+    initial_row: np.ndarray
+    max_negative_change: np.ndarray
+    max_positive_change: np.ndarray
+    log_return_std: np.ndarray
+
+
+def compute(close: np.ndarray, change: np.ndarray, log_return: np.ndarray,
+            windows: np.ndarray,
+            lengths: Optional[np.ndarray] = None,
+            index: Optional[RangeIndex] = None) -> WindowStats:
+    """
+    Compute the statistics of every window in a single pass over the prices.
+    :param close: Close prices in descending order.
+    :param change: 1-day change of the close prices.
+    :param log_return: 1-day logarithmic return of the close prices.
+    :param windows: Trading days of each window, the same for every symbol,
+    or 2-D (windows x symbols) with the trading days of each symbol.
+    :param lengths: Number of rows of each symbol for 2-D prices, the rows
+    after the length of a symbol must be NaN. Defaults to all the rows.
+    :param index: Optional range index of the close prices, the rows of the
+    minimum and maximum closes are read from it instead of being computed.
+    :return: A WindowStats object containing the statistics of every window.
+    """
+    if lengths is None:
+        lengths = np.full(close.shape[1:], len(close))
+
+    # a window longer than the prices contains all the prices
+    if windows.ndim > 1:
+        last_row = np.minimum(windows, lengths) - 1
+    else:
+        last_row = np.minimum.outer(windows, lengths) - 1
+
+    if index is None:
+        min_row = _take(_running_argmin(close), last_row)
+        max_row = _take(_running_argmin(-close), last_row)
+    else:
+        min_row = index.get_min_rows(0, last_row + 1)
+        max_row = index.get_max_rows(0, last_row + 1)
+
+    return WindowStats(
+        min_row=min_row,
+        max_row=max_row,
+        initial_row=last_row,
+        max_negative_change=_take(np.fmin.accumulate(change), last_row),
+        max_positive_change=_take(np.fmax.accumulate(change), last_row),
+        log_return_std=_take(_running_std(log_return), last_row),
+    )
+
+
+# private functions
+
+
+def _take(running: np.ndarray, rows: np.ndarray) -> np.ndarray:
+    return np.take_along_axis(running, rows, axis=0)
+
+
+def _running_argmin(values: np.ndarray) -> np.ndarray:
+    """
+    Return the row of the minimum value of each prefix. Like pandas idxmin,
+    ties are resolved with the first occurrence and NaN values are skipped.
+    """
+    values = np.where(np.isnan(values), np.inf, values)
+    running_min = np.minimum.accumulate(values)
+    previous_min = np.concatenate(
+        (np.full((1, *values.shape[1:]), np.inf), running_min[:-1]))
+    rows = np.arange(len(values)).reshape(-1, *[1] * (values.ndim - 1))
+    # a row is the new minimum only if it is strictly lower than the previous
+    new_min_rows = np.where(values < previous_min, rows, 0)
+    return np.maximum.accumulate(new_min_rows)
+
+
+def _running_std(values: np.ndarray) -> np.ndarray:
+    """
+    Return the sample standard deviation of each prefix skipping NaN values,
+    like pandas std. The values are centered first to keep the prefix sums
+    numerically stable.
+    """
+    is_valid = ~np.isnan(values)
+    count = np.cumsum(is_valid, axis=0)
+
+    # cumsum adds the rows in order, so a column gets the same mean as a 1-D
+    # array with its values
+    values = np.where(is_valid, values, 0.0)
+    mean = np.cumsum(values, axis=0)[-1] / np.maximum(count[-1], 1)
+    values = np.where(is_valid, values - mean, 0.0)
+
+    total = np.cumsum(values, axis=0)
+    total_squares = np.cumsum(values * values, axis=0)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        variance = (total_squares - total * total / count) / (count - 1)
+    variance = np.where(count > 1, np.maximum(variance, 0.0), np.nan)
+    return np.sqrt(variance)
@@ -0,0 +1,214 @@
+"""
+Analysis of large portfolios in a pool of processes.
+The symbols are independent, so the columns of the aligned prices are split
+in a chunk per worker, and each worker computes the statistics and the
+results of its chunk with the functions of the portfolio module. The prices
+are copied once to shared memory blocks, a worker reads the columns of its
+chunk from them, so only the positions of the chunk are pickled. The results
+of the chunks are merged in the order of the portfolio.
+A small portfolio is analysed in the calling process: its analysis takes
+less time than sending it to the workers.
+"""
+import functools
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+from typing import Callable, NamedTuple, Optional, Sequence, TypeVar
+
+import numpy as np
+
+from src.analyst import portfolio
+from src.analyst.portfolio import (
+    PortfolioPrices, PortfolioReport, PortfolioStats
+)
+from src.common import logs
+from src.common.periods import PeriodSpec
+from src.common.types import Indicator, PriceAnomaly, SymbolReport
+
+logger = logs.get_logger(__name__)
+
+# a smaller portfolio is analysed in the calling process
+MIN_PARALLEL_SYMBOLS = 2000
+
+Result = TypeVar('Result')
+
+
+class ParallelAnalyst:
+    """
+    Computes the results of the portfolio module in a pool of processes,
+    the pool is started by the first parallel analysis and reused until
+    close is called.
+    """
+
+    def __init__(self, workers: int = 1,
+                 min_symbols: int = MIN_PARALLEL_SYMBOLS) -> None:
+        """
+        :param workers: Processes of the pool, 1 analyses every portfolio
+        in the calling process.
+        :param min_symbols: Symbols needed to analyse a portfolio in the
+        pool.
+        """
+        self.workers = workers
+        self.min_symbols = min_symbols
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def get_price_anomalies(self, prices: PortfolioPrices,
+                            triggers: Sequence[Indicator] = ()
+                            ) -> list[Optional[PriceAnomaly]]:
+        """
+        Return the price anomaly of each symbol, see
+        portfolio.get_price_anomalies.
+        """
+        task = functools.partial(portfolio.get_price_anomalies,
+                                 triggers=tuple(triggers))
+        chunks = self._map(task, prices)
+        return [anomaly for chunk in chunks for anomaly in chunk]
+
+    def get_report(self, prices: PortfolioPrices,
+                   extra_periods: Sequence[PeriodSpec] = ()
+                   ) -> PortfolioReport:
+        """
+        Return the report of the portfolio, see portfolio.get_report.
+        """
+        task = functools.partial(portfolio.get_report,
+                                 extra_periods=tuple(extra_periods))
+        chunks = self._map(task, prices, extra_periods)
+        return PortfolioReport(
+            symbols=[symbol for chunk in chunks for symbol in chunk.symbols],
+            current_price=np.concatenate(
+                [chunk.current_price for chunk in chunks]),
+            change_in_period=np.hstack(
+                [chunk.change_in_period for chunk in chunks]),
+            periods=chunks[0].periods,
+        )
+
+    def get_symbol_reports(self,
+                           prices: PortfolioPrices) -> list[SymbolReport]:
+        """
+        Return the report of each symbol, see portfolio.get_symbol_reports.
+        """
+        chunks = self._map(portfolio.get_symbol_reports, prices)
+        return [report for chunk in chunks for report in chunk]
+
+    def close(self) -> None:
+        """
+        Stop the processes of the pool.
+        """
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown()
+
+    # private methods
+
+    def _map(self, task: Callable[[PortfolioStats], Result],
+             prices: PortfolioPrices,
+             extra_periods: Sequence[PeriodSpec] = ()) -> list[Result]:
+        """
+        Return the result of the task for each chunk of symbols, a single
+        chunk when the portfolio is analysed in the calling process.
+        """
+        symbols_count = len(prices.symbols)
+        if self.workers <= 1 or symbols_count < self.min_symbols:
+            return [task(portfolio.compute(prices, extra_periods))]
+
+        blocks: list[SharedMemory] = []
+        try:
+            arrays = _SharedPrices(*(_share(array, blocks) for array in (
+                prices.dates, prices.close, prices.change, prices.log_return,
+                prices.lengths)))
+        except OSError as e:
+            # some platforms do not have shared memory, like AWS Lambda
+            logger.error(f'_map: analysing in this process, {e}')
+            _release(blocks)
+            return [task(portfolio.compute(prices, extra_periods))]
+
+        try:
+            bounds = np.linspace(0, symbols_count,
+                                 self.workers + 1).astype(int).tolist()
+            futures = [
+                self._get_executor().submit(
+                    _run_chunk, task, arrays, prices.symbols[start:end], start,
+                    end, tuple(extra_periods))
+                for start, end in zip(bounds[:-1], bounds[1:]) if start < end
+            ]
+            return [future.result() for future in futures]
+        finally:
+            _release(blocks)
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # the workers do not inherit the threads of this process
+                methods = multiprocessing.get_all_start_methods()
+                method = 'forkserver' if 'forkserver' in methods else 'spawn'
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context(method))
+            return self._executor
+
+
+# private functions
+
+
+class _SharedArray(NamedTuple):
+    """
+    Location of an array in a shared memory block, sent to the workers.
+    """
+    name: str
+    shape: tuple[int, ...]
+    dtype: str
+
+
+class _SharedPrices(NamedTuple):
+    dates: _SharedArray
+    close: _SharedArray
+    change: _SharedArray
+    log_return: _SharedArray
+    lengths: _SharedArray
+
+
+def _share(array: np.ndarray, blocks: list[SharedMemory]) -> _SharedArray:
+    """
+    Copy an array to a new shared memory block, added to the blocks.
+    """
+    block = SharedMemory(create=True, size=max(array.nbytes, 1))
+    blocks.append(block)
+    shared: np.ndarray = np.ndarray(array.shape, array.dtype, buffer=block.buf)
+    shared[...] = array
+    del shared  # the block cannot be closed while a view exists
+    return _SharedArray(block.name, array.shape, array.dtype.str)
+
+
+def _release(blocks: list[SharedMemory]) -> None:
+    for block in blocks:
+        block.close()
+        block.unlink()
+
+
+def _read_columns(array: _SharedArray, start: int, end: int) -> np.ndarray:
+    """
+    Return a copy of the columns [start, end) of a shared array, the last
+    axis is the symbol.
+    """
+    block = SharedMemory(name=array.name)
+    shared: np.ndarray = np.ndarray(array.shape, np.dtype(array.dtype),
+                                    buffer=block.buf)
+    columns = shared[..., start:end].copy()
+    del shared
+    block.close()
+    return columns
+
+
+def _run_chunk(task: Callable[[PortfolioStats], Result],
+               arrays: _SharedPrices, symbols: list[str], start: int,
+               end: int, extra_periods: Sequence[PeriodSpec]) -> Result:
+    """
+    Compute the result of the task for the symbols of the columns
+    [start, end), it runs in a worker.
+    """
+    prices = PortfolioPrices(symbols, *(_read_columns(array, start, end)
+                                        for array in arrays))
+    return task(portfolio.compute(prices, extra_periods))
@@ -0,0 +1,262 @@
+"""
+Cross-sectional analysis of a whole portfolio.
+The prices of every symbol are aligned in 2-D arrays (rows x symbols), where
+row 0 is the last session of each symbol, so the kernel computes the
+statistics of every symbol with vectorized column operations. The results
+are the same as the ones of the per-symbol functions of the analyst module.
+"""
+from typing import NamedTuple, Optional, Sequence
+
+import numpy as np
+from pandas import DataFrame
+
+from src.analyst import analyst, indicators, kernel
+from src.analyst.indicators import Indicators
+from src.analyst.kernel import WindowStats
+from src.common import periods as periods_registry
+from src.common.periods import PeriodSpec
+from src.common.types import (
+    ANNUAL_PERIODS, AnnualPriceStats, AnnualStats, ClosePrice, Indicator, Period,
+    PriceAnomaly, PriceStats, ReportInPeriod, SymbolReport, get_ordinals
+)
+
+ANOMALY_PERIODS = [Period.YEAR, Period.HALF, Period.QUARTER, Period.MONTH]
+
+
+class PortfolioPrices(NamedTuple):
+    """
+    Prices of a portfolio aligned by row, the rows after the length of a
+    symbol are NaN.
+    """
+    symbols: list[str]
+    dates: np.ndarray  # ordinal dates, see types.get_ordinals
+    close: np.ndarray
+    change: np.ndarray
+    log_return: np.ndarray
+    lengths: np.ndarray
+
+
+class PortfolioStats(NamedTuple):
+    prices: PortfolioPrices
+    stats: WindowStats
+
+
+class PortfolioReport(NamedTuple):
+    """
+    Report of a portfolio, the changes have a row per period (from week to
+    year, then the extra periods) and a column per symbol.
+    """
+    symbols: list[str]
+    current_price: np.ndarray
+    change_in_period: np.ndarray
+    periods: list[str]
+
+
+def align(symbols: list[str], frames: list[DataFrame]) -> PortfolioPrices:
+    """
+    Align the prices of a portfolio in 2-D arrays.
+    :param symbols: Symbols of the portfolio.
+    :param frames: Historical prices of each symbol in descending order.
+    :return: A PortfolioPrices object with a column per symbol.
+    """
+    lengths = np.array([len(frame) for frame in frames], dtype=int)
+    for symbol, length in zip(symbols, lengths):
+        if length == 0:
+            raise ValueError(f'Error: the symbol {symbol} does not exists')
+
+    rows = int(lengths.max(initial=1))
+    shape = (rows, len(frames))
+    dates: np.ndarray = np.zeros(shape, dtype=np.int64)
+    close = np.full(shape, np.nan)
+    change = np.full(shape, np.nan)
+    log_return = np.full(shape, np.nan)
+    for column, frame in enumerate(frames):
+        length = lengths[column]
+        dates[:length, column] = get_ordinals(frame.Date)
+        close[:length, column] = frame.Close.to_numpy(dtype=float)
+        change[:length, column] = frame.change.to_numpy(dtype=float)
+        log_return[:length, column] = frame.log_return.to_numpy(dtype=float)
+
+    return PortfolioPrices(symbols, dates, close, change, log_return, lengths)
+
+
+def compute(prices: PortfolioPrices,
+            extra_periods: Sequence[PeriodSpec] = ()) -> PortfolioStats:
+    """
+    Compute the statistics of every period for every symbol at once.
+    :param extra_periods: Periods computed after the periods of the Period
+    enum, in the same pass over the prices. The positions of the Period enum
+    do not change.
+    """
+    windows = analyst.get_windows()
+    if extra_periods:
+        # the calendar windows have a length per symbol
+        extra_windows = periods_registry.get_windows(extra_periods,
+                                                     prices.dates)
+        windows = np.concatenate((
+            np.repeat(windows[:, np.newaxis], len(prices.symbols), axis=1),
+            extra_windows,
+        ))
+    stats = kernel.compute(prices.close, prices.change, prices.log_return,
+                           windows, prices.lengths)
+    return PortfolioStats(prices, stats)
+
+
+def get_price_anomalies(
+        portfolio: PortfolioStats,
+        triggers: Sequence[Indicator] = ()) -> list[Optional[PriceAnomaly]]:
+    """
+    Return the price anomaly of each symbol, like analyst.get_price_anomaly.
+    :param triggers: Indicators checked for the symbols within the bounds of
+    every period.
+    """
+    prices, stats = portfolio
+    symbols_count = len(prices.symbols)
+    columns = np.arange(symbols_count)
+    current = prices.close[0]
+
+    # the first period (from year to month) out of bounds, -1 if none
+    anomaly_position = np.full(symbols_count, -1)
+    for period in ANOMALY_PERIODS:
+        position = analyst.get_position(period)
+        min_close = prices.close[stats.min_row[position], columns]
+        max_close = prices.close[stats.max_row[position], columns]
+        out_of_bounds = (current <= min_close) | (current >= max_close)
+        anomaly_position[(anomaly_position < 0) & out_of_bounds] = position
+
+    periods = list(Period)
+    anomalies: list[Optional[PriceAnomaly]] = []
+    if triggers:
+        values = indicators.compute(prices.close, prices.lengths)
+    for column, position in enumerate(anomaly_position):
+        if position < 0 and triggers:
+            anomalies.append(indicators.get_anomaly(
+                _get_close_price_at(prices, 0, column),
+                Indicators(*(value[column] for value in values)), triggers))
+            continue
+        if position < 0:
+            anomalies.append(None)
+            continue
+        anomalies.append(PriceAnomaly(
+            period=periods[position],
+            min_price=_get_close_price(prices, stats.min_row, position, column),
+            current_price=_get_close_price_at(prices, 0, column),
+            max_price=_get_close_price(prices, stats.max_row, position, column),
+        ))
+
+    return anomalies
+
+
+def get_current_prices(portfolio: PortfolioStats) -> list[ClosePrice]:
+    """
+    Return the current price of each symbol, like analyst.get_current_price.
+    """
+    return get_last_prices(portfolio.prices)
+
+
+def get_last_prices(prices: PortfolioPrices) -> list[ClosePrice]:
+    """
+    Return the last close price of each symbol.
+    """
+    return [_get_close_price_at(prices, 0, column)
+            for column in range(len(prices.symbols))]
+
+
+def get_price_stats(portfolio: PortfolioStats) -> list[AnnualPriceStats]:
+    """
+    Return the price stats of each symbol, like analyst.get_price_stats.
+    """
+    prices, stats = portfolio
+    price_stats = []
+    for column in range(len(prices.symbols)):
+        periods = []
+        for period in ANNUAL_PERIODS:
+            position = analyst.get_position(period)
+            min_price = _get_close_price(prices, stats.min_row, position, column)
+            max_price = _get_close_price(prices, stats.max_row, position, column)
+            periods.append(PriceStats(
+                min_price, max_price,
+                analyst.get_price_difference(min_price, max_price),
+                float(stats.max_negative_change[position, column]),
+                float(stats.max_positive_change[position, column]),
+            ))
+        price_stats.append(AnnualPriceStats(*periods))
+
+    return price_stats
+
+
+def get_return_stats(portfolio: PortfolioStats) -> list[AnnualStats]:
+    """
+    Return the return stats of each symbol, like analyst.get_return_stats.
+    """
+    returns = get_report(portfolio).change_in_period
+    positions = [analyst.get_position(period) for period in ANNUAL_PERIODS]
+    return [AnnualStats(*(float(value) for value in column))
+            for column in returns[positions].T]
+
+
+def get_volatility_stats(portfolio: PortfolioStats) -> list[AnnualStats]:
+    """
+    Return the volatility stats of each symbol, like
+    analyst.get_volatility_stats.
+    """
+    daily_std = portfolio.stats.log_return_std
+    volatility = np.array([
+        analyst.get_volatility(daily_std[analyst.get_position(period)], period)
+        for period in ANNUAL_PERIODS
+    ])
+    return [AnnualStats(*(float(value) for value in column))
+            for column in volatility.T]
+
+
+def get_report(portfolio: PortfolioStats,
+               extra_periods: Sequence[PeriodSpec] = ()) -> PortfolioReport:
+    """
+    Return the current price and the change in every period of each symbol,
+    without building a report object per symbol.
+    :param extra_periods: The extra periods given to compute.
+    """
+    prices, stats = portfolio
+    current = prices.close[0]
+    initial_close = np.take_along_axis(prices.close, stats.initial_row, axis=0)
+    names = [period.value for period in Period]
+    names.extend(period.name for period in extra_periods)
+    return PortfolioReport(prices.symbols, current, current / initial_close - 1,
+                           names)
+
+
+def get_symbol_reports(portfolio: PortfolioStats) -> list[SymbolReport]:
+    """
+    Return the report of each symbol, like analyst.get_symbol_report.
+    """
+    prices, stats = portfolio
+    _, current, returns, _ = get_report(portfolio)
+
+    reports = []
+    for column, symbol in enumerate(prices.symbols):
+        periods = [
+            ReportInPeriod(
+                period=period,
+                min_price=_get_close_price(prices, stats.min_row, position, column),
+                max_price=_get_close_price(prices, stats.max_row, position, column),
+                change_in_period=float(returns[position, column]),
+            )
+            for position, period in enumerate(Period)
+        ]
+        reports.append(SymbolReport(symbol, float(current[column]), *periods))
+
+    return reports
+
+
+# private functions
+
+
+def _get_close_price(prices: PortfolioPrices, rows: np.ndarray,
+                     position: int, column: int) -> ClosePrice:
+    return _get_close_price_at(prices, int(rows[position, column]), column)
+
+
+def _get_close_price_at(prices: PortfolioPrices, row: int,
+                        column: int) -> ClosePrice:
+    return ClosePrice.from_ordinal(int(prices.dates[row, column]),
+                                   float(prices.close[row, column]))
@@ -0,0 +1,169 @@
+"""
+Range minimum and maximum queries over the close prices.
+A sparse table keeps, for every row and every power of two, the row of the
+minimum (and maximum) close of the 2^k rows that start at it. Any range
+[start, end) is covered by two of those blocks, so a query takes O(1) after
+an O(n log n) build. Like pandas idxmin and idxmax, ties are resolved with
+the first occurrence and NaN values are skipped.
+The index of a dataframe is built once and kept while the dataframe lives,
+see get_index, so the caches of the prices keep their index too. Building
+the index costs more than a single pass over the prices, so it is built for
+the prices that are queried many times.
+"""
+import threading
+import weakref
+from typing import Optional, Union
+
+import numpy as np
+from pandas import DataFrame
+
+from src.common.types import ClosePrice, get_ordinals
+
+Rows = Union[int, np.ndarray]
+
+
+class RangeIndex:
+    """
+    Sparse table of the rows of the minimum and maximum closes. The prices
+    can be 1-D (one symbol) or 2-D (rows x symbols), in which case every
+    query has a column per symbol.
+    """
+
+    def __init__(self, dates: np.ndarray, close: np.ndarray) -> None:
+        """
+        :param dates: Ordinal dates of the prices, see types.get_ordinals.
+        :param close: Close prices.
+        """
+        self.dates = dates
+        self.close = close
+        is_nan = np.isnan(close)
+        self.min_rows, self.min_values = _build(np.where(is_nan, np.inf, close))
+        self.max_rows, self.max_values = _build(np.where(is_nan, np.inf, -close))
+        # the column of each symbol, used to query 2-D tables
+        self.columns: tuple = ()
+        if close.ndim > 1:
+            self.columns = (np.arange(close.shape[1]),)
+
+    def __len__(self) -> int:
+        return len(self.close)
+
+    def get_min_rows(self, starts: Rows, ends: Rows) -> np.ndarray:
+        """
+        Return the row of the minimum close of each range [start, end).
+        A range must contain at least one row, the first row is returned
+        when all its closes are NaN.
+        :param starts: First row of each range.
+        :param ends: Row after the last row of each range. For 2-D prices
+        the last axis of the ranges is the symbol.
+        """
+        return self._query(self.min_rows, self.min_values, starts, ends)
+
+    def get_max_rows(self, starts: Rows, ends: Rows) -> np.ndarray:
+        """
+        Return the row of the maximum close of each range [start, end), see
+        get_min_rows.
+        """
+        return self._query(self.max_rows, self.max_values, starts, ends)
+
+    def get_min_price(self, start: int, end: int) -> ClosePrice:
+        """
+        Return the minimum close of the rows [start, end) of a 1-D index.
+        """
+        return self._get_close_price(int(self.get_min_rows(start, end)))
+
+    def get_max_price(self, start: int, end: int) -> ClosePrice:
+        """
+        Return the maximum close of the rows [start, end) of a 1-D index.
+        """
+        return self._get_close_price(int(self.get_max_rows(start, end)))
+
+    # private methods
+
+    def _query(self, rows: np.ndarray, values: np.ndarray, starts: Rows,
+               ends: Rows) -> np.ndarray:
+        levels = _floor_log2(np.subtract(ends, starts))
+        first = (levels, starts, *self.columns)
+        # the second block ends with the range
+        second = (levels, ends - (1 << levels), *self.columns)
+        # the first block starts before the second one, so it wins the ties
+        return np.where(values[second] < values[first], rows[second],
+                        rows[first])
+
+    def _get_close_price(self, row: int) -> ClosePrice:
+        return ClosePrice.from_ordinal(int(self.dates[row]),
+                                       float(self.close[row]))
+
+
+def get_index(prices: DataFrame) -> RangeIndex:
+    """
+    Return the index of the close prices of a dataframe, built the first
+    time and kept while the dataframe lives. The dataframe must not be
+    modified after its index is built.
+    """
+    index = find_index(prices)
+    if index is not None:
+        return index
+
+    key = id(prices)
+
+    index = RangeIndex(get_ordinals(prices.Date),
+                       prices.Close.to_numpy(dtype=float))
+    with _lock:
+        if key not in _indexes:
+            _indexes[key] = index
+            weakref.finalize(prices, _remove_index, key)
+        return _indexes[key]
+
+
+def find_index(prices: DataFrame) -> Optional[RangeIndex]:
+    """
+    Return the index of a dataframe if it was built by get_index, or None.
+    """
+    with _lock:
+        return _indexes.get(id(prices))
+
+
+# private functions
+
+
+# indexes by id of their dataframe, removed when the dataframe is collected
+_indexes: dict[int, RangeIndex] = {}
+_lock = threading.Lock()
+
+
+def _remove_index(key: int) -> None:
+    with _lock:
+        _indexes.pop(key, None)
+
+
+def _build(values: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Return the tables of the rows and the values of the minimum, with a
+    level per power of two. The level k has the minimum of the 2^k rows that
+    start at each row, the rows whose block does not fit are not used.
+    """
+    length = len(values)
+    levels = max(length, 1).bit_length()
+    rows = np.empty((levels, *values.shape), dtype=np.int32)
+    rows[0] = np.arange(length).reshape(-1, *[1] * (values.ndim - 1))
+    level_values = np.empty((levels, *values.shape))
+    level_values[0] = values
+    for level in range(1, levels):
+        half = 1 << (level - 1)
+        previous_rows = rows[level - 1]
+        previous_values = level_values[level - 1]
+        rows[level] = previous_rows
+        level_values[level] = previous_values
+        # a strictly lower value of the second half is a new minimum
+        is_lower = previous_values[half:] < previous_values[:-half]
+        rows[level, :-half] = np.where(is_lower, previous_rows[half:],
+                                       previous_rows[:-half])
+        level_values[level, :-half] = np.where(is_lower,
+                                               previous_values[half:],
+                                               previous_values[:-half])
+    return rows, level_values
+
+
+def _floor_log2(lengths: np.ndarray) -> np.ndarray:
+    # the exponent of frexp is floor(log2(x)) + 1 for positive integers
+    return np.frexp(np.maximum(lengths, 1))[1] - 1
@@ -0,0 +1,230 @@
+"""
+Replay of the price anomalies of the monitor over a long history.
+Every session of the history is evaluated as if the monitor ran after its
+close: the anomaly of a session is the one analyst.get_price_anomaly returns
+for the prices up to that session. The windows of the periods slide over the
+history, so the minimum and maximum of every window are queries to a range
+index of the closes, built once per symbol, instead of a new frame per
+session. The anomalies are then given to the alert rules, session by
+session, to know which ones the monitor would have sent.
+The symbols are independent, so the files of a replay are spread across a
+process pool and each worker returns only the anomalies of its symbols.
+"""
+import functools
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import NamedTuple, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+
+from src.alerts import rules
+from src.alerts.store import MemoryAlertStore
+from src.analyst.portfolio import ANOMALY_PERIODS
+from src.analyst.range_index import RangeIndex
+from src.common.periods import TRADING_DAYS
+from src.common.types import ClosePrice, Period, PriceAnomaly, get_ordinals
+from src.download.cache import PriceCache
+
+# sessions before the first replayed session, the monitor downloads a year
+MIN_HISTORY = TRADING_DAYS[Period.YEAR]
+# a smaller replay does not pay for starting the process pool
+MIN_PARALLEL_SYMBOLS = 8
+HISTORY_SUFFIXES = ['.csv', '.parquet', '.npy']
+COLUMNS = ['Symbol', 'Date', 'Period', 'Direction', 'Close', 'Min', 'Max',
+           'Alert']
+
+
+class Anomalies(NamedTuple):
+    """
+    Anomalies of the sessions of a history, a session has at most one: the
+    one of the first period whose bounds contain the close. The rows are
+    rows of the prices, in descending order.
+    """
+    rows: np.ndarray
+    positions: np.ndarray  # of the period in the replayed periods
+    min_rows: np.ndarray  # of the minimum close of the period
+    max_rows: np.ndarray  # of the maximum close of the period
+
+
+def get_anomalies(dates: np.ndarray, close: np.ndarray,
+                  periods: Sequence[Period] = ANOMALY_PERIODS,
+                  min_history: int = MIN_HISTORY) -> Anomalies:
+    """
+    Find the anomaly of every session with enough history.
+    :param dates: Ordinal dates of the prices in descending order, see
+    types.get_ordinals.
+    :param close: Close prices in descending order.
+    :param periods: Periods to check, in order.
+    :param min_history: Sessions up to the replayed session, included,
+    needed to replay it. The older sessions only fill the windows.
+    """
+    length = len(close)
+    index = RangeIndex(dates, close)
+    rows = np.arange(max(length - max(min_history, 1) + 1, 0))
+    positions = np.full(len(rows), -1)
+    min_rows: np.ndarray = np.zeros(len(rows), dtype=np.int64)
+    max_rows: np.ndarray = np.zeros(len(rows), dtype=np.int64)
+    current = close[rows]
+    for position, period in enumerate(periods):
+        if not len(rows):
+            break
+        ends = np.minimum(rows + TRADING_DAYS[period], length)
+        period_min_rows = index.get_min_rows(rows, ends)
+        period_max_rows = index.get_max_rows(rows, ends)
+        # a NaN close is never out of the bounds
+        is_anomaly = (positions < 0) & (
+            (current <= close[period_min_rows])
+            | (current >= close[period_max_rows]))
+        positions[is_anomaly] = position
+        min_rows[is_anomaly] = period_min_rows[is_anomaly]
+        max_rows[is_anomaly] = period_max_rows[is_anomaly]
+
+    is_found = positions >= 0
+    return Anomalies(rows[is_found], positions[is_found], min_rows[is_found],
+                     max_rows[is_found])
+
+
+def replay(symbol: str, prices: DataFrame,
+           periods: Sequence[Period] = ANOMALY_PERIODS,
+           min_history: int = MIN_HISTORY,
+           cooldown_days: Optional[int] = rules.COOLDOWN_DAYS) -> DataFrame:
+    """
+    Return the anomalies of every session of a symbol, from the oldest to
+    the most recent, with the columns of COLUMNS. Alert is True when the
+    alert rules send the anomaly.
+    :param symbol: Symbol of the stock.
+    :param prices: Historical data in descending order.
+    :param periods: Periods to check, in order, see get_anomalies.
+    :param min_history: Sessions needed to replay a session.
+    :param cooldown_days: Days before the same breach is sent again, see
+    rules.get_new_anomalies.
+    """
+    dates = get_ordinals(prices.Date)
+    close = prices.Close.to_numpy(dtype=float)
+    anomalies = get_anomalies(dates, close, periods, min_history)
+    store = MemoryAlertStore()
+    records = []
+    previous_row = -1
+    for row, position, min_row, max_row in zip(
+            anomalies.rows[::-1].tolist(), anomalies.positions[::-1].tolist(),
+            anomalies.min_rows[::-1].tolist(),
+            anomalies.max_rows[::-1].tolist()):
+        if previous_row != row + 1:
+            # the symbol was within the bounds the session before
+            rules.get_new_anomalies(store, [symbol], [None], cooldown_days)
+        previous_row = row
+        anomaly = PriceAnomaly(
+            period=periods[position],
+            min_price=ClosePrice.from_ordinal(dates[min_row], close[min_row]),
+            current_price=ClosePrice.from_ordinal(dates[row], close[row]),
+            max_price=ClosePrice.from_ordinal(dates[max_row], close[max_row]),
+        )
+        new_anomaly, = rules.get_new_anomalies(store, [symbol], [anomaly],
+                                              cooldown_days)
+        records.append((symbol, anomaly.current_price.date,
+                        anomaly.period.value, anomaly.get_direction().value,
+                        close[row], close[min_row], close[max_row],
+                        new_anomaly is not None))
+
+    return DataFrame.from_records(records, columns=COLUMNS)
+
+
+def read_history(path: Path) -> DataFrame:
+    """
+    Return the history of a file in descending order: a CSV or Parquet file
+    with the Date and Close columns, in any order, or a file of the price
+    cache.
+    """
+    if path.suffix == '.npy':
+        prices = PriceCache(str(path.parent)).read(path.stem)
+        if prices is None:
+            raise FileNotFoundError(f'{path} is not a file of the price cache')
+        return prices
+
+    if path.suffix == '.parquet':
+        history = pd.read_parquet(path)  # requires pyarrow or fastparquet
+    else:
+        history = pd.read_csv(path)
+    if 'Date' not in history:
+        history = history.reset_index()  # the dates are the index
+    order = np.argsort(-get_ordinals(history.Date), kind='stable')
+    return history.iloc[order].reset_index(drop=True)
+
+
+def get_history_files(paths: list[str]) -> list[Path]:
+    """
+    Return the history files of the given files and directories, the name of
+    each file is its symbol.
+    """
+    files: list[Path] = []
+    for path in map(Path, paths):
+        if path.is_dir():
+            files.extend(sorted(file for file in path.iterdir()
+                                if file.suffix in HISTORY_SUFFIXES))
+        else:
+            files.append(path)
+    return files
+
+
+def replay_file(path: Path, periods: Sequence[Period] = ANOMALY_PERIODS,
+                min_history: int = MIN_HISTORY,
+                cooldown_days: Optional[int] = rules.COOLDOWN_DAYS
+                ) -> DataFrame:
+    """
+    Replay the history of a file, see replay.
+    """
+    return replay(path.stem.upper(), read_history(path), periods, min_history,
+                  cooldown_days)
+
+
+def replay_files(paths: list[Path], workers: int = 1,
+                 periods: Sequence[Period] = ANOMALY_PERIODS,
+                 min_history: int = MIN_HISTORY,
+                 cooldown_days: Optional[int] = rules.COOLDOWN_DAYS
+                 ) -> DataFrame:
+    """
+    Replay the history of many files, the anomalies are in the order of the
+    files.
+    :param workers: Processes that replay the files, a replay of fewer than
+    MIN_PARALLEL_SYMBOLS files runs in this process.
+    """
+    task = functools.partial(replay_file, periods=periods,
+                             min_history=min_history,
+                             cooldown_days=cooldown_days)
+    if workers <= 1 or len(paths) < MIN_PARALLEL_SYMBOLS:
+        frames = [task(path) for path in paths]
+    else:
+        # a few chunks per worker balance the symbols of different lengths
+        chunksize = max(len(paths) // (workers * 4), 1)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            frames = list(executor.map(task, paths, chunksize=chunksize))
+
+    frames = [frame for frame in frames if not frame.empty]
+    if not frames:
+        return DataFrame(columns=COLUMNS)
+    return pd.concat(frames, ignore_index=True)
+
+
+def summarize(anomalies: DataFrame,
+              periods: Sequence[Period] = ANOMALY_PERIODS) -> DataFrame:
+    """
+    Return the number of anomalies and of alerts sent of each period and
+    direction, with a row per period in the order of the periods.
+    :param anomalies: Anomalies of a replay, see replay_files.
+    """
+    counts = anomalies.groupby(['Period', 'Direction']).Alert \
+        .agg(['size', 'sum']).unstack(fill_value=0)
+    counts.columns = [f'{direction} {_COUNT_NAMES[count]}'
+                      for count, direction in counts.columns]
+    columns = [f'{direction} {name}' for name in _COUNT_NAMES.values()
+               for direction in ['min', 'max']]
+    return counts.reindex(index=[period.value for period in periods],
+                          columns=columns, fill_value=0).astype(int)
+
+
+# private functions
+
+
+_COUNT_NAMES = {'size': 'anomalies', 'sum': 'alerts'}
@@ -0,0 +1,244 @@
+"""
+Snapshot of the stats of a portfolio.
+The monitor computes the stats of every symbol of the portfolio after the
+market closes and writes them to a single NumPy file, with one record per
+symbol sorted by symbol. The bot memory-maps the file and answers the stats
+commands of those symbols with a lookup, until the next session closes.
+"""
+import datetime
+import os
+from pathlib import Path
+from typing import Callable, NamedTuple, Optional, cast
+
+import numpy as np
+
+from src.analyst import analyst
+from src.analyst import portfolio as portfolio_analyst
+from src.analyst.portfolio import PortfolioStats
+from src.common import logs
+from src.common.market import MARKET_CLOSE_UTC, get_last_session_date
+from src.common.types import (
+    ANNUAL_PERIODS, AnnualPriceStats, AnnualStats, ClosePrice, Period,
+    PriceStats, ReportInPeriod, SymbolReport
+)
+
+logger = logs.get_logger(__name__)
+
+# a new version is written to a new file, old snapshots are ignored
+SNAPSHOT_VERSION = 1
+
+
+class SymbolStats(NamedTuple):
+    current_price: ClosePrice
+    price_stats: AnnualPriceStats
+    return_stats: AnnualStats
+    volatility_stats: AnnualStats
+    report: SymbolReport
+
+
+def write(directory: str, portfolio: PortfolioStats) -> Path:
+    """
+    Replace the snapshot of the directory with the stats of the portfolio.
+    :return: The path of the snapshot.
+    """
+    records = _get_records(portfolio)
+    path = get_path(directory)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # write to a temporary file first, readers never see a partial file
+    temporary_path = path.with_suffix('.tmp')
+    with open(temporary_path, 'wb') as file:
+        np.save(file, records)
+    os.replace(temporary_path, path)
+    return path
+
+
+def get_path(directory: str) -> Path:
+    return Path(directory) / f'stats-v{SNAPSHOT_VERSION}.npy'
+
+
+class Snapshot:
+    """
+    Reader of the snapshot of a directory. The file is memory-mapped once,
+    and again only when the monitor replaces it.
+    """
+
+    def __init__(self, directory: str,
+                 market_close: datetime.time = MARKET_CLOSE_UTC,
+                 clock: Callable[[], datetime.datetime] =
+                 datetime.datetime.utcnow) -> None:
+        """
+        :param directory: Directory of the snapshot written by the monitor.
+        :param market_close: Time of the market close in UTC.
+        :param clock: Function that returns the current UTC datetime.
+        """
+        self.path = get_path(directory)
+        self.market_close = market_close
+        self.clock = clock
+        # identity (inode and modification time) and records of the mapped
+        # file, every snapshot is written to a new inode
+        self.mapped: tuple[tuple[int, int], Optional[np.ndarray]] = \
+            ((0, 0), None)
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, symbol: str, now: Optional[datetime.datetime] = None
+            ) -> Optional[SymbolStats]:
+        """
+        Return the stats of a symbol, or None if the symbol is not in the
+        snapshot or its stats do not contain the last closed session.
+        :param now: Current UTC datetime, defaults to the clock.
+        """
+        record = self._get_record(symbol.upper())
+        if record is None:
+            self.misses += 1
+            return None
+
+        now = now or self.clock()
+        last_session_date = get_last_session_date(now, self.market_close)
+        if record['date'] < last_session_date.toordinal():
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return _get_symbol_stats(record)
+
+    def summary(self) -> str:
+        return f'snapshot: {self.hits} hits, {self.misses} misses'
+
+    # private methods
+
+    def _get_record(self, symbol: str) -> Optional[np.void]:
+        records = self._get_records()
+        if records is None or len(records) == 0:
+            return None
+
+        symbols = records['symbol']
+        row = int(np.searchsorted(symbols, symbol))
+        if row == len(records) or symbols[row] != symbol:
+            return None
+        # a row of a structured array is a record
+        return cast(np.void, records[row])
+
+    def _get_records(self) -> Optional[np.ndarray]:
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+
+        identity = (stat.st_ino, stat.st_mtime_ns)
+        mapped_identity, records = self.mapped
+        if identity != mapped_identity:
+            records = self._load()
+            self.mapped = (identity, records)
+        return records
+
+    def _load(self) -> Optional[np.ndarray]:
+        records = np.load(self.path, mmap_mode='r')
+        if records.dtype.names != _FIELDS:
+            logger.error(f'_load: unknown format of {self.path}')
+            return None
+        logger.info(f'_load: mapped {len(records)} symbols of {self.path}')
+        return records
+
+
+# private functions
+
+
+_PERIODS = len(Period)
+_FIELDS = (
+    'symbol', 'date', 'close', 'min_date', 'min_close', 'max_date',
+    'max_close', 'difference', 'max_negative_change', 'max_positive_change',
+    'change', 'volatility',
+)
+
+
+def _get_dtype(symbol_length: int) -> np.dtype:
+    # every field but the symbol and the current price has a value per period
+    return np.dtype([
+        ('symbol', f'U{max(symbol_length, 1)}'),
+        ('date', 'i4'),
+        ('close', 'f8'),
+        ('min_date', 'i4', (_PERIODS,)),
+        ('min_close', 'f8', (_PERIODS,)),
+        ('max_date', 'i4', (_PERIODS,)),
+        ('max_close', 'f8', (_PERIODS,)),
+        ('difference', 'f8', (_PERIODS,)),
+        ('max_negative_change', 'f8', (_PERIODS,)),
+        ('max_positive_change', 'f8', (_PERIODS,)),
+        ('change', 'f8', (_PERIODS,)),
+        ('volatility', 'f8', (_PERIODS,)),
+    ])
+
+
+def _get_records(portfolio: PortfolioStats) -> np.ndarray:
+    prices, stats = portfolio
+    symbols = [symbol.upper() for symbol in prices.symbols]
+    columns = np.arange(len(symbols))
+    min_date = prices.dates[stats.min_row, columns]
+    min_close = prices.close[stats.min_row, columns]
+    max_date = prices.dates[stats.max_row, columns]
+    max_close = prices.close[stats.max_row, columns]
+    volatility = np.array([
+        analyst.get_volatility(stats.log_return_std[position], period)
+        for position, period in enumerate(Period)
+    ])
+
+    records = np.zeros(len(symbols),
+                       _get_dtype(max(map(len, symbols), default=1)))
+    records['symbol'] = symbols
+    records['date'] = prices.dates[0]
+    records['close'] = prices.close[0]
+    records['min_date'] = min_date.T
+    records['min_close'] = min_close.T
+    records['max_date'] = max_date.T
+    records['max_close'] = max_close.T
+    # like analyst.get_price_difference, from the oldest to the newest price
+    with np.errstate(invalid='ignore', divide='ignore'):
+        records['difference'] = np.where(min_date <= max_date,
+                                         max_close / min_close - 1,
+                                         min_close / max_close - 1).T
+    records['max_negative_change'] = stats.max_negative_change.T
+    records['max_positive_change'] = stats.max_positive_change.T
+    records['change'] = \
+        portfolio_analyst.get_report(portfolio).change_in_period.T
+    records['volatility'] = volatility.T
+    return np.sort(records, order='symbol')
+
+
+def _get_symbol_stats(record: np.void) -> SymbolStats:
+    # the values of the record are numpy scalars, the stats hold Python ones
+    min_prices = _get_close_prices(record['min_date'], record['min_close'])
+    max_prices = _get_close_prices(record['max_date'], record['max_close'])
+    changes = [float(change) for change in record['change']]
+    close = float(record['close'])
+    price_stats = [
+        PriceStats(min_prices[position], max_prices[position],
+                   float(record['difference'][position]),
+                   float(record['max_negative_change'][position]),
+                   float(record['max_positive_change'][position]))
+        for position in _ANNUAL_POSITIONS
+    ]
+    reports = [
+        ReportInPeriod(period, min_prices[position], max_prices[position],
+                       changes[position])
+        for position, period in enumerate(Period)
+    ]
+    return SymbolStats(
+        current_price=ClosePrice.from_ordinal(int(record['date']), close),
+        price_stats=AnnualPriceStats(*price_stats),
+        return_stats=AnnualStats(
+            *(changes[position] for position in _ANNUAL_POSITIONS)),
+        volatility_stats=AnnualStats(
+            *(float(record['volatility'][position])
+              for position in _ANNUAL_POSITIONS)),
+        report=SymbolReport(str(record['symbol']), close, *reports),
+    )
+
+
+def _get_close_prices(dates: np.ndarray,
+                      close: np.ndarray) -> list[ClosePrice]:
+    return [ClosePrice.from_ordinal(date, value)
+            for date, value in zip(dates.tolist(), close.tolist())]
+
+
+_ANNUAL_POSITIONS = [analyst.get_position(period) for period in ANNUAL_PERIODS]
@@ -0,0 +1,59 @@
+import datetime
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from src.analyst import analyst, bounds, portfolio
+from src.common.testing import get_random_prices
+
+
+class BoundsTests(unittest.TestCase):
+
+    def setUp(self):
+        self.today = datetime.date(2022, 8, 1)
+        amzn = pd.read_csv('src/analyst/test_files/AMZN_from_stockbot.csv')
+        self.symbols = ['AMZN', 'SHORT', 'RANDOM']
+        self.frames = [
+            amzn,
+            amzn[:40].copy(),  # shorter history than the other symbols
+            get_random_prices(300, decimals=1),
+        ]
+        self.bounds = bounds.compute(
+            portfolio.align(self.symbols, self.frames))
+
+    def test_get_price_anomalies_return_same_anomalies_as_analyst(self):
+        # arrange
+        rng = np.random.default_rng(7)
+        candidates = np.concatenate((
+            np.round(rng.uniform(80, 200, 200), 1),
+            # prices equal to the bounds
+            self.bounds.min_close.ravel(),
+            self.bounds.max_close.ravel(),
+        ))
+        # act and assert
+        for price in candidates:
+            prices = np.full(len(self.symbols), price)
+            anomalies = bounds.get_price_anomalies(self.bounds, prices,
+                                                   self.today)
+            expected_anomalies = self._get_expected_anomalies(price)
+            self.assertEqual(anomalies, expected_anomalies, f'price {price}')
+
+    def test_get_breaches_given_nan_prices_return_no_breaches(self):
+        # arrange
+        prices = np.full(len(self.symbols), np.nan)
+        # act
+        breaches = bounds.get_breaches(self.bounds, prices)
+        # assert
+        self.assertEqual(breaches.tolist(), [-1, -1, -1])
+
+    def _get_expected_anomalies(self, price: float) -> dict:
+        expected_anomalies = {}
+        for symbol, frame in zip(self.symbols, self.frames):
+            today = pd.DataFrame({'Date': [self.today.isoformat()],
+                                  'Close': [price]})
+            prices = pd.concat([today, frame], ignore_index=True)
+            anomaly = analyst.get_price_anomaly(prices)
+            if anomaly:
+                expected_anomalies[symbol] = anomaly
+        return expected_anomalies
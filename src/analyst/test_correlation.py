@@ -0,0 +1,72 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from src.analyst import analyst, correlation, portfolio
+from src.common.testing import get_random_prices
+from src.common.types import ANNUAL_PERIODS, Period
+
+
+class CorrelationTests(unittest.TestCase):
+
+    def test_compute_given_different_calendars_same_matrices_as_pandas(self):
+        # arrange
+        frames = {'AAA': get_random_prices(300, seed=1),
+                  'BBB': get_random_prices(300, seed=2, holidays=0.1),
+                  'CCC': get_random_prices(40, seed=3)}
+        prices = portfolio.align(list(frames), list(frames.values()))
+        # the returns of each date, NaN where a symbol did not trade
+        returns = pd.concat(
+            [frame.set_index('Date').log_return for frame in frames.values()],
+            axis=1, keys=list(frames)).sort_index(ascending=False)
+        # act
+        correlations = correlation.compute(prices)
+        # assert
+        windows = analyst.get_windows()
+        for period_correlation in correlations:
+            window = windows[analyst.get_position(period_correlation.period)]
+            period_returns = returns[:window]
+            np.testing.assert_allclose(period_correlation.covariance,
+                                       period_returns.cov(), atol=1e-12)
+            np.testing.assert_allclose(period_correlation.correlation,
+                                       period_returns.corr(), atol=1e-12)
+
+    def test_compute_return_volatility_of_the_portfolio(self):
+        # arrange
+        frames = [get_random_prices(300, seed=1),
+                  get_random_prices(300, seed=2)]
+        prices = portfolio.align(['AAA', 'BBB'], frames)
+        weights = np.array([0.25, 0.75])
+        # act
+        correlations = correlation.compute(prices, [Period.QUARTER], weights)
+        # assert
+        daily_returns = sum(weight * frame.log_return[:63]
+                            for weight, frame in zip(weights, frames))
+        self.assertEqual(
+            correlations[0].volatility,
+            analyst.get_volatility(daily_returns.std(), Period.QUARTER))
+
+    def test_compute_given_short_history_return_nan(self):
+        # arrange
+        frames = [get_random_prices(300, seed=1),
+                  get_random_prices(2, seed=2)]
+        prices = portfolio.align(['AAA', 'BBB'], frames)
+        # act
+        correlations = correlation.compute(prices, ANNUAL_PERIODS)
+        # assert
+        # the second symbol has a single return
+        self.assertTrue(np.isnan(correlations[0].correlation[0, 1]))
+        self.assertTrue(np.isnan(correlations[0].covariance[1, 1]))
+        self.assertEqual(correlations[0].correlation[0, 0], 1.0)
+
+    def test_get_most_correlated_return_pairs_from_highest(self):
+        # arrange
+        matrix = np.array([[1.0, 0.2, 0.9, np.nan],
+                           [0.2, 1.0, -0.5, np.nan],
+                           [0.9, -0.5, 1.0, np.nan],
+                           [np.nan, np.nan, np.nan, np.nan]])
+        # act
+        pairs = correlation.get_most_correlated(matrix, 4)
+        # assert
+        self.assertEqual(pairs, [(0, 2), (0, 1), (1, 2)])
@@ -0,0 +1,125 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.analyst import analyst
+from src.analyst.detector import AnomalyDetector, SymbolDetector
+from src.common.types import Period
+
+
+class AnomalyDetectorTests(unittest.TestCase):
+
+    def setUp(self):
+        self.history = self._get_random_history(400)
+
+    def test_detect_given_new_sessions_return_same_anomaly_as_analyst(self):
+        # arrange
+        detector = AnomalyDetector()
+        # act and assert
+        for last_row in range(260, len(self.history)):
+            prices = self._get_prices(self.history, last_row)
+            anomaly = detector.detect('RANDOM', prices)
+            self.assertEqual(anomaly, analyst.get_price_anomaly(prices),
+                             f'session {last_row}')
+
+        self.assertEqual(detector.rebuilds, 1)
+
+    def test_detect_given_short_history_return_same_anomaly_as_analyst(self):
+        # arrange
+        detector = AnomalyDetector()
+        # act and assert
+        for last_row in range(5, 60):
+            prices = self._get_prices(self.history, last_row)
+            anomaly = detector.detect('RANDOM', prices)
+            self.assertEqual(anomaly, analyst.get_price_anomaly(prices),
+                             f'session {last_row}')
+
+    def test_detect_given_new_min_return_year_anomaly(self):
+        # arrange
+        history = self.history.copy()
+        history.iloc[-1, history.columns.get_loc('Close')] = 1.0
+        prices = self._get_prices(history, len(history) - 1)
+        # act
+        anomaly = AnomalyDetector().detect('RANDOM', prices)
+        # assert
+        self.assertEqual(anomaly.period, Period.YEAR)
+        self.assertTrue(anomaly.is_new_min())
+
+    def test_detect_given_adjusted_history_rebuilds_the_state(self):
+        # arrange
+        detector = AnomalyDetector()
+        detector.detect('RANDOM', self._get_prices(self.history, 300))
+        adjusted_history = self.history.copy()
+        adjusted_history['Close'] *= 0.98  # a dividend adjusts every close
+        prices = self._get_prices(adjusted_history, 301)
+        # act
+        anomaly = detector.detect('RANDOM', prices)
+        # assert
+        self.assertEqual(detector.rebuilds, 2)
+        self.assertEqual(anomaly, analyst.get_price_anomaly(prices))
+
+    def test_detect_given_missing_sessions_rebuilds_the_state(self):
+        # arrange
+        detector = AnomalyDetector()
+        detector.detect('RANDOM', self._get_prices(self.history[::2], 150))
+        prices = self._get_prices(self.history, 350)
+        # act
+        anomaly = detector.detect('RANDOM', prices)
+        # assert
+        self.assertEqual(detector.rebuilds, 2)
+        self.assertEqual(anomaly, analyst.get_price_anomaly(prices))
+
+    def test_save_given_saved_state_next_run_updates_without_rebuild(self):
+        with tempfile.TemporaryDirectory() as directory:
+            # arrange
+            path = str(Path(directory) / 'detector.json')
+            detector = AnomalyDetector(path)
+            detector.detect('RANDOM', self._get_prices(self.history, 300))
+            detector.save()
+            next_detector = AnomalyDetector(path)
+            prices = self._get_prices(self.history, 301)
+            # act
+            anomaly = next_detector.detect('RANDOM', prices)
+            # assert
+            self.assertEqual(next_detector.rebuilds, 0)
+            self.assertEqual(next_detector.updates, 1)
+            self.assertEqual(anomaly, analyst.get_price_anomaly(prices))
+
+    def test_push_given_many_sessions_keep_only_the_longest_window(self):
+        # arrange
+        detector = SymbolDetector()
+        # act
+        for ordinal in range(1_000):
+            detector.push(ordinal, float(ordinal % 7))
+        # assert
+        self.assertEqual(len(detector.dates), 252)
+        for window in detector.windows.values():
+            self.assertLessEqual(len(window.minimum), window.size)
+            self.assertLessEqual(len(window.maximum), window.size)
+
+    @staticmethod
+    def _get_prices(history: pd.DataFrame, last_row: int) -> pd.DataFrame:
+        """
+        Return the prices of the 12 months before the given row, in
+        descending order, like the downloader.
+        """
+        last_date = history.Date.iloc[last_row]
+        first_date = last_date - pd.DateOffset(months=12)
+        prices = history[(history.Date > first_date)
+                         & (history.Date <= last_date)]
+        prices = prices.iloc[::-1].reset_index(drop=True)
+        previous = prices.Close.shift(-1)
+        prices['change'] = (prices.Close - previous) / previous
+        prices['log_return'] = np.log(prices.Close / previous)
+        return prices
+
+    @staticmethod
+    def _get_random_history(size: int) -> pd.DataFrame:
+        rng = np.random.default_rng(12)
+        # rounded prices to have ties between min and max prices
+        close = np.round(100 + np.cumsum(rng.normal(0, 1, size)), 0)
+        dates = pd.bdate_range('2021-01-04', periods=size)
+        return pd.DataFrame({'Date': dates, 'Close': close})
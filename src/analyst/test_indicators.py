@@ -0,0 +1,156 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from src.analyst import analyst, indicators, portfolio
+from src.analyst.indicators import IndicatorCache, IndicatorState, Indicators
+from src.common.types import (
+    ClosePrice, Indicator, Period, get_date, get_ordinals
+)
+
+
+class IndicatorsTests(unittest.TestCase):
+
+    def setUp(self):
+        self.prices = pd.read_csv('src/analyst/test_files/AMZN_from_stockbot.csv')
+
+    def test_get_indicators_return_same_values_as_pandas(self):
+        # arrange
+        close = self.prices.Close[::-1].reset_index(drop=True)
+        change = close.diff()[1:]
+        average_gain = change.clip(lower=0).ewm(alpha=1 / 14,
+                                                adjust=False).mean()
+        average_loss = (-change).clip(lower=0).ewm(alpha=1 / 14,
+                                                   adjust=False).mean()
+        moving_average = close.rolling(22).mean().iloc[-1]
+        moving_std = close.rolling(22).std(ddof=0).iloc[-1]
+        # act
+        values = indicators.get_indicators(self.prices)
+        # assert
+        self.assertAlmostEqual(values.moving_average, moving_average)
+        self.assertAlmostEqual(
+            values.exponential_average,
+            close.ewm(span=22, adjust=False).mean().iloc[-1])
+        self.assertAlmostEqual(values.lower_band,
+                               moving_average - 2 * moving_std)
+        self.assertAlmostEqual(values.upper_band,
+                               moving_average + 2 * moving_std)
+        self.assertAlmostEqual(
+            values.rsi,
+            100 - 100 / (1 + average_gain.iloc[-1] / average_loss.iloc[-1]))
+        self.assertAlmostEqual(values.drawdown,
+                               close.iloc[-1] / close.max() - 1)
+        self.assertAlmostEqual(values.max_drawdown,
+                               (close / close.cummax() - 1).min())
+
+    def test_get_indicators_given_short_history_return_nan(self):
+        # act
+        values = indicators.get_indicators(self.prices[:15])
+        # assert
+        self.assertTrue(np.isnan(values.moving_average))
+        self.assertTrue(np.isnan(values.exponential_average))
+        self.assertTrue(np.isnan(values.upper_band))
+        self.assertFalse(np.isnan(values.rsi))
+        self.assertTrue(np.isnan(indicators.get_indicators(self.prices[:14]).rsi))
+
+    def test_compute_given_many_symbols_return_same_values_as_each_symbol(self):
+        # arrange
+        frames = [self.prices, self.prices[:30], self.prices[100:], self.prices[:3]]
+        prices = portfolio.align(['A', 'B', 'C', 'D'], frames)
+        # act
+        values = indicators.compute(prices.close, prices.lengths)
+        # assert
+        for column, frame in enumerate(frames):
+            expected_values = indicators.get_indicators(frame)
+            for value, expected_value in zip(values, expected_values):
+                np.testing.assert_allclose(value[column], expected_value)
+
+    def test_push_given_new_sessions_return_same_values_as_compute(self):
+        # arrange
+        ordinals = get_ordinals(self.prices.Date)
+        closes = self.prices.Close.to_numpy(dtype=float)
+        state = IndicatorState(ordinals[240:], closes[240:])
+        # act and assert
+        for row in range(239, -1, -1):
+            state.push(int(ordinals[row]), float(closes[row]))
+            expected_values = indicators.compute(closes[row:])
+            for value, expected_value in zip(state.get_indicators(),
+                                             expected_values):
+                np.testing.assert_allclose(value, expected_value)
+
+    def test_get_given_new_sessions_update_the_state(self):
+        # arrange
+        cache = IndicatorCache()
+        cache.get('AMZN', self.prices[2:])
+        # act
+        values = cache.get('amzn', self.prices)
+        # assert
+        self.assertEqual(cache.updates, 1)
+        self.assertEqual(cache.rebuilds, 1)
+        # the history is one year, the oldest rows are not in the prices but
+        # they do not change the exponential averages
+        for value, expected_value in zip(values,
+                                         indicators.get_indicators(self.prices)):
+            np.testing.assert_allclose(value, expected_value, rtol=1e-9)
+
+    def test_get_given_adjusted_history_rebuild_the_state(self):
+        # arrange
+        cache = IndicatorCache()
+        cache.get('AMZN', self.prices[1:])
+        adjusted_prices = self.prices.copy()
+        adjusted_prices['Close'] *= 0.98  # a dividend adjusts every close
+        # act
+        values = cache.get('AMZN', adjusted_prices)
+        # assert
+        self.assertEqual(cache.rebuilds, 2)
+        self.assertEqual(values, indicators.get_indicators(adjusted_prices))
+
+    def test_get_anomaly_given_close_above_the_bands_return_max_anomaly(self):
+        # arrange
+        current_price = ClosePrice('2022-07-29', 130.0)
+        values = Indicators(*np.array([120.0, 121.0, 110.0, 129.0, 50.0,
+                                       -0.1, -0.2]))
+        # act
+        anomaly = indicators.get_anomaly(
+            current_price, values, [Indicator.RSI, Indicator.BOLLINGER])
+        # assert
+        self.assertEqual(anomaly.indicator, Indicator.BOLLINGER)
+        self.assertEqual(anomaly.period, Period.MONTH)
+        self.assertEqual(anomaly.min_price, ClosePrice('2022-07-29', 110.0))
+        self.assertEqual(anomaly.max_price, ClosePrice('2022-07-29', 129.0))
+        self.assertFalse(anomaly.is_new_min())
+        self.assertIsNone(indicators.get_anomaly(current_price, values,
+                                                 [Indicator.RSI]))
+
+    def test_get_price_anomaly_given_triggers_return_indicator_anomalies(self):
+        # arrange
+        history = self._get_random_history(400)
+        anomalies = []
+        # act
+        for last_row in range(260, len(history)):
+            prices = history[last_row::-1].reset_index(drop=True)
+            anomaly = analyst.get_price_anomaly(
+                prices, triggers=[Indicator.BOLLINGER, Indicator.RSI])
+            anomalies.append(anomaly)
+            # assert
+            if analyst.get_price_anomaly(prices) is not None:
+                self.assertEqual(anomaly, analyst.get_price_anomaly(prices))
+            elif anomaly is not None:
+                self.assertEqual(anomaly.current_price.date,
+                                 get_date(prices.Date[0]))
+        indicator_anomalies = {anomaly.indicator for anomaly in anomalies
+                               if anomaly is not None}
+        self.assertEqual(indicator_anomalies, {None, Indicator.BOLLINGER})
+
+    @staticmethod
+    def _get_random_history(length: int) -> pd.DataFrame:
+        rng = np.random.default_rng(7)
+        history = pd.DataFrame({
+            'Date': pd.bdate_range(end='2022-07-29', periods=length),
+            'Close': 100 * np.exp(np.cumsum(rng.normal(0, 0.02, length))),
+        })
+        # the history is in ascending order
+        history['change'] = history.Close.pct_change()
+        history['log_return'] = np.log(history.Close / history.Close.shift())
+        return history
@@ -0,0 +1,69 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from src.analyst import kernel
+
+
+class KernelTests(unittest.TestCase):
+
+    def test_compute_return_same_stats_as_pandas_slices(self):
+        # arrange
+        prices = pd.read_csv('src/analyst/test_files/AMZN_from_stockbot.csv')
+        windows = np.array([6, 22, 252, 500])
+        # act
+        stats = kernel.compute(prices.Close.to_numpy(),
+                               prices.change.to_numpy(),
+                               prices.log_return.to_numpy(),
+                               windows)
+        # assert
+        for position, window in enumerate(windows):
+            close = prices.Close[:window]
+            self.assertEqual(stats.min_row[position], close.idxmin())
+            self.assertEqual(stats.max_row[position], close.idxmax())
+            self.assertEqual(stats.initial_row[position],
+                             min(window, len(prices)) - 1)
+            self.assertEqual(stats.max_negative_change[position],
+                             prices.change[:window].min())
+            self.assertEqual(stats.max_positive_change[position],
+                             prices.change[:window].max())
+            self.assertAlmostEqual(stats.log_return_std[position],
+                                   prices.log_return[:window].std(),
+                                   places=12)
+
+    def test_compute_given_windows_per_symbol_return_their_stats(self):
+        # arrange
+        close = np.array([[3.0, 1.0], [1.0, 2.0], [2.0, 3.0], [0.5, np.nan]])
+        change = np.full(close.shape, np.nan)
+        windows = np.array([[2, 4], [4, 1]])
+        # act
+        stats = kernel.compute(close, change, change, windows,
+                               np.array([4, 3]))
+        # assert
+        self.assertEqual(stats.initial_row.tolist(), [[1, 2], [3, 0]])
+        self.assertEqual(stats.min_row.tolist(), [[1, 0], [3, 0]])
+        self.assertEqual(stats.max_row.tolist(), [[0, 2], [0, 0]])
+
+    def test_compute_given_ties_return_first_occurrence(self):
+        # arrange
+        close = np.array([2.0, 1.0, 3.0, 1.0, 3.0])
+        change = np.full(len(close), np.nan)
+        # act
+        stats = kernel.compute(close, change, change, np.array([5]))
+        # assert
+        self.assertEqual(stats.min_row[0], 1)
+        self.assertEqual(stats.max_row[0], 2)
+
+    def test_compute_given_nan_values_skip_them(self):
+        # arrange
+        close = np.array([np.nan, 2.0, 1.0, np.nan])
+        log_return = np.array([np.nan, 0.1, np.nan, 0.3])
+        # act
+        stats = kernel.compute(close, log_return, log_return, np.array([1, 4]))
+        # assert
+        self.assertEqual(stats.min_row[1], 2)
+        self.assertEqual(stats.max_row[1], 1)
+        self.assertTrue(np.isnan(stats.log_return_std[0]))
+        self.assertAlmostEqual(stats.log_return_std[1],
+                               pd.Series(log_return).std(), places=12)
@@ -0,0 +1,70 @@
+import unittest
+
+import numpy as np
+
+from src.analyst import portfolio
+from src.analyst.parallel import ParallelAnalyst
+from src.common import periods
+from src.common.testing import get_random_prices
+from src.common.types import Indicator
+
+
+class ParallelAnalystTests(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        # the pool is started once for all the tests
+        cls.analyst = ParallelAnalyst(workers=2, min_symbols=1)
+        frames = [get_random_prices(length, seed, walk=True)
+                  for seed, length in enumerate([300, 40, 260, 1, 252])]
+        cls.prices = portfolio.align([f'S{i}' for i in range(len(frames))],
+                                     frames)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.analyst.close()
+
+    def test_get_price_anomalies_return_same_anomalies_as_portfolio(self):
+        # arrange
+        triggers = [Indicator.BOLLINGER, Indicator.RSI]
+        expected_anomalies = portfolio.get_price_anomalies(
+            portfolio.compute(self.prices), triggers)
+        # act
+        anomalies = self.analyst.get_price_anomalies(self.prices, triggers)
+        # assert
+        self.assertEqual(anomalies, expected_anomalies)
+        self.assertIsNotNone(self.analyst._executor)
+
+    def test_get_report_return_same_report_as_portfolio(self):
+        # arrange
+        extra_periods = periods.parse_periods('ytd,3y')
+        expected_report = portfolio.get_report(
+            portfolio.compute(self.prices, extra_periods), extra_periods)
+        # act
+        report = self.analyst.get_report(self.prices, extra_periods)
+        # assert
+        self.assertEqual(report.symbols, expected_report.symbols)
+        self.assertEqual(report.periods, expected_report.periods)
+        np.testing.assert_array_equal(report.current_price,
+                                      expected_report.current_price)
+        np.testing.assert_array_equal(report.change_in_period,
+                                      expected_report.change_in_period)
+
+    def test_get_symbol_reports_return_same_reports_as_portfolio(self):
+        # arrange
+        expected_reports = portfolio.get_symbol_reports(
+            portfolio.compute(self.prices))
+        # act
+        reports = self.analyst.get_symbol_reports(self.prices)
+        # assert
+        self.assertEqual(reports, expected_reports)
+
+    def test_get_price_anomalies_given_small_portfolio_does_not_start_pool(self):
+        # arrange
+        analyst = ParallelAnalyst(workers=2, min_symbols=10)
+        # act
+        anomalies = analyst.get_price_anomalies(self.prices)
+        # assert
+        self.assertEqual(anomalies, portfolio.get_price_anomalies(
+            portfolio.compute(self.prices)))
+        self.assertIsNone(analyst._executor)
@@ -0,0 +1,132 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from src.analyst import analyst, portfolio
+from src.common import periods
+from src.common.testing import get_random_prices
+from src.common.types import Indicator
+
+
+class PortfolioTests(unittest.TestCase):
+
+    def setUp(self):
+        amzn = pd.read_csv('src/analyst/test_files/AMZN_from_stockbot.csv')
+        self.symbols = ['AMZN', 'SHORT', 'LOW', 'RANDOM']
+        self.frames = [
+            amzn,
+            amzn[:40].copy(),  # shorter history than the other symbols
+            self._with_current_close(amzn, 1.0),  # new 12mo min
+            get_random_prices(300, decimals=1),
+        ]
+
+    def test_get_price_anomalies_return_same_anomalies_as_analyst(self):
+        # arrange
+        portfolio_stats = portfolio.compute(
+            portfolio.align(self.symbols, self.frames))
+        # act
+        anomalies = portfolio.get_price_anomalies(portfolio_stats)
+        # assert
+        expected_anomalies = [analyst.get_price_anomaly(frame)
+                              for frame in self.frames]
+        self.assertEqual(anomalies, expected_anomalies)
+        self.assertIsNotNone(anomalies[2])
+
+    def test_get_price_anomalies_given_triggers_return_same_anomalies_as_analyst(
+            self):
+        # arrange
+        triggers = [Indicator.RSI, Indicator.BOLLINGER]
+        # a rally of 20 sessions, then a small drop below the 1mo max
+        rally = get_random_prices(300, decimals=1)
+        rally.loc[1:20, 'Close'] = np.arange(130.0, 110.0, -1.0)
+        frames = [*self.frames, self._with_current_close(rally, 129.9)]
+        portfolio_stats = portfolio.compute(
+            portfolio.align([*self.symbols, 'RALLY'], frames))
+        # act
+        anomalies = portfolio.get_price_anomalies(portfolio_stats, triggers)
+        # assert
+        expected_anomalies = [analyst.get_price_anomaly(frame, triggers=triggers)
+                              for frame in frames]
+        self.assertEqual(anomalies, expected_anomalies)
+        self.assertEqual(anomalies[-1].indicator, Indicator.RSI)
+        self.assertIsNone(anomalies[-2])
+
+    def test_get_symbol_reports_return_same_reports_as_analyst(self):
+        # arrange
+        portfolio_stats = portfolio.compute(
+            portfolio.align(self.symbols, self.frames))
+        # act
+        reports = portfolio.get_symbol_reports(portfolio_stats)
+        # assert
+        expected_reports = [analyst.get_symbol_report(symbol, frame)
+                            for symbol, frame in zip(self.symbols, self.frames)]
+        self.assertEqual(reports, expected_reports)
+
+    def test_get_stats_return_same_stats_as_analyst(self):
+        # arrange
+        portfolio_stats = portfolio.compute(
+            portfolio.align(self.symbols, self.frames))
+        # act
+        current_prices = portfolio.get_current_prices(portfolio_stats)
+        price_stats = portfolio.get_price_stats(portfolio_stats)
+        return_stats = portfolio.get_return_stats(portfolio_stats)
+        volatility_stats = portfolio.get_volatility_stats(portfolio_stats)
+        # assert
+        self.assertEqual(current_prices, [analyst.get_current_price(frame)
+                                          for frame in self.frames])
+        self.assertEqual(price_stats, [analyst.get_price_stats(frame)
+                                       for frame in self.frames])
+        self.assertEqual(return_stats, [analyst.get_return_stats(frame)
+                                        for frame in self.frames])
+        self.assertEqual(volatility_stats, [analyst.get_volatility_stats(frame)
+                                            for frame in self.frames])
+        # plain numbers, like the stats of the analyst
+        self.assertEqual({type(value) for stats in return_stats + volatility_stats
+                          for value in stats}, {float})
+
+    def test_compute_given_empty_portfolio_return_no_results(self):
+        # arrange
+        portfolio_stats = portfolio.compute(portfolio.align([], []))
+        # act and assert
+        self.assertEqual(portfolio.get_price_anomalies(portfolio_stats), [])
+        self.assertEqual(portfolio.get_symbol_reports(portfolio_stats), [])
+
+    def test_compute_given_extra_periods_add_them_after_the_periods(self):
+        # arrange
+        prices = portfolio.align(self.symbols, self.frames)
+        extra_periods = periods.parse_periods('ytd,9mo,30d')
+        expected_stats = portfolio.compute(prices).stats
+        # act
+        portfolio_stats = portfolio.compute(prices, extra_periods)
+        report = portfolio.get_report(portfolio_stats, extra_periods)
+        # assert
+        stats = portfolio_stats.stats
+        periods_count = len(expected_stats.min_row)
+        for field, expected_field in zip(stats, expected_stats):
+            np.testing.assert_array_equal(field[:periods_count], expected_field)
+        self.assertEqual(report.periods[periods_count:], ['ytd', '9mo', '30d'])
+        for column, frame in enumerate(self.frames):
+            # the sessions of the year, and the last session of 2021
+            window = (frame.Date > '2021-12-31').sum() + 1
+            close = frame.Close[:window]
+            self.assertEqual(stats.min_row[periods_count, column],
+                             close.idxmin())
+            self.assertEqual(stats.max_row[periods_count, column],
+                             close.idxmax())
+            self.assertEqual(report.change_in_period[periods_count, column],
+                             close.iloc[0] / close.iloc[-1] - 1)
+
+    def test_align_given_empty_prices_raise_an_exception(self):
+        # act and assert
+        self.assertRaises(ValueError, portfolio.align,
+                          ['AAAA'], [pd.DataFrame([])])
+
+    @staticmethod
+    def _with_current_close(prices: pd.DataFrame, close: float):
+        prices = prices.copy()
+        prices.loc[0, 'Close'] = close
+        previous_close = prices.Close[1]
+        prices.loc[0, 'change'] = (close - previous_close) / previous_close
+        prices.loc[0, 'log_return'] = np.log(close / previous_close)
+        return prices
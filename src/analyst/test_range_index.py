@@ -0,0 +1,81 @@
+import gc
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from src.analyst import analyst, range_index
+from src.analyst.range_index import RangeIndex
+from src.common.types import ClosePrice
+
+
+class RangeIndexTests(unittest.TestCase):
+
+    def test_get_rows_return_same_rows_as_pandas(self):
+        # arrange
+        rng = np.random.default_rng(42)
+        close = np.round(rng.uniform(0, 5, 100))  # forces ties
+        close[rng.random(100) < 0.1] = np.nan
+        index = RangeIndex(np.arange(100), close)
+        series = pd.Series(close)
+        # act and assert
+        for start in range(100):
+            for end in range(start + 1, 101):
+                window = series[start:end]
+                if window.isna().all():
+                    continue
+                self.assertEqual(index.get_min_rows(start, end),
+                                 window.idxmin())
+                self.assertEqual(index.get_max_rows(start, end),
+                                 window.idxmax())
+
+    def test_get_rows_given_many_symbols_return_a_row_per_symbol(self):
+        # arrange
+        close = np.array([[3.0, 1.0], [1.0, 2.0], [2.0, 3.0], [0.5, np.nan]])
+        index = RangeIndex(np.zeros(close.shape, dtype=int), close)
+        # act
+        min_rows = index.get_min_rows(np.array([[0, 1], [1, 0]]),
+                                      np.array([[3, 3], [4, 1]]))
+        max_rows = index.get_max_rows(1, np.array([4, 3]))
+        # assert
+        self.assertEqual(min_rows.tolist(), [[1, 1], [3, 0]])
+        self.assertEqual(max_rows.tolist(), [2, 2])
+
+    def test_get_price_return_close_price_of_the_range(self):
+        # arrange
+        prices = pd.read_csv('src/analyst/test_files/AMZN_from_stockbot.csv')
+        index = range_index.get_index(prices)
+        # act
+        min_price = index.get_min_price(10, 30)
+        max_price = index.get_max_price(10, 30)
+        # assert
+        window = prices[10:30]
+        self.assertEqual(min_price, ClosePrice(
+            window.Date[window.Close.idxmin()], window.Close.min()))
+        self.assertEqual(max_price, ClosePrice(
+            window.Date[window.Close.idxmax()], window.Close.max()))
+
+    def test_get_index_keep_the_index_while_the_prices_live(self):
+        # arrange
+        prices = pd.read_csv('src/analyst/test_files/AMZN_from_stockbot.csv')
+        self.assertIsNone(range_index.find_index(prices))
+        # act
+        index = range_index.get_index(prices)
+        # assert
+        self.assertIs(range_index.get_index(prices), index)
+        self.assertIs(range_index.find_index(prices), index)
+        indexes = len(range_index._indexes)
+        del prices
+        gc.collect()
+        self.assertEqual(len(range_index._indexes), indexes - 1)
+
+    def test_get_window_stats_given_index_return_same_stats(self):
+        # arrange
+        prices = pd.read_csv('src/analyst/test_files/AMZN_from_stockbot.csv')
+        expected_stats = analyst.get_window_stats(prices)
+        range_index.get_index(prices)
+        # act
+        stats = analyst.get_window_stats(prices)
+        # assert
+        for field, expected_field in zip(stats, expected_stats):
+            np.testing.assert_array_equal(field, expected_field)
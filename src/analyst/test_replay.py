@@ -0,0 +1,102 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.alerts import rules
+from src.alerts.store import MemoryAlertStore
+from src.analyst import analyst, replay
+from src.common.testing import get_random_prices
+from src.common.types import Period, get_date, get_ordinals
+from src.download.cache import PriceCache
+
+
+class ReplayTests(unittest.TestCase):
+
+    def test_get_anomalies_return_same_anomalies_as_analyst(self):
+        # arrange
+        prices = get_random_prices(400, seed=1, walk=True)
+        # act
+        anomalies = replay.get_anomalies(get_ordinals(prices.Date),
+                                         prices.Close.to_numpy(),
+                                         min_history=252)
+        # assert
+        replayed = {row: (position, min_row, max_row) for row, position,
+                    min_row, max_row in zip(*map(np.ndarray.tolist, anomalies))}
+        for row in range(400 - 252 + 1):
+            expected_anomaly = analyst.get_price_anomaly(prices[row:])
+            if expected_anomaly is None:
+                self.assertNotIn(row, replayed)
+                continue
+            position, min_row, max_row = replayed[row]
+            self.assertEqual(replay.ANOMALY_PERIODS[position],
+                             expected_anomaly.period)
+            self.assertEqual(prices.Close[min_row],
+                             expected_anomaly.min_price.value)
+            self.assertEqual(get_date(prices.Date[max_row]),
+                             expected_anomaly.max_price.date)
+        self.assertGreater(len(replayed), 10)
+
+    def test_replay_return_same_alerts_as_the_monitor(self):
+        # arrange
+        prices = get_random_prices(400, seed=2, walk=True)
+        store = MemoryAlertStore()
+        expected_alerts = []
+        for row in range(400 - 252, -1, -1):  # from old to new sessions
+            anomaly = analyst.get_price_anomaly(prices[row:])
+            new_anomaly, = rules.get_new_anomalies(store, ['AAA'], [anomaly])
+            if anomaly is not None:
+                expected_alerts.append((anomaly.current_price.date,
+                                        anomaly.period.value,
+                                        new_anomaly is not None))
+        # act
+        anomalies = replay.replay('AAA', prices)
+        # assert
+        alerts = list(zip(anomalies.Date, anomalies.Period, anomalies.Alert))
+        self.assertEqual(alerts, expected_alerts)
+        self.assertLess(anomalies.Alert.sum(), len(anomalies))
+
+    def test_read_history_given_ascending_csv_return_descending_prices(self):
+        # act
+        prices = replay.read_history(Path('src/analyst/test_files/AMZN.csv'))
+        # assert
+        self.assertEqual(len(prices), 252)
+        self.assertEqual(get_date(prices.Date[0]), get_date('2022-07-29'))
+        self.assertTrue((np.diff(get_ordinals(prices.Date)) < 0).all())
+
+    def test_replay_files_given_workers_return_same_anomalies_as_serial(self):
+        # arrange
+        with tempfile.TemporaryDirectory() as directory:
+            for number in range(replay.MIN_PARALLEL_SYMBOLS):
+                get_random_prices(300, seed=number, walk=True).to_csv(
+                    Path(directory) / f'S{number}.csv', index=False)
+            # the price cache files are histories too
+            PriceCache(directory).write(
+                'CACHED', get_random_prices(300, 9, walk=True))
+            files = replay.get_history_files([directory])
+            expected_anomalies = replay.replay_files(files)
+            # act
+            anomalies = replay.replay_files(files, workers=2)
+        # assert
+        self.assertEqual(len(files), replay.MIN_PARALLEL_SYMBOLS + 1)
+        pd.testing.assert_frame_equal(anomalies, expected_anomalies)
+        self.assertEqual(list(anomalies.Symbol.unique()),
+                         ['CACHED', *[f'S{number}' for number in range(8)]])
+
+    def test_summarize_return_counts_of_each_period_and_direction(self):
+        # arrange
+        anomalies = pd.DataFrame(
+            [('AAA', '2022-07-27', '12mo', 'min', 1.0, 1.0, 3.0, True),
+             ('AAA', '2022-07-28', '12mo', 'min', 0.5, 0.5, 3.0, False),
+             ('BBB', '2022-07-28', '1mo', 'max', 3.0, 1.0, 3.0, True)],
+            columns=replay.COLUMNS)
+        # act
+        summary = replay.summarize(anomalies)
+        # assert
+        self.assertEqual(list(summary.index),
+                         [period.value for period in replay.ANOMALY_PERIODS])
+        self.assertEqual(summary.loc[Period.YEAR.value].tolist(), [2, 0, 1, 0])
+        self.assertEqual(summary.loc[Period.MONTH.value].tolist(), [0, 1, 0, 1])
+        self.assertEqual(summary.loc[Period.HALF.value].tolist(), [0, 0, 0, 0])
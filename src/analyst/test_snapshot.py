@@ -0,0 +1,108 @@
+import datetime
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from src.analyst import analyst, portfolio, snapshot
+from src.analyst.snapshot import Snapshot, SymbolStats
+from src.common.testing import get_random_prices
+
+# the last session of the test prices is 2022-07-29 (Friday)
+SATURDAY = datetime.datetime(2022, 7, 30, 12)
+MONDAY_AFTER_CLOSE = datetime.datetime(2022, 8, 1, 22)
+
+
+class SnapshotTests(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        amzn = pd.read_csv('src/analyst/test_files/AMZN_from_stockbot.csv')
+        self.frames = {
+            'AMZN': amzn,
+            'SHORT': amzn[:40].copy(),  # shorter history than the others
+            'random.to': get_random_prices(300, decimals=1),
+        }
+        self.snapshot = Snapshot(self.directory.name)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_get_return_same_stats_as_live_compute(self):
+        # arrange
+        self._write(self.frames)
+        # act and assert
+        for symbol, frame in self.frames.items():
+            symbol_stats = self.snapshot.get(symbol, SATURDAY)
+            expected_stats = self._get_expected_stats(symbol.upper(), frame)
+            self.assertEqual(symbol_stats, expected_stats, symbol)
+        self.assertEqual(self.snapshot.summary(),
+                         'snapshot: 3 hits, 0 misses')
+
+    def test_get_return_python_numbers(self):
+        # arrange
+        self._write(self.frames)
+        # act
+        symbol_stats = self.snapshot.get('AMZN', SATURDAY)
+        # assert
+        values = [
+            symbol_stats.current_price.value,
+            symbol_stats.report.current_price,
+            *symbol_stats.return_stats,
+            *symbol_stats.volatility_stats,
+            *(report.change_in_period for report in symbol_stats.report[2:]),
+        ]
+        for stats in symbol_stats.price_stats:
+            values += [stats.min_price.value, stats.max_price.value,
+                       stats.min_price_max_price_difference,
+                       stats.max_negative_change, stats.max_positive_change]
+        self.assertEqual({type(value) for value in values}, {float})
+
+    def test_get_given_stale_snapshot_return_none(self):
+        # arrange
+        self._write(self.frames)
+        # act
+        symbol_stats = self.snapshot.get('AMZN', MONDAY_AFTER_CLOSE)
+        # assert
+        self.assertIsNone(symbol_stats)
+
+    def test_get_given_unknown_symbol_or_no_snapshot_return_none(self):
+        # act and assert
+        self.assertIsNone(self.snapshot.get('AMZN', SATURDAY))
+        self._write(self.frames)
+        self.assertIsNone(self.snapshot.get('AAAA', SATURDAY))
+        self.assertIsNone(self.snapshot.get('ZZZZ', SATURDAY))
+        self.assertEqual(self.snapshot.summary(),
+                         'snapshot: 0 hits, 3 misses')
+
+    def test_get_given_replaced_snapshot_read_the_new_file(self):
+        # arrange
+        self._write({'AMZN': self.frames['AMZN']})
+        self.assertIsNone(self.snapshot.get('SHORT', SATURDAY))
+        # act
+        self._write(self.frames)
+        # assert
+        self.assertIsNotNone(self.snapshot.get('SHORT', SATURDAY))
+
+    def test_get_given_unknown_format_return_none(self):
+        # arrange
+        np.save(snapshot.get_path(self.directory.name), np.arange(3))
+        # act and assert
+        self.assertIsNone(self.snapshot.get('AMZN', SATURDAY))
+
+    def _write(self, frames: dict) -> None:
+        portfolio_stats = portfolio.compute(
+            portfolio.align(list(frames), list(frames.values())))
+        path = snapshot.write(self.directory.name, portfolio_stats)
+        self.assertEqual(path, snapshot.get_path(self.directory.name))
+
+    @staticmethod
+    def _get_expected_stats(symbol: str, frame: pd.DataFrame) -> SymbolStats:
+        return SymbolStats(
+            current_price=analyst.get_current_price(frame),
+            price_stats=analyst.get_price_stats(frame),
+            return_stats=analyst.get_return_stats(frame),
+            volatility_stats=analyst.get_volatility_stats(frame),
+            report=analyst.get_symbol_report(symbol, frame),
+        )
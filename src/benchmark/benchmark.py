@@ -0,0 +1,257 @@
+"""
+Latency benchmarks of the bot.
+The prices are served by a stub of the finance library, so the benchmarks
+run offline. Each benchmark reports the best seconds per call of several
+repetitions, the results can be compared against a baseline file:
+
+    python -m src.benchmark.benchmark --output benchmark.json \
+        --baseline benchmark-baseline.json
+"""
+import argparse
+import datetime
+import functools
+import itertools
+import shutil
+import subprocess
+import sys
+import tempfile
+import timeit
+import weakref
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+
+from src.analyst import analyst, correlation, indicators, range_index, replay
+from src.analyst.snapshot import Snapshot
+from src.benchmark import compare
+from src.benchmark.finance_stub import StubFinance, get_universe, read_history
+from src.bot.bot import Bot
+from src.common.ttl_cache import TTLCache
+from src.common.types import get_ordinals
+from src.download import download
+from src.download.download import Download
+
+PRICES_FILE = 'src/analyst/test_files/AMZN_from_stockbot.csv'
+ENTRY_MODULES = ['src.commands', 'src.poll', 'src.push', 'src.monitor']
+PORTFOLIO_SIZES = [10, 100, 1000]
+# sessions of the replay benchmark, 10 years
+REPLAY_SESSIONS = 2520
+REPEAT = 5
+
+Benchmark = Callable[[], object]
+
+
+def get_benchmarks(sizes: list[int]) -> dict[str, Benchmark]:
+    """
+    Return the functions to measure by benchmark name.
+    :param sizes: Number of symbols of the portfolio benchmarks.
+    """
+    history = read_history()
+    prices = pd.read_csv(PRICES_FILE)
+    stats = analyst.get_window_stats(prices)
+    indexed_prices = prices.copy()
+    range_index.get_index(indexed_prices)
+    downloader = Download(StubFinance({'AMZN': history}))
+    bot = Bot(downloader)
+    cached_bot = Bot(downloader, TTLCache(max_size=1, ttl=3600))
+
+    benchmarks: dict[str, Benchmark] = {
+        'download.to_descending_with_returns':
+            lambda: download._to_descending_with_returns(history),
+        'download.to_lean_descending_with_returns':
+            lambda: download._to_lean_descending_with_returns(history),
+        'download.get_stock_historical_data':
+            lambda: downloader.get_stock_historical_data('AMZN'),
+        'analyst.get_window_stats': lambda: analyst.get_window_stats(prices),
+        'analyst.get_window_stats_indexed':
+            lambda: analyst.get_window_stats(indexed_prices),
+        'analyst.get_current_price': lambda: analyst.get_current_price(prices),
+        'analyst.get_return_stats': lambda: analyst.get_return_stats(prices),
+        'analyst.get_price_stats': lambda: analyst.get_price_stats(prices),
+        'analyst.get_volatility_stats':
+            lambda: analyst.get_volatility_stats(prices),
+        'analyst.get_price_anomaly': lambda: analyst.get_price_anomaly(prices),
+        'analyst.get_symbol_report':
+            lambda: analyst.get_symbol_report('AMZN', prices, stats),
+        'indicators.get_indicators':
+            lambda: indicators.get_indicators(prices),
+        'indicators.push': _get_indicator_state_benchmark(prices),
+        'replay.replay': functools.partial(replay.replay, 'AMZN',
+                                           _get_long_prices(REPLAY_SESSIONS)),
+        'bot.reply_start': bot.reply_start,
+        'bot.reply_help': bot.reply_help,
+        'bot.reply_price_stats': lambda: bot.reply_price_stats('/price amzn'),
+        'bot.reply_return_stats': lambda: bot.reply_return_stats('/return amzn'),
+        'bot.reply_volatility_stats':
+            lambda: bot.reply_volatility_stats('/vol amzn'),
+        'bot.reply_all_stats': lambda: bot.reply_all_stats('/all amzn'),
+        'bot.reply_all_stats_cached':
+            lambda: cached_bot.reply_all_stats('/all amzn'),
+        'bot.reply_all_stats_snapshot': _get_snapshot_benchmark(downloader),
+        'bot.reply_indicator_stats':
+            lambda: bot.reply_indicator_stats('/ind amzn'),
+    }
+
+    for size in sizes:
+        universe = get_universe(size)
+        portfolio = list(universe.keys())
+        portfolio_bot = Bot(Download(StubFinance(universe)))
+        benchmarks[f'bot.monitor_portfolio.{size}'] = \
+            _bind(portfolio_bot.monitor_portfolio, portfolio)
+        benchmarks[f'bot.report_portfolio.{size}'] = \
+            _bind(portfolio_bot.report_portfolio, portfolio)
+        benchmarks[f'bot.report_portfolio_table.{size}'] = \
+            _bind(portfolio_bot.report_portfolio, portfolio, compact=True)
+        portfolio_prices, _ = portfolio_bot.get_portfolio_prices(portfolio)
+        benchmarks[f'correlation.compute.{size}'] = \
+            functools.partial(correlation.compute, portfolio_prices)
+        benchmarks[f'indicators.compute.{size}'] = functools.partial(
+            indicators.compute, portfolio_prices.close, portfolio_prices.lengths)
+
+    return benchmarks
+
+
+def measure(benchmark: Benchmark, repeat: int = REPEAT) -> float:
+    """
+    Return the best seconds per call of the benchmark.
+    """
+    timer = timeit.Timer(benchmark)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat, number)) / number
+
+
+def measure_import(module: str, repeat: int = REPEAT) -> float:
+    """
+    Return the best seconds to import a module in a new interpreter.
+    """
+    code = ('import time\n'
+            'started_at = time.perf_counter()\n'
+            f'import {module}\n'
+            'print(time.perf_counter() - started_at)')
+    times = []
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, '-c', code], check=True,
+                                capture_output=True, text=True).stdout
+        times.append(float(output.split()[-1]))
+
+    return min(times)
+
+
+def run(sizes: list[int], repeat: int = REPEAT,
+        name_filter: str = '') -> dict[str, float]:
+    """
+    Run the benchmarks whose name contains the filter.
+    :return: The seconds of each benchmark.
+    """
+    results = {}
+    for module in ENTRY_MODULES:
+        name = f'import.{module}'
+        if name_filter in name:
+            results[name] = measure_import(module, repeat)
+
+    for name, benchmark in get_benchmarks(sizes).items():
+        if name_filter in name:
+            results[name] = measure(benchmark, repeat)
+
+    return results
+
+
+def main(arguments: list[str]) -> int:
+    parser = argparse.ArgumentParser(description='Run the benchmarks of the bot.')
+    parser.add_argument('--output', help='file to write the results')
+    parser.add_argument('--baseline', help='file with the results to compare')
+    parser.add_argument('--threshold', type=float,
+                        default=compare.DEFAULT_THRESHOLD,
+                        help='allowed slowdown, 0.25 means 25%% slower')
+    parser.add_argument('--thresholds', nargs='*', default=[],
+                        help='allowed slowdown per benchmark prefix, '
+                             'for example: import.=0.5')
+    parser.add_argument('--sizes', type=int, nargs='*', default=PORTFOLIO_SIZES,
+                        help='number of symbols of the portfolio benchmarks')
+    parser.add_argument('--repeat', type=int, default=REPEAT)
+    parser.add_argument('--filter', default='',
+                        help='run only the benchmarks containing this text')
+    args = parser.parse_args(arguments)
+    thresholds = compare.parse_thresholds(args.thresholds)
+
+    results = run(args.sizes, args.repeat, args.filter)
+    for name, seconds in results.items():
+        print(f'{name:<45} {seconds * 1000:12.4f} ms')
+
+    if args.output:
+        compare.write_results(args.output, results)
+
+    if not args.baseline:
+        return 0
+    if not Path(args.baseline).exists():
+        print(f'The baseline {args.baseline} does not exist, '
+              f'nothing to compare')
+        return 0
+
+    baseline = compare.read_results(args.baseline)
+    regressions = compare.compare(results, baseline, args.threshold,
+                                  thresholds)
+    for regression in regressions:
+        print(f'Regression: {regression.name} took '
+              f'{regression.current * 1000:.3f} ms, the baseline is '
+              f'{regression.baseline * 1000:.3f} ms '
+              f'({regression.ratio:.2f}x, allowed '
+              f'{1 + regression.threshold:.2f}x)')
+
+    return 1 if regressions else 0
+
+
+# private functions
+
+
+def _get_snapshot_benchmark(downloader: Download) -> Benchmark:
+    """
+    Return a benchmark of /all answered from a fresh snapshot.
+    """
+    directory = tempfile.mkdtemp(prefix='stockbot-snapshot-')
+    Bot(downloader).write_snapshot(['AMZN'], directory)
+    last_date = downloader.get_stock_historical_data('AMZN').Date.iloc[0]
+    now = pd.Timestamp(last_date).to_pydatetime() + datetime.timedelta(days=1)
+    snapshot = Snapshot(directory, clock=lambda: now)
+    # the directory is removed with the snapshot
+    weakref.finalize(snapshot, shutil.rmtree, directory, ignore_errors=True)
+    snapshot_bot = Bot(downloader, snapshot=snapshot)
+    return lambda: snapshot_bot.reply_all_stats('/all amzn')
+
+
+def _get_indicator_state_benchmark(prices: pd.DataFrame) -> Benchmark:
+    """
+    Return a benchmark of the indicators of a symbol after a new session.
+    """
+    ordinals = get_ordinals(prices.Date)
+    closes = prices.Close.to_numpy(dtype=float)
+    state = indicators.IndicatorState(ordinals, closes)
+    sessions = itertools.count(int(ordinals[0]) + 1)
+
+    def benchmark() -> object:
+        state.push(next(sessions), float(closes[0]))
+        return state.get_indicators()
+
+    return benchmark
+
+
+def _get_long_prices(sessions: int) -> pd.DataFrame:
+    """
+    Return descending prices of a random walk with the given sessions.
+    """
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        'Date': pd.bdate_range(end='2022-07-29', periods=sessions)[::-1],
+        'Close': 100 * np.exp(np.cumsum(rng.normal(0, 0.02, sessions))),
+    })
+
+
+def _bind(function: Callable[..., object], portfolio: list[str],
+          **kwargs: object) -> Benchmark:
+    return lambda: function(portfolio, **kwargs)
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
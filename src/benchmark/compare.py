@@ -0,0 +1,81 @@
+"""
+Comparison of benchmark results against a baseline.
+The results are stored as JSON: {"results": {"<benchmark>": <seconds>}}.
+"""
+import json
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+DEFAULT_THRESHOLD = 0.25
+
+
+class Regression(NamedTuple):
+    name: str
+    baseline: float
+    current: float
+    threshold: float
+
+    @property
+    def ratio(self) -> float:
+        return self.current / self.baseline
+
+
+def read_results(path: str) -> dict[str, float]:
+    content = json.loads(Path(path).read_text())
+    return content['results']
+
+
+def write_results(path: str, results: dict[str, float]) -> None:
+    content = {'results': dict(sorted(results.items()))}
+    Path(path).write_text(json.dumps(content, indent=2) + '\n')
+
+
+def compare(results: dict[str, float], baseline: dict[str, float],
+            threshold: float = DEFAULT_THRESHOLD,
+            thresholds: Optional[dict[str, float]] = None) -> list[Regression]:
+    """
+    Return the benchmarks that are slower than the baseline by more than
+    their threshold. Benchmarks missing in the baseline are not compared.
+    :param results: Seconds of each benchmark.
+    :param baseline: Seconds of each benchmark in the baseline.
+    :param threshold: Allowed slowdown, 0.25 allows a benchmark to be 25%
+    slower than the baseline.
+    :param thresholds: Allowed slowdown of the benchmarks whose name starts
+    with the key, the longest matching key is used.
+    """
+    regressions = []
+    for name, current in results.items():
+        if name not in baseline:
+            continue
+        allowed = _get_threshold(name, threshold, thresholds or {})
+        if current > baseline[name] * (1 + allowed):
+            regressions.append(
+                Regression(name, baseline[name], current, allowed))
+
+    return regressions
+
+
+def parse_thresholds(values: list[str]) -> dict[str, float]:
+    """
+    Parse thresholds given as "<prefix>=<threshold>".
+    """
+    thresholds = {}
+    for value in values:
+        prefix, separator, threshold = value.rpartition('=')
+        if not separator or not prefix:
+            raise ValueError(f'Error: the threshold {value} is not valid, '
+                             f'for example: import.=0.5')
+        thresholds[prefix] = float(threshold)
+
+    return thresholds
+
+
+# private functions
+
+
+def _get_threshold(name: str, threshold: float,
+                   thresholds: dict[str, float]) -> float:
+    prefixes = [prefix for prefix in thresholds if name.startswith(prefix)]
+    if not prefixes:
+        return threshold
+    return thresholds[max(prefixes, key=len)]
@@ -0,0 +1,106 @@
+"""
+Offline replacement of the finance library (yfinance) used by the
+benchmarks. It serves the fixture of the download tests and synthetic
+universes of N symbols built from the same sessions.
+"""
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+
+HISTORY_FILE = 'src/download/test_files/AMZN_from_yfinance.csv'
+
+
+class StubFinance:
+    """
+    Serves the histories it was created with, it implements the subset of
+    the yfinance API used by the Download class.
+    """
+
+    def __init__(self, histories: dict[str, DataFrame]) -> None:
+        """
+        :param histories: Ascending history of each symbol, as returned by
+        yfinance.
+        """
+        self.histories = {symbol.upper(): history
+                          for symbol, history in histories.items()}
+        self._downloads: dict[tuple[str, ...], DataFrame] = {}
+
+    def Ticker(self, symbol: str) -> '_StubTicker':
+        return _StubTicker(self.histories.get(symbol.upper(), DataFrame()))
+
+    def download(self, symbols: list[str], **kwargs) -> DataFrame:
+        """
+        Return the wide dataframe of a bulk download grouped by ticker.
+        The dataframe of each batch is built once, so the benchmarks measure
+        the processing of the bot and not the one of the stub.
+        """
+        key = tuple(symbol.upper() for symbol in symbols)
+        if key not in self._downloads:
+            known = [symbol for symbol in key if symbol in self.histories]
+            if len(key) == 1:
+                data = self.histories[known[0]] if known else DataFrame()
+            else:
+                data = pd.concat([self.histories[symbol] for symbol in known],
+                                 axis=1, keys=known)
+            self._downloads[key] = data
+        return self._downloads[key]
+
+
+def read_history() -> DataFrame:
+    """
+    Return the history of the download tests fixture.
+    """
+    return pd.read_csv(HISTORY_FILE, index_col='Date', parse_dates=True)
+
+
+def get_universe(size: int, seed: int = 0) -> dict[str, DataFrame]:
+    """
+    Return the histories of a synthetic universe of symbols.
+    Every symbol has the sessions of the fixture and a random walk of prices.
+    :param size: Number of symbols.
+    :param seed: Seed of the random prices, the same seed returns the same
+    universe.
+    """
+    history = read_history()
+    rng = np.random.default_rng(seed)
+    return {
+        _get_symbol(number): _get_random_history(history, rng)
+        for number in range(size)
+    }
+
+
+# private functions
+
+
+class _StubTicker:
+
+    def __init__(self, history: DataFrame) -> None:
+        self._history = history
+
+    def history(self, period: Optional[str] = None, start: Optional[str] = None,
+                timeout: Optional[float] = None) -> DataFrame:
+        if start is None:
+            return self._history.copy()
+        return self._history[self._history.index >= start].copy()
+
+
+def _get_symbol(number: int) -> str:
+    return f'S{number:04d}'
+
+
+def _get_random_history(history: DataFrame,
+                        rng: np.random.Generator) -> DataFrame:
+    sessions = len(history)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, sessions)))
+    spread = np.abs(rng.normal(0, 0.01, sessions))
+    return DataFrame({
+        'Open': close * (1 + rng.normal(0, 0.005, sessions)),
+        'High': close * (1 + spread),
+        'Low': close * (1 - spread),
+        'Close': close,
+        'Volume': rng.integers(1_000_000, 100_000_000, sessions),
+        'Dividends': 0.0,
+        'Stock Splits': 0.0,
+    }, index=history.index)
@@ -0,0 +1,71 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from src.benchmark import compare
+from src.benchmark.compare import Regression
+
+
+class CompareTests(unittest.TestCase):
+
+    def test_compare_given_slowdown_within_threshold_returns_no_regressions(self):
+        # arrange
+        baseline = {'analyst.get_price_stats': 1.0}
+        results = {'analyst.get_price_stats': 1.2}
+        # act
+        regressions = compare.compare(results, baseline, threshold=0.25)
+        # assert
+        self.assertEqual(regressions, [])
+
+    def test_compare_given_slowdown_over_threshold_returns_regression(self):
+        # arrange
+        baseline = {'analyst.get_price_stats': 1.0, 'bot.reply_help': 1.0}
+        results = {'analyst.get_price_stats': 1.5, 'bot.reply_help': 0.5}
+        # act
+        regressions = compare.compare(results, baseline, threshold=0.25)
+        # assert
+        self.assertEqual(regressions, [
+            Regression('analyst.get_price_stats', 1.0, 1.5, 0.25)
+        ])
+        self.assertEqual(regressions[0].ratio, 1.5)
+
+    def test_compare_given_new_benchmark_does_not_compare_it(self):
+        # arrange
+        results = {'bot.monitor_portfolio.1000': 10.0}
+        # act
+        regressions = compare.compare(results, {}, threshold=0.25)
+        # assert
+        self.assertEqual(regressions, [])
+
+    def test_compare_given_prefix_thresholds_uses_the_longest_prefix(self):
+        # arrange
+        baseline = {'import.src.push': 1.0, 'import.src.monitor': 1.0}
+        results = {'import.src.push': 1.8, 'import.src.monitor': 1.8}
+        thresholds = {'import.': 1.0, 'import.src.monitor': 0.5}
+        # act
+        regressions = compare.compare(results, baseline, threshold=0.25,
+                                      thresholds=thresholds)
+        # assert
+        self.assertEqual(regressions, [
+            Regression('import.src.monitor', 1.0, 1.8, 0.5)
+        ])
+
+    def test_parse_thresholds_success_get_threshold_per_prefix(self):
+        # act
+        thresholds = compare.parse_thresholds(['import.=0.5', 'bot.=1'])
+        # assert
+        self.assertEqual(thresholds, {'import.': 0.5, 'bot.': 1.0})
+
+    def test_parse_thresholds_error_get_not_valid_threshold_error(self):
+        # act and assert
+        self.assertRaises(ValueError, compare.parse_thresholds, ['0.5'])
+
+    def test_write_results_success_read_the_same_results(self):
+        # arrange
+        results = {'bot.reply_start': 0.001, 'analyst.get_price_stats': 0.5}
+        with tempfile.TemporaryDirectory() as directory:
+            path = str(Path(directory) / 'benchmark.json')
+            # act
+            compare.write_results(path, results)
+            # assert
+            self.assertEqual(compare.read_results(path), results)
@@ -1,13 +1,41 @@
+import datetime
+from typing import Optional, Sequence
+
 from pandas import DataFrame
 
 import src.bot.text_formatter as formatter
-from src.analyst import analyst
+from src.alerts import rules
+from src.alerts.store import AlertStore
+from src.bot import replies
+from src.analyst import analyst, correlation, indicators
+from src.analyst import portfolio as portfolio_analyst
+from src.analyst import range_index
+from src.analyst import snapshot as snapshot_analyst
+from src.analyst.detector import AnomalyDetector
+from src.analyst.indicators import IndicatorCache
+from src.analyst.parallel import ParallelAnalyst
+from src.analyst.portfolio import PortfolioPrices, PortfolioStats
+from src.analyst.snapshot import Snapshot, SymbolStats
 from src.common import logs
+from src.common.market import get_last_session_date
+from src.common.periods import PeriodSpec
+from src.common.single_flight import SingleFlight
+from src.common.ttl_cache import TTLCache
+from src.common.types import Alert, Indicator, PriceAnomaly, get_ordinals
 from src.download.download import Download
+from src.download.fetcher import Fetcher
+from src.download.price_store import PriceStore
 
 logger = logs.get_logger(__name__)
 
-SPACE = ' '
+# Unknown symbols are cached for a short time only
+NEGATIVE_TTL_SECONDS = 60
+
+# Maximum number of symbols compared by a stats command
+MAX_SYMBOLS = 10
+
+# Pairs of symbols in the risk section of the portfolio report
+CORRELATED_PAIRS = 5
 
 
 class Bot:
@@ -20,40 +48,67 @@ class Bot:
     should be taken by other class.
     """
 
-    def __init__(self, downloader: Download):
+    def __init__(self, downloader: Download, cache: Optional[TTLCache] = None,
+                 negative_ttl: float = NEGATIVE_TTL_SECONDS,
+                 max_symbols: int = MAX_SYMBOLS,
+                 snapshot: Optional[Snapshot] = None,
+                 parallel: Optional[ParallelAnalyst] = None):
+        """
+        :param downloader: Downloader of the historical prices.
+        :param cache: Optional cache of the historical prices, keyed by
+        symbol and trading date.
+        :param negative_ttl: Seconds that the cache keeps an unknown symbol.
+        :param max_symbols: Maximum number of symbols of a stats command.
+        :param snapshot: Optional snapshot of the stats computed by the
+        monitor, the stats commands of its symbols are answered from it
+        while it is fresh.
+        :param parallel: Optional pool of processes that analyses the
+        portfolios of the monitor, by default they are analysed in this
+        process.
+        """
         self.downloader = downloader
+        self.cache = cache
+        self.negative_ttl = negative_ttl
+        self.max_symbols = max_symbols
+        self.snapshot = snapshot
+        # concurrent commands for the same symbol share one download
+        self.downloads = SingleFlight()
+        # the indicators of each symbol are updated with its new sessions
+        self.indicators = IndicatorCache()
+        self.parallel = parallel or ParallelAnalyst()
 
     def reply_start(self) -> str:
-        return (
-            "I compute statistics about prices, returns and volatility from "
-            "stocks, ETFs and REITs. I get the data from Yahoo Finance.\n\n"
-            "/help will show the list of supported commands."
-        )
+        return replies.START
 
     def reply_help(self) -> str:
-        return (
-            'I support the following commands:\n\n'
-            '/start - show the description of what I can do\n'
-            '/help - show the list of commands I support\n'
-            '/price {symbol} - get price stats\n'
-            '/return {symbol} - get return stats\n'
-            '/vol {symbol} - get volatility stats\n'
-            '/all {symbol} - get price, return, and volatility stats'
-        )
+        return replies.HELP
 
     def reply_price_stats(self, text: str) -> str:
         try:
-            symbol = self._get_symbol(text)
-            prices = self._get_prices(symbol)
+            symbols = self._get_symbols(text)
+            if len(symbols) > 1:
+                portfolio_stats, failed = self._get_many_stats(symbols)
+                message = formatter.human_readable_price_comparison(
+                    self._get_heading('prices', portfolio_stats),
+                    portfolio_stats.prices.symbols,
+                    portfolio_analyst.get_current_prices(portfolio_stats),
+                    portfolio_analyst.get_price_stats(portfolio_stats))
+                return self._with_failed_symbols(message, failed)
+
+            symbol = symbols[0]
+            symbol_stats = self._get_snapshot_stats(symbol)
+            if symbol_stats is None:
+                prices = self._get_prices(symbol)
+                current_price = analyst.get_current_price(prices)
+                price_stats = analyst.get_price_stats(prices)
+            else:
+                current_price = symbol_stats.current_price
+                price_stats = symbol_stats.price_stats
 
-            current_price = analyst.get_current_price(prices)
-            price_stats = analyst.get_price_stats(prices)
             readable_price_stats = formatter.human_readable_prices(price_stats)
-            message = (f'The price of {symbol.upper()} is:\n\n'
-                       f'Current price:\n'
-                       f'{formatter.as_decimal(current_price.value)} ({current_price.date})\n\n'
-                       f'Stats:\n\n{readable_price_stats}')
-            return message
+            return formatter.human_readable_stats_reply(
+                f'The price of {symbol.upper()} is', current_price,
+                readable_price_stats)
         except Exception as e:
             error_message = str(e)
             logger.error(error_message)
@@ -61,18 +116,31 @@ class Bot:
 
     def reply_return_stats(self, text: str) -> str:
         try:
-            symbol = self._get_symbol(text)
-            prices = self._get_prices(symbol)
+            symbols = self._get_symbols(text)
+            if len(symbols) > 1:
+                portfolio_stats, failed = self._get_many_stats(symbols)
+                message = formatter.human_readable_annual_comparison(
+                    self._get_heading('returns', portfolio_stats),
+                    portfolio_stats.prices.symbols,
+                    portfolio_analyst.get_current_prices(portfolio_stats),
+                    portfolio_analyst.get_return_stats(portfolio_stats))
+                return self._with_failed_symbols(message, failed)
+
+            symbol = symbols[0]
+            symbol_stats = self._get_snapshot_stats(symbol)
+            if symbol_stats is None:
+                prices = self._get_prices(symbol)
+                current_price = analyst.get_current_price(prices)
+                return_stats = analyst.get_return_stats(prices)
+            else:
+                current_price = symbol_stats.current_price
+                return_stats = symbol_stats.return_stats
 
-            current_price = analyst.get_current_price(prices)
-            return_stats = analyst.get_return_stats(prices)
             readable_return_stats = formatter.human_readable_annual_stats(
                 return_stats)
-            message = (f'The return of {symbol.upper()} is:\n\n'
-                       f'Current price:\n'
-                       f'{formatter.as_decimal(current_price.value)} ({current_price.date})\n\n'
-                       f'Stats:\n\n{readable_return_stats}')
-            return message
+            return formatter.human_readable_stats_reply(
+                f'The return of {symbol.upper()} is', current_price,
+                readable_return_stats)
         except Exception as e:
             error_message = str(e)
             logger.error(error_message)
@@ -80,18 +148,31 @@ class Bot:
 
     def reply_volatility_stats(self, text: str) -> str:
         try:
-            symbol = self._get_symbol(text)
-            prices = self._get_prices(symbol)
+            symbols = self._get_symbols(text)
+            if len(symbols) > 1:
+                portfolio_stats, failed = self._get_many_stats(symbols)
+                message = formatter.human_readable_annual_comparison(
+                    self._get_heading('volatilities', portfolio_stats),
+                    portfolio_stats.prices.symbols,
+                    portfolio_analyst.get_current_prices(portfolio_stats),
+                    portfolio_analyst.get_volatility_stats(portfolio_stats))
+                return self._with_failed_symbols(message, failed)
+
+            symbol = symbols[0]
+            symbol_stats = self._get_snapshot_stats(symbol)
+            if symbol_stats is None:
+                prices = self._get_prices(symbol)
+                current_price = analyst.get_current_price(prices)
+                volatility_stats = analyst.get_volatility_stats(prices)
+            else:
+                current_price = symbol_stats.current_price
+                volatility_stats = symbol_stats.volatility_stats
 
-            current_price = analyst.get_current_price(prices)
-            volatility_stats = analyst.get_volatility_stats(prices)
             readable_volatility_stats = formatter.human_readable_annual_stats(
                 volatility_stats)
-            message = (f'The volatility of {symbol.upper()} is:\n\n'
-                       f'Current price:\n'
-                       f'{formatter.as_decimal(current_price.value)} ({current_price.date})\n\n'
-                       f'Stats:\n\n{readable_volatility_stats}')
-            return message
+            return formatter.human_readable_stats_reply(
+                f'The volatility of {symbol.upper()} is', current_price,
+                readable_volatility_stats)
         except Exception as e:
             error_message = str(e)
             logger.error(error_message)
@@ -99,30 +180,153 @@ class Bot:
 
     def reply_all_stats(self, text: str) -> str:
         try:
-            symbol = self._get_symbol(text)
-            prices = self._get_prices(symbol)
+            symbols = self._get_symbols(text)
+            if len(symbols) > 1:
+                portfolio_stats, failed = self._get_many_stats(symbols)
+                message = formatter.human_readable_price_comparison(
+                    self._get_heading('stats', portfolio_stats),
+                    portfolio_stats.prices.symbols,
+                    portfolio_analyst.get_current_prices(portfolio_stats),
+                    portfolio_analyst.get_price_stats(portfolio_stats),
+                    portfolio_analyst.get_return_stats(portfolio_stats),
+                    portfolio_analyst.get_volatility_stats(portfolio_stats))
+                return self._with_failed_symbols(message, failed)
+
+            symbol = symbols[0]
+            symbol_stats = self._get_snapshot_stats(symbol)
+            if symbol_stats is None:
+                prices = self._get_prices(symbol)
+                current_price = analyst.get_current_price(prices)
+                stats = analyst.get_window_stats(prices)
+                price_stats = analyst.get_price_stats(prices, stats)
+                return_stats = analyst.get_return_stats(prices, stats)
+                volatility_stats = analyst.get_volatility_stats(prices, stats)
+            else:
+                current_price = symbol_stats.current_price
+                price_stats = symbol_stats.price_stats
+                return_stats = symbol_stats.return_stats
+                volatility_stats = symbol_stats.volatility_stats
 
-            current_price = analyst.get_current_price(prices)
-            price_stats = analyst.get_price_stats(prices)
-            return_stats = analyst.get_return_stats(prices)
-            volatility_stats = analyst.get_volatility_stats(prices)
             readable_all_stats = formatter.human_readable_all_annual_stats(
                 price_stats, return_stats, volatility_stats)
-            message = (f'The stats of {symbol.upper()} are:\n\n'
-                       f'Current price:\n'
-                       f'{formatter.as_decimal(current_price.value)} ({current_price.date})\n\n'
-                       f'Stats:\n\n{readable_all_stats}')
-            return message
+            return formatter.human_readable_stats_reply(
+                f'The stats of {symbol.upper()} are', current_price,
+                readable_all_stats)
         except Exception as e:
             error_message = str(e)
             logger.error(error_message)
             return error_message
 
-    def monitor_portfolio(self, portfolio: list[str]) -> list[str]:
+    def reply_indicator_stats(self, text: str) -> str:
+        try:
+            symbols = self._get_symbols(text)
+            if len(symbols) > 1:
+                portfolio_prices, failed = self._get_many_portfolio_prices(
+                    symbols)
+                message = formatter.human_readable_indicator_comparison(
+                    f'The indicators of {", ".join(portfolio_prices.symbols)}'
+                    f' are',
+                    portfolio_prices.symbols,
+                    portfolio_analyst.get_last_prices(portfolio_prices),
+                    indicators.compute(portfolio_prices.close,
+                                       portfolio_prices.lengths))
+                return self._with_failed_symbols(message, failed)
+
+            symbol = symbols[0]
+            prices = self._get_prices(symbol)
+            readable_indicators = formatter.human_readable_indicators(
+                self.indicators.get(symbol, prices))
+            return formatter.human_readable_stats_reply(
+                f'The indicators of {symbol.upper()} are',
+                analyst.get_current_price(prices), readable_indicators)
+        except Exception as e:
+            error_message = str(e)
+            logger.error(error_message)
+            return error_message
+
+    def reply_correlation(self, text: str) -> str:
+        try:
+            symbols = self._get_symbols(text)
+            if len(symbols) < 2:
+                raise ValueError(
+                    'Error: please provide at least 2 symbols, '
+                    'for example: /corr amzn msft'
+                )
+
+            portfolio_prices, failed = self._get_many_portfolio_prices(symbols)
+            if len(portfolio_prices.symbols) < 2:
+                raise ValueError(
+                    f'Error: could not get the prices of '
+                    f'{", ".join(failed)}, at least 2 symbols are needed'
+                )
+
+            correlations = correlation.compute(portfolio_prices)
+            heading = (f'The correlations of '
+                       f'{", ".join(portfolio_prices.symbols)} are')
+            message = formatter.human_readable_correlation(
+                heading, portfolio_prices.symbols, correlations)
+            return self._with_failed_symbols(message, failed)
+        except Exception as e:
+            error_message = str(e)
+            logger.error(error_message)
+            return error_message
+
+    def monitor_portfolio(self, portfolio: list[str],
+                          price_store: Optional[PriceStore] = None,
+                          alert_store: Optional[AlertStore] = None,
+                          cooldown_days: Optional[int] = rules.COOLDOWN_DAYS,
+                          triggers: Sequence[Indicator] = (),
+                          detector: Optional[AnomalyDetector] = None
+                          ) -> list[str]:
+        """
+        Return the price alerts of the portfolio, and record them in the
+        alert store.
+        :param alert_store: Optional store of the alerts sent before, only
+        new or escalated breaches are alerted when it is given.
+        :param cooldown_days: Days before the same breach is alerted again.
+        :param triggers: Indicators that alert the symbols within the bounds
+        of every period, like the close out of the Bollinger bands.
+        :param detector: Optional streaming detector, the anomalies are found
+        with its rolling state of each symbol, updated with the new sessions,
+        instead of the whole history.
+        """
+        messages, pending_alerts = self.get_portfolio_alerts(
+            portfolio, price_store, alert_store, cooldown_days, triggers,
+            detector)
+        if alert_store is not None:
+            alert_store.replace(pending_alerts)
+        return messages
+
+    def get_portfolio_alerts(
+            self, portfolio: list[str],
+            price_store: Optional[PriceStore] = None,
+            alert_store: Optional[AlertStore] = None,
+            cooldown_days: Optional[int] = rules.COOLDOWN_DAYS,
+            triggers: Sequence[Indicator] = (),
+            detector: Optional[AnomalyDetector] = None
+            ) -> tuple[list[str], dict[str, list[Alert]]]:
+        """
+        Return the price alerts of the portfolio and the alerts to record in
+        the alert store once they are delivered, like monitor_portfolio.
+        """
+        price_store = price_store or PriceStore(self.downloader)
+        portfolio_prices, failed = self.get_portfolio_prices(portfolio,
+                                                             price_store)
+        if detector is None:
+            price_anomalies = self.parallel.get_price_anomalies(
+                portfolio_prices, triggers)
+        else:
+            price_anomalies = self._detect_price_anomalies(
+                detector, portfolio_prices.symbols, price_store, triggers)
+        pending_alerts: dict[str, list[Alert]] = {}
+        if alert_store is not None:
+            price_anomalies, pending_alerts = rules.get_pending_anomalies(
+                alert_store, portfolio_prices.symbols, price_anomalies,
+                cooldown_days)
+
         messages = []
-        for symbol in portfolio:
-            prices = self.downloader.get_stock_historical_data(symbol)
-            price_anomaly = analyst.get_price_anomaly(prices)
+        for symbol, price_anomaly in zip(portfolio_prices.symbols,
+                                         price_anomalies):
             if price_anomaly:
                 message = formatter.human_readable_price_anomaly(symbol,
                                                                  price_anomaly)
@@ -131,40 +335,268 @@ class Bot:
         if not messages:
             messages.append('No new price alerts for today')
 
-        return messages
+        if failed:
+            messages.append(formatter.human_readable_failed_symbols(failed))
+
+        return messages, pending_alerts
 
-    def report_portfolio(self, portfolio: list[str]) -> str:
-        report = ["Portfolio report\n"]
+    def report_portfolio(self, portfolio: list[str],
+                         price_store: Optional[PriceStore] = None,
+                         compact: bool = False,
+                         extra_periods: Sequence[PeriodSpec] = (),
+                         risk: bool = False) -> str:
+        """
+        Return the report of the portfolio.
+        :param compact: Report the symbols in a table.
+        :param extra_periods: Periods reported after the periods of the
+        Period enum, like 3y or ytd.
+        :param risk: Add the volatility of the portfolio and its most
+        correlated symbols, computed from the same prices.
+        """
+        portfolio_prices, failed = self.get_portfolio_prices(portfolio,
+                                                             price_store)
+        report = self.parallel.get_report(portfolio_prices, extra_periods)
+        message = formatter.human_readable_portfolio_report(report, failed,
+                                                            compact)
+        if not risk or len(portfolio_prices.symbols) < 2:
+            return message
+
+        return (message.rstrip('\n') + formatter.MESSAGE_SEPARATOR
+                + self._get_risk_report(portfolio_prices))
+
+    def get_portfolio_prices(self, portfolio: list[str],
+                             price_store: Optional[PriceStore] = None,
+                             before: Optional[datetime.date] = None
+                             ) -> tuple[PortfolioPrices, list[str]]:
+        """
+        Return the aligned prices of the symbols that were downloaded, and
+        the list of symbols that failed to download.
+        :param before: Optional date, only the sessions before it are kept.
+        A symbol without sessions before the date is reported as failed.
+        """
+        price_store = price_store or PriceStore(self.downloader)
+        price_store.prefetch(portfolio)
+
+        symbols = []
+        frames = []
+        failed = []
         for symbol in portfolio:
-            prices = self.downloader.get_stock_historical_data(symbol)
-            symbol_report = analyst.get_symbol_report(symbol, prices)
-            report.append(formatter.human_readable_report(symbol_report))
-        return ''.join(report)
+            if symbol in price_store.failed:
+                failed.append(symbol)
+                continue
+            prices = price_store.get_stock_historical_data(symbol)
+            if before is not None:
+                prices = prices[get_ordinals(prices.Date) < before.toordinal()]
+                if prices.empty:
+                    failed.append(symbol)
+                    continue
+            symbols.append(symbol)
+            frames.append(prices)
+
+        return portfolio_analyst.align(symbols, frames), failed
+
+    def write_snapshot(self, portfolio: list[str], directory: str,
+                       price_store: Optional[PriceStore] = None) -> list[str]:
+        """
+        Write the stats of the portfolio to the snapshot of a directory.
+        :return: The symbols that failed to download.
+        """
+        portfolio_stats, failed = self._get_portfolio_stats(portfolio,
+                                                            price_store)
+        path = snapshot_analyst.write(directory, portfolio_stats)
+        logger.info(f'write_snapshot: {len(portfolio_stats.prices.symbols)} '
+                    f'symbols written to {path}')
+        return failed
+
+    def invalidate_prices(self, symbol: str) -> None:
+        """
+        Remove the cached prices of a symbol for the current trading date.
+        """
+        if self.cache is not None:
+            self.cache.invalidate(self._get_cache_key(symbol))
 
     # private methods
 
-    @staticmethod
-    def _is_valid_message(text: str) -> bool:
-        if not text:
-            return False
-        parts = text.split(SPACE)
-        return len(parts) == 2
-
-    def _get_symbol(self, text: str) -> str:
-        if not self._is_valid_message(text):
+    def _get_portfolio_stats(self, portfolio: list[str],
+                             price_store: Optional[PriceStore],
+                             extra_periods: Sequence[PeriodSpec] = ()
+                             ) -> tuple[PortfolioStats, list[str]]:
+        """
+        Return the stats of the symbols that were downloaded, and the list
+        of symbols that failed to download.
+        """
+        portfolio_prices, failed = self.get_portfolio_prices(portfolio,
+                                                             price_store)
+        return portfolio_analyst.compute(portfolio_prices,
+                                         extra_periods), failed
+
+    def _get_symbols(self, text: str) -> list[str]:
+        parts = text.split() if text else []
+        if len(parts) < 2:
             logger.error(f'The given command is not valid: {text}')
             raise ValueError(
                 f'Error: please provide a symbol after the command, '
                 f'for example: /price amzn'
             )
 
-        symbol = text.split(SPACE)[1]
-        return symbol
+        if len(parts) == 2:
+            return parts[1:]
+
+        # the same symbol is compared once
+        symbols = list(dict.fromkeys(symbol.upper() for symbol in parts[1:]))
+        if len(symbols) > self.max_symbols:
+            raise ValueError(
+                f'Error: please provide at most {self.max_symbols} symbols'
+            )
+        return symbols
+
+    def _get_many_stats(self, symbols: list[str]
+                        ) -> tuple[PortfolioStats, list[str]]:
+        """
+        Return the stats of the symbols that exist, computed at once, and the
+        list of symbols that do not exist.
+        """
+        portfolio_prices, failed = self._get_many_portfolio_prices(symbols)
+        return portfolio_analyst.compute(portfolio_prices), failed
+
+    def _get_many_portfolio_prices(self, symbols: list[str]
+                                   ) -> tuple[PortfolioPrices, list[str]]:
+        """
+        Return the aligned prices of the symbols that exist, and the list of
+        symbols that do not exist.
+        """
+        prices = self._get_many_prices(symbols)
+        available = [symbol for symbol in symbols if not prices[symbol].empty]
+        failed = [symbol for symbol in symbols if prices[symbol].empty]
+        if not available:
+            raise ValueError(
+                f'Error: the symbols {", ".join(failed)} do not exist')
+
+        return portfolio_analyst.align(
+            available, [prices[symbol] for symbol in available]), failed
+
+    def _get_many_prices(self, symbols: list[str]) -> dict[str, DataFrame]:
+        prices = {}
+        missing = []
+        for symbol in symbols:
+            cached = None
+            if self.cache is not None:
+                cached = self.cache.get(self._get_cache_key(symbol))
+            if cached is None:
+                missing.append(symbol)
+            else:
+                prices[symbol] = cached
+
+        # the symbols downloaded by other commands are not downloaded again
+        calls = self.downloads.do_many([symbol.upper() for symbol in missing],
+                                       self._download_many_prices)
+        for symbol in missing:
+            call = calls[symbol.upper()]
+            if call.exception() is not None:
+                # a failed download is not cached, the next command retries it
+                prices[symbol] = DataFrame()
+                continue
+            symbol_prices = call.result()
+            if self.cache is not None:
+                # an empty dataframe is a symbol that does not exist
+                ttl = self.negative_ttl if symbol_prices.empty else None
+                self.cache.put(self._get_cache_key(symbol), symbol_prices, ttl)
+            prices[symbol] = symbol_prices
+
+        return prices
+
+    def _download_many_prices(self,
+                              symbols: list[str]) -> dict[str, DataFrame]:
+        """
+        Return the prices of the downloaded symbols and an empty dataframe
+        for the symbols that do not exist, the other symbols failed.
+        """
+        # one bulk download, the failed symbols are downloaded again
+        # concurrently without waiting for retries
+        price_store = PriceStore(self.downloader,
+                                 Fetcher(self.downloader, retries=0))
+        price_store.prefetch(symbols)
+        return {**{symbol: DataFrame() for symbol in price_store.unknown},
+                **price_store.prices}
+
+    def _detect_price_anomalies(self, detector: AnomalyDetector,
+                                symbols: list[str], price_store: PriceStore,
+                                triggers: Sequence[Indicator]
+                                ) -> list[Optional[PriceAnomaly]]:
+        """
+        Return the price anomaly of each symbol, like
+        portfolio.get_price_anomalies, with the state of the detector.
+        """
+        anomalies = []
+        for symbol in symbols:
+            prices = price_store.get_stock_historical_data(symbol)
+            anomaly = detector.detect(symbol, prices)
+            if anomaly is None and triggers:
+                anomaly = indicators.get_anomaly(
+                    analyst.get_current_price(prices),
+                    self.indicators.get(symbol, prices), triggers)
+            anomalies.append(anomaly)
+        return anomalies
+
+    @staticmethod
+    def _get_risk_report(prices: PortfolioPrices) -> str:
+        correlations = correlation.compute(prices)
+        pairs = correlation.get_most_correlated(correlations[-1].correlation,
+                                                CORRELATED_PAIRS)
+        correlated_pairs = [
+            (prices.symbols[first], prices.symbols[second],
+             float(correlations[-1].correlation[first, second]))
+            for first, second in pairs]
+        return formatter.human_readable_portfolio_risk(correlations,
+                                                       correlated_pairs)
+
+    @staticmethod
+    def _get_heading(subject: str, stats: PortfolioStats) -> str:
+        return f'The {subject} of {", ".join(stats.prices.symbols)} are'
+
+    @staticmethod
+    def _with_failed_symbols(message: str, failed: list[str]) -> str:
+        if not failed:
+            return message
+        return (message + formatter.MESSAGE_SEPARATOR
+                + formatter.human_readable_failed_symbols(failed))
+
+    def _get_snapshot_stats(self, symbol: str) -> Optional[SymbolStats]:
+        if self.snapshot is None:
+            return None
+        return self.snapshot.get(symbol)
 
     def _get_prices(self, symbol: str) -> DataFrame:
-        prices = self.downloader.get_stock_historical_data(symbol)
+        prices = self._get_cached_prices(symbol)
         if prices.empty:
             message = f'Error: the symbol {symbol} does not exists'
             raise ValueError(message)
 
         return prices
+
+    def _get_cached_prices(self, symbol: str) -> DataFrame:
+        if self.cache is None:
+            return self._download_prices(symbol)
+
+        key = self._get_cache_key(symbol)
+        prices = self.cache.get(key)
+        if prices is None:
+            prices = self._download_prices(symbol)
+            ttl = self.negative_ttl if prices.empty else None
+            if not prices.empty:
+                # the index lives as long as the cached prices
+                range_index.get_index(prices)
+            self.cache.put(key, prices, ttl)
+
+        return prices
+
+    def _download_prices(self, symbol: str) -> DataFrame:
+        return self.downloads.do(
+            symbol.upper(),
+            lambda: self.downloader.get_stock_historical_data(symbol)
+        )
+
+    @staticmethod
+    def _get_cache_key(symbol: str) -> tuple[str, datetime.date]:
+        session_date = get_last_session_date(datetime.datetime.utcnow())
+        return symbol.upper(), session_date
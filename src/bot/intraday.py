@@ -0,0 +1,99 @@
+import datetime
+from typing import Optional
+
+import numpy as np
+
+import src.bot.text_formatter as formatter
+from src.analyst import bounds as bounds_analyst
+from src.analyst.bounds import PeriodBounds
+from src.bot.bot import Bot
+from src.common import logs
+from src.common.types import Direction, Period
+from src.download.fetcher import Fetcher
+from src.download.price_store import PriceStore
+
+logger = logs.get_logger(__name__)
+
+
+class IntradayMonitor:
+    """
+    Checks the live prices of a portfolio against the bounds of the anomaly
+    periods. The bounds are computed from the daily prices once per session,
+    and each breach (symbol, period and direction) is alerted once per
+    session.
+    """
+
+    def __init__(self, bot: Bot, feed,
+                 fetcher: Optional[Fetcher] = None) -> None:
+        """
+        :param bot: Bot used to download the daily prices of the portfolio.
+        :param feed: Feed of the live prices (YahooFeed, ReplayFeed).
+        :param fetcher: Optional concurrent downloader of the daily prices.
+        """
+        self.bot = bot
+        self.feed = feed
+        self.fetcher = fetcher
+        self.session: Optional[datetime.date] = None
+        self.bounds: Optional[PeriodBounds] = None
+        self.columns = np.array([], dtype=int)
+        self.alerted: set[tuple[str, Period, Direction]] = set()
+        self.ticks = 0
+        self.alerts = 0
+
+    def check(self, portfolio: list[str]) -> list[str]:
+        """
+        Check the latest prices of the portfolio.
+        :param portfolio: Symbols to monitor.
+        :return: The alerts of the new breaches, and a message with the
+        symbols that could not be monitored when a session starts.
+        """
+        quotes = self.feed.get_quotes(portfolio)
+        if quotes is None:
+            return []
+
+        messages = []
+        session = quotes.time.date()
+        if session != self.session:
+            messages.extend(self._start_session(portfolio, session))
+        if self.bounds is None:
+            return messages
+
+        self.ticks += 1
+        prices = quotes.prices[self.columns]
+        anomalies = bounds_analyst.get_price_anomalies(self.bounds, prices,
+                                                       session)
+        for symbol, price_anomaly in anomalies.items():
+            key = (symbol, price_anomaly.period, price_anomaly.get_direction())
+            if key in self.alerted:
+                continue
+            self.alerted.add(key)
+            self.alerts += 1
+            messages.append(
+                formatter.human_readable_price_anomaly(symbol, price_anomaly))
+
+        return messages
+
+    def summary(self) -> str:
+        return f'intraday: {self.ticks} ticks, {self.alerts} alerts'
+
+    # private methods
+
+    def _start_session(self, portfolio: list[str],
+                       session: datetime.date) -> list[str]:
+        with logs.log_duration(logger, f'_start_session: {session} bounds'):
+            # every session downloads the closes of the previous sessions
+            price_store = PriceStore(self.bot.downloader, self.fetcher)
+            prices, failed = self.bot.get_portfolio_prices(
+                portfolio, price_store, before=session)
+            self.bounds = bounds_analyst.compute(prices)
+
+        positions = {symbol: position
+                     for position, symbol in enumerate(portfolio)}
+        self.columns = np.array([positions[symbol] for symbol in prices.symbols],
+                                dtype=int)
+        self.session = session
+        self.alerted.clear()
+
+        if failed:
+            return [formatter.human_readable_failed_symbols(failed)]
+        return []
@@ -0,0 +1,24 @@
+"""
+Static replies of the bot.
+This module does not import the analysis libraries, so the commands that
+only need these replies can answer without loading them.
+"""
+
+START = (
+    "I compute statistics about prices, returns and volatility from "
+    "stocks, ETFs and REITs. I get the data from Yahoo Finance.\n\n"
+    "/help will show the list of supported commands."
+)
+
+HELP = (
+    'I support the following commands:\n\n'
+    '/start - show the description of what I can do\n'
+    '/help - show the list of commands I support\n'
+    '/price {symbol} - get price stats\n'
+    '/return {symbol} - get return stats\n'
+    '/vol {symbol} - get volatility stats\n'
+    '/all {symbol} - get price, return, and volatility stats\n'
+    '/ind {symbol} - get moving averages, RSI, and drawdown\n'
+    '/corr {symbol} {symbol} - get the correlations of many symbols\n\n'
+    'Send many symbols to compare them, for example: /all aapl msft goog'
+)
@@ -1,10 +1,28 @@
+import datetime
+import tempfile
+import threading
+import time
 import unittest
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from unittest.mock import MagicMock
 
+import numpy as np
 import pandas as pd
 
+import src.bot.text_formatter as formatter
+from src.alerts.store import MemoryAlertStore
+from src.analyst import analyst, range_index
+from src.analyst.detector import AnomalyDetector
+from src.analyst.parallel import ParallelAnalyst
+from src.analyst.snapshot import Snapshot
 from src.bot.bot import Bot
+from src.common import periods
+from src.common.testing import get_random_prices
+from src.common.ttl_cache import TTLCache
+from src.common.types import BatchPrices, Indicator
+from src.download import download
+from src.download.price_store import PriceStore
 
 
 class BotTests(unittest.TestCase):
@@ -181,6 +199,258 @@ class BotTests(unittest.TestCase):
         # assert
         self.assertEqual(message, expected_message)
 
+    def test_reply_all_stats_given_lean_prices_get_expected_stats(self):
+        # arrange
+        prices = pd.read_csv('src/analyst/test_files/AMZN_from_stockbot.csv')
+        self.downloader_mock.get_stock_historical_data = MagicMock(
+            return_value=download._to_lean(prices))
+        expected_message = Path(
+            'src/bot/test_files/all.txt').read_text().rstrip()
+        # act
+        message = self.bot.reply_all_stats('/all amzn')
+        # assert
+        self.assertEqual(message, expected_message)
+
+    # endregion
+
+    # region snapshot
+
+    def test_reply_all_stats_with_snapshot_do_not_download(self):
+        with tempfile.TemporaryDirectory() as directory:
+            # arrange
+            self._mock_downloader_to_get_historical_data()
+            self.bot.write_snapshot(['AMZN'], directory)
+            self.downloader_mock.reset_mock()
+            snapshot = Snapshot(directory,
+                                clock=lambda: datetime.datetime(2022, 7, 30))
+            bot = Bot(self.downloader_mock, snapshot=snapshot)
+            # act
+            message = bot.reply_all_stats('/all amzn')
+            # assert
+            expected_message = Path(
+                'src/bot/test_files/all.txt').read_text().rstrip()
+            self.assertEqual(message, expected_message)
+            self.downloader_mock.get_many.assert_not_called()
+            self.downloader_mock.get_stock_historical_data.assert_not_called()
+
+    def test_reply_price_stats_with_stale_snapshot_compute_stats(self):
+        with tempfile.TemporaryDirectory() as directory:
+            # arrange
+            self._mock_downloader_to_get_historical_data()
+            self.bot.write_snapshot(['AMZN'], directory)
+            snapshot = Snapshot(directory,
+                                clock=lambda: datetime.datetime(2022, 8, 2))
+            bot = Bot(self.downloader_mock, snapshot=snapshot)
+            # act
+            message = bot.reply_price_stats('/price amzn')
+            # assert
+            expected_message = Path(
+                'src/bot/test_files/price.txt').read_text().rstrip()
+            self.assertEqual(message, expected_message)
+            self.downloader_mock.get_stock_historical_data.assert_called_once()
+            self.assertEqual(snapshot.summary(), 'snapshot: 0 hits, 1 misses')
+
+    # endregion
+
+    # region many symbols
+
+    def test_reply_all_stats_given_many_symbols_download_them_at_once(self):
+        # arrange
+        self._mock_downloader_to_get_historical_data()
+        # act
+        message = self.bot.reply_all_stats('/all amzn msft amzn')
+        # assert
+        self.downloader_mock.get_many.assert_called_once_with(['AMZN', 'MSFT'])
+        self.downloader_mock.get_stock_historical_data.assert_not_called()
+        self.assertTrue(message.startswith('The stats of AMZN, MSFT are:\n'))
+        self.assertIn('\ncurrent price                  134.95      134.95\n',
+                      message)
+        self.assertIn('\nvolatility                     15.36%      15.36%\n',
+                      message)
+
+    def test_reply_return_stats_given_unknown_symbol_compare_the_others(self):
+        # arrange
+        prices = pd.read_csv('src/analyst/test_files/AMZN_from_stockbot.csv')
+        self.downloader_mock.get_many = MagicMock(
+            return_value=BatchPrices(prices={'AMZN': prices}, failed=['AAAA']))
+        self.downloader_mock.get_stock_historical_data = MagicMock(
+            side_effect=ValueError('connection reset'))
+        # act
+        message = self.bot.reply_return_stats('/return amzn aaaa')
+        # assert
+        self.assertEqual(
+            message,
+            ('The returns of AMZN are:\n\n'
+             '                     AMZN\n'
+             'current price      134.95\n'
+             'date           2022-07-29\n'
+             '---\n'
+             '1mo                23.90%\n'
+             '3mo                 8.58%\n'
+             '6mo                -6.27%\n'
+             '12mo              -18.89%\n\n'
+             'Could not get the prices of: AAAA')
+        )
+        # the symbol is downloaded again once, without retries
+        self.downloader_mock.get_stock_historical_data.assert_called_once_with(
+            'AAAA')
+
+    def test_reply_price_stats_given_unknown_symbols_get_error(self):
+        # arrange
+        self._mock_downloader_to_get_empty_historical_data()
+        # act
+        message = self.bot.reply_price_stats('/price aaaa bbbb')
+        # assert
+        self.assertEqual(message,
+                         'Error: the symbols AAAA, BBBB do not exist')
+
+    def test_reply_volatility_stats_given_too_many_symbols_get_error(self):
+        # arrange
+        bot = Bot(self.downloader_mock, max_symbols=2)
+        # act
+        message = bot.reply_volatility_stats('/vol amzn msft goog')
+        # assert
+        self.assertEqual(message, 'Error: please provide at most 2 symbols')
+        self.downloader_mock.get_many.assert_not_called()
+
+    def test_reply_price_stats_given_many_symbols_with_cache_download_once(self):
+        # arrange
+        self._mock_downloader_to_get_historical_data()
+        bot = Bot(self.downloader_mock, TTLCache(max_size=10, ttl=60))
+        # act
+        bot.reply_price_stats('/price amzn')
+        first_message = bot.reply_price_stats('/price amzn msft')
+        second_message = bot.reply_price_stats('/price msft amzn')
+        # assert
+        self.downloader_mock.get_stock_historical_data.assert_called_once()
+        self.downloader_mock.get_many.assert_called_once_with(['MSFT'])
+        self.assertTrue(first_message.startswith('The prices of AMZN, MSFT'))
+        self.assertTrue(second_message.startswith('The prices of MSFT, AMZN'))
+
+    def test_reply_return_stats_given_failed_download_with_cache_download_it_again(self):
+        # arrange
+        prices = pd.read_csv('src/analyst/test_files/AMZN_from_stockbot.csv')
+        self.downloader_mock.get_many = MagicMock(
+            return_value=BatchPrices(prices={'AMZN': prices}, failed=['AAAA']))
+        self.downloader_mock.get_stock_historical_data = MagicMock(
+            side_effect=ValueError('connection reset'))
+        bot = Bot(self.downloader_mock, TTLCache(max_size=10, ttl=60))
+        # act
+        messages = [bot.reply_return_stats('/return amzn aaaa')
+                    for _ in range(2)]
+        # assert
+        self.assertTrue(messages[1].endswith('Could not get the prices of: AAAA'))
+        self.downloader_mock.get_many.assert_called_with(['AAAA'])
+        self.assertEqual(
+            self.downloader_mock.get_stock_historical_data.call_count, 2)
+
+    def test_reply_price_stats_given_unknown_symbols_with_cache_download_once(self):
+        # arrange
+        self._mock_downloader_to_get_empty_historical_data()
+        bot = Bot(self.downloader_mock, TTLCache(max_size=10, ttl=60))
+        # act
+        messages = [bot.reply_price_stats('/price aaaa bbbb')
+                    for _ in range(2)]
+        # assert
+        self.assertEqual(messages,
+                         ['Error: the symbols AAAA, BBBB do not exist'] * 2)
+        self.downloader_mock.get_many.assert_called_once()
+        self.assertEqual(
+            self.downloader_mock.get_stock_historical_data.call_count, 2)
+
+    def test_reply_indicator_stats_success_get_expected_indicators(self):
+        # arrange
+        self._mock_downloader_to_get_historical_data()
+        # act
+        message = self.bot.reply_indicator_stats('/ind amzn')
+        # assert
+        self.assertEqual(
+            message,
+            ('The indicators of AMZN are:\n\n'
+             'Current price:\n'
+             '134.95 (2022-07-29)\n\n'
+             'Stats:\n\n'
+             'moving average: 116.18\n'
+             'exponential average: 118.26\n'
+             'lower band: 103.04\n'
+             'upper band: 129.31\n'
+             'RSI: 68.23\n'
+             'drawdown: -26.98%\n'
+             'max drawdown: -44.64%')
+        )
+
+    def test_reply_indicator_stats_given_new_session_update_the_indicators(
+            self):
+        # arrange
+        prices = pd.read_csv('src/analyst/test_files/AMZN_from_stockbot.csv')
+        self.downloader_mock.get_stock_historical_data = MagicMock(
+            side_effect=[prices[1:], prices])
+        self.bot.reply_indicator_stats('/ind amzn')
+        # act
+        message = self.bot.reply_indicator_stats('/ind amzn')
+        # assert
+        self.assertEqual(self.bot.indicators.rebuilds, 1)
+        self.assertEqual(self.bot.indicators.updates, 1)
+        self.assertIn('\n134.95 (2022-07-29)\n', message)
+        self.assertIn('\nRSI: 68.23\n', message)
+
+    def test_reply_indicator_stats_given_many_symbols_get_table(self):
+        # arrange
+        self._mock_downloader_to_get_historical_data()
+        # act
+        message = self.bot.reply_indicator_stats('/ind amzn msft')
+        # assert
+        self.downloader_mock.get_many.assert_called_once_with(['AMZN', 'MSFT'])
+        self.assertTrue(message.startswith(
+            'The indicators of AMZN, MSFT are:\n'))
+        self.assertIn('\nRSI                       68.23       68.23\n', message)
+        self.assertTrue(message.endswith(
+            '\nmax drawdown            -44.64%     -44.64%'))
+
+    def test_reply_correlation_given_same_prices_get_volatility_of_the_symbol(
+            self):
+        # arrange
+        self._mock_downloader_to_get_historical_data()
+        # act
+        message = self.bot.reply_correlation('/corr amzn msft')
+        # assert
+        self.downloader_mock.get_many.assert_called_once_with(['AMZN', 'MSFT'])
+        self.assertTrue(message.startswith(
+            'The correlations of AMZN, MSFT are:\n\n'
+            '                        AMZN  MSFT\n'
+            '---\n'
+            '1mo\n'
+            'AMZN                    1.00  1.00\n'
+            'MSFT                    1.00  1.00\n'
+            'portfolio volatility  15.36%\n'
+            '---\n'))
+        # the volatility of the same symbol twice is its own volatility
+        self.assertTrue(message.endswith('portfolio volatility  43.50%'))
+
+    def test_reply_correlation_given_one_symbol_get_error(self):
+        # arrange
+        self._mock_downloader_to_get_historical_data()
+        # act
+        message = self.bot.reply_correlation('/corr amzn amzn')
+        # assert
+        self.assertEqual(
+            message,
+            'Error: please provide at least 2 symbols, for example: /corr amzn msft')
+        self.downloader_mock.get_many.assert_not_called()
+
+    def test_reply_correlation_given_unknown_symbol_get_error(self):
+        # arrange
+        prices = pd.read_csv('src/analyst/test_files/AMZN_from_stockbot.csv')
+        self.downloader_mock.get_many = MagicMock(
+            return_value=BatchPrices(prices={'AMZN': prices}, failed=['AAAA']))
+        self.downloader_mock.get_stock_historical_data = MagicMock(
+            return_value=pd.DataFrame())
+        # act
+        message = self.bot.reply_correlation('/corr amzn aaaa')
+        # assert
+        self.assertEqual(message, 'Error: could not get the prices of AAAA, '
+                                  'at least 2 symbols are needed')
+
     # endregion
 
     # region monitor portfolio
@@ -206,6 +476,79 @@ class BotTests(unittest.TestCase):
              'Old 3mo values: Min: 102.31 (2022-06-14), Max: 134.95 (2022-07-29)')
         )
 
+    def test_monitor_portfolio_given_triggers_alert_indicators(self):
+        # arrange
+        prices = pd.read_csv('src/analyst/test_files/AMZN_from_stockbot.csv')
+        # a rally of 20 sessions, then a small drop below the 1mo max
+        prices.loc[1:20, 'Close'] = np.arange(130.0, 110.0, -1.0)
+        prices.loc[0, 'Close'] = 129.9
+        self.downloader_mock.get_many = MagicMock(
+            return_value=BatchPrices(prices={'AMZN': prices}, failed=[]))
+        # act
+        messages = self.bot.monitor_portfolio(
+            ['AMZN'], triggers=[Indicator.BOLLINGER, Indicator.RSI])
+        # assert
+        self.assertEqual(
+            messages,
+            ['RSI alert for AMZN:\n'
+             'RSI above the upper bound: 72.53 (2022-07-29)\n'
+             '3wk bounds: Lower: 30.00, Upper: 70.00'])
+
+    def test_monitor_portfolio_given_alert_store_alert_same_breach_once(self):
+        portfolio = ['AMZN']
+        self._mock_downloader_to_get_historical_data()
+        alert_store = MemoryAlertStore()
+        # act
+        first_messages = self.bot.monitor_portfolio(portfolio,
+                                                    alert_store=alert_store)
+        messages = self.bot.monitor_portfolio(portfolio, alert_store=alert_store)
+        # assert
+        self.assertIn('Price alert for AMZN', first_messages[0])
+        self.assertEqual(messages, ['No new price alerts for today'])
+
+    def test_get_portfolio_alerts_given_alert_store_alert_until_recorded(self):
+        portfolio = ['AMZN']
+        self._mock_downloader_to_get_historical_data()
+        alert_store = MemoryAlertStore()
+        # act
+        first_messages, _ = self.bot.get_portfolio_alerts(
+            portfolio, alert_store=alert_store)
+        messages, pending_alerts = self.bot.get_portfolio_alerts(
+            portfolio, alert_store=alert_store)
+        alert_store.replace(pending_alerts)
+        last_messages, _ = self.bot.get_portfolio_alerts(
+            portfolio, alert_store=alert_store)
+        # assert
+        self.assertEqual(messages, first_messages)
+        self.assertIn('Price alert for AMZN', messages[0])
+        self.assertEqual(last_messages, ['No new price alerts for today'])
+
+    def test_monitor_portfolio_given_saved_detector_same_alerts_as_analyst(self):
+        # arrange
+        portfolio = [f'S{i}' for i in range(6)]
+        histories = {symbol: get_random_prices(300, seed=i, walk=True)
+                     for i, symbol in enumerate(portfolio)}
+        triggers = [Indicator.BOLLINGER, Indicator.RSI]
+        with tempfile.TemporaryDirectory() as directory:
+            path = str(Path(directory) / 'detector.json')
+            for day in range(10, -1, -1):  # from old to new sessions
+                self.downloader_mock.get_many = MagicMock(
+                    return_value=BatchPrices(prices={
+                        symbol: history[day:].reset_index(drop=True)
+                        for symbol, history in histories.items()
+                    }, failed=[]))
+                expected_messages = self.bot.monitor_portfolio(
+                    portfolio, triggers=triggers)
+                # every run loads the state saved by the previous run
+                detector = AnomalyDetector(path)
+                # act
+                messages = self.bot.monitor_portfolio(
+                    portfolio, triggers=triggers, detector=detector)
+                detector.save()
+                # assert
+                self.assertEqual(messages, expected_messages, f'day {day}')
+        self.assertEqual((detector.updates, detector.rebuilds), (6, 0))
+
     # endregion
 
     # region report portfolio
@@ -235,6 +578,194 @@ class BotTests(unittest.TestCase):
             '12mo: -18.89%\n')
         )
 
+    def test_report_portfolio_given_extra_periods_report_them_last(self):
+        portfolio = ['AMZN']
+        self._mock_downloader_to_get_historical_data()
+        # act
+        report = self.bot.report_portfolio(
+            portfolio, extra_periods=periods.parse_periods('ytd,30d'))
+        # assert
+        self.assertTrue(report.endswith(
+            '12mo: -18.89%\n'
+            'ytd: -19.05%\n'
+            '30d: 30.19%\n'
+        ))
+
+    def test_report_portfolio_given_compact_return_table(self):
+        portfolio = ['AMZN', 'MSFT']
+        self._mock_downloader_to_get_historical_data()
+        # act
+        report = self.bot.report_portfolio(portfolio, compact=True)
+        # assert
+        self.assertEqual(
+            report,
+            ('Portfolio report\n\n'
+             'symbol   price     1wk     2wk     3wk     1mo    3mo     6mo     12mo\n'
+             'AMZN    134.95  10.24%  18.85%  16.80%  23.90%  8.58%  -6.27%  -18.89%\n'
+             'MSFT    134.95  10.24%  18.85%  16.80%  23.90%  8.58%  -6.27%  -18.89%\n')
+        )
+
+    def test_report_portfolio_given_risk_add_risk_section(self):
+        portfolio = ['AMZN', 'MSFT']
+        self._mock_downloader_to_get_historical_data()
+        # act
+        report = self.bot.report_portfolio(portfolio, risk=True)
+        # assert
+        self.assertTrue(report.startswith(
+            self.bot.report_portfolio(portfolio).rstrip('\n') + '\n\n'))
+        self.assertTrue(report.endswith(
+            'Portfolio risk\n\n'
+            'period  volatility\n'
+            '1mo         15.36%\n'
+            '3mo         31.48%\n'
+            '6mo         39.95%\n'
+            '12mo        43.50%\n\n'
+            'Most correlated in 12mo:\n\n'
+            'pair       correlation\n'
+            'AMZN-MSFT         1.00\n'
+        ))
+
+    def test_report_portfolio_given_many_symbols_same_text_as_symbol_reports(self):
+        # arrange
+        frames = {f'S{i}': get_random_prices(length, seed=i)
+                  for i, length in enumerate([300, 40, 260, 1])}
+        self.downloader_mock.get_many = MagicMock(
+            side_effect=lambda symbols: BatchPrices(prices=frames, failed=[]))
+        # act
+        report = self.bot.report_portfolio(list(frames))
+        # assert
+        expected_report = 'Portfolio report\n' + ''.join(
+            formatter.human_readable_report(
+                analyst.get_symbol_report(symbol, frame))
+            for symbol, frame in frames.items())
+        self.assertEqual(report, expected_report)
+
+    def test_monitor_and_report_portfolio_given_parallel_analyst_same_messages(
+            self):
+        # arrange
+        frames = {f'S{i}': get_random_prices(length, seed=i)
+                  for i, length in enumerate([300, 40, 260, 1])}
+        self.downloader_mock.get_many = MagicMock(
+            side_effect=lambda symbols: BatchPrices(prices=frames, failed=[]))
+        parallel = ParallelAnalyst(workers=2, min_symbols=1)
+        self.addCleanup(parallel.close)
+        parallel_bot = Bot(self.downloader_mock, parallel=parallel)
+        # act
+        messages = parallel_bot.monitor_portfolio(list(frames))
+        report = parallel_bot.report_portfolio(list(frames), compact=True)
+        # assert
+        self.assertEqual(messages, self.bot.monitor_portfolio(list(frames)))
+        self.assertEqual(report,
+                         self.bot.report_portfolio(list(frames), compact=True))
+
+    def test_monitor_and_report_portfolio_with_price_store_download_once(self):
+        portfolio = ['AMZN']
+        self._mock_downloader_to_get_historical_data()
+        price_store = PriceStore(self.downloader_mock)
+        # act
+        self.bot.monitor_portfolio(portfolio, price_store)
+        self.bot.report_portfolio(portfolio, price_store)
+        # assert
+        self.downloader_mock.get_many.assert_called_once_with(['AMZN'])
+        self.downloader_mock.get_stock_historical_data.assert_not_called()
+        self.assertEqual(price_store.fetches, 1)
+        self.assertEqual(price_store.hits, 2)
+
+    def test_monitor_portfolio_given_failed_symbol_alert_the_other_symbols(self):
+        portfolio = ['AMZN', 'AAAA']
+        self._mock_downloader_to_get_historical_data()
+        self.downloader_mock.get_many = MagicMock(
+            side_effect=lambda symbols: BatchPrices(
+                prices={'AMZN': self.downloader_mock.get_stock_historical_data()},
+                failed=['AAAA']))
+        fetcher = MagicMock()
+        fetcher.fetch = MagicMock(
+            return_value=BatchPrices(prices={}, failed=['AAAA']))
+        price_store = PriceStore(self.downloader_mock, fetcher)
+        # act
+        messages = self.bot.monitor_portfolio(portfolio, price_store)
+        report = self.bot.report_portfolio(portfolio, price_store)
+        # assert
+        self.assertEqual(len(messages), 2)
+        self.assertTrue(messages[0].startswith('Price alert for AMZN:\n'))
+        self.assertEqual(messages[1], 'Could not get the prices of: AAAA')
+        self.assertTrue(report.startswith('Portfolio report\n\nAMZN price:'))
+        self.assertTrue(report.endswith('\nCould not get the prices of: AAAA\n'))
+        fetcher.fetch.assert_called_once_with(['AAAA'])
+
+    # endregion
+
+    # region prices cache
+
+    def test_reply_all_stats_with_cache_download_once(self):
+        # arrange
+        self._mock_downloader_to_get_historical_data()
+        cache = TTLCache(max_size=10, ttl=60)
+        bot = Bot(self.downloader_mock, cache)
+        expected_message = Path(
+            'src/bot/test_files/all.txt').read_text().rstrip()
+        # act
+        messages = [bot.reply_all_stats('/all amzn') for _ in range(3)]
+        # assert
+        self.assertEqual(messages, [expected_message] * 3)
+        self.downloader_mock.get_stock_historical_data.assert_called_once()
+        self.assertEqual(cache.hits, 2)
+        self.assertEqual(cache.misses, 1)
+        # the cached prices keep their range index
+        prices = self.downloader_mock.get_stock_historical_data.return_value
+        self.assertIsNotNone(range_index.find_index(prices))
+
+    def test_reply_price_stats_with_cache_cache_unknown_symbol(self):
+        # arrange
+        self._mock_downloader_to_get_empty_historical_data()
+        bot = Bot(self.downloader_mock, TTLCache(max_size=10, ttl=60))
+        expected_message = 'Error: the symbol aaaa does not exists'
+        # act
+        messages = [bot.reply_price_stats('/price aaaa') for _ in range(2)]
+        # assert
+        self.assertEqual(messages, [expected_message] * 2)
+        self.downloader_mock.get_stock_historical_data.assert_called_once()
+
+    def test_reply_all_stats_concurrent_requests_share_one_download(self):
+        # arrange
+        prices = pd.read_csv('src/analyst/test_files/AMZN_from_stockbot.csv')
+        started = threading.Event()
+        release = threading.Event()
+
+        def get_prices(symbol):
+            started.set()
+            release.wait(5)
+            return prices
+
+        self.downloader_mock.get_stock_historical_data = MagicMock(
+            side_effect=get_prices)
+        expected_message = Path(
+            'src/bot/test_files/all.txt').read_text().rstrip()
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            first = executor.submit(self.bot.reply_all_stats, '/all amzn')
+            started.wait(5)
+            others = [executor.submit(self.bot.reply_all_stats, '/all AMZN')
+                      for _ in range(2)]
+            time.sleep(0.1)  # let the other calls reach the single flight
+            # act
+            release.set()
+            messages = [first.result()] + [other.result() for other in others]
+        # assert
+        self.assertEqual(messages[0], expected_message)
+        self.downloader_mock.get_stock_historical_data.assert_called_once()
+
+    def test_invalidate_prices_download_the_symbol_again(self):
+        # arrange
+        self._mock_downloader_to_get_historical_data()
+        bot = Bot(self.downloader_mock, TTLCache(max_size=10, ttl=60))
+        bot.reply_price_stats('/price amzn')
+        # act
+        bot.invalidate_prices('AMZN')
+        bot.reply_price_stats('/price amzn')
+        # assert
+        self.assertEqual(
+            self.downloader_mock.get_stock_historical_data.call_count, 2)
+
     # endregion
 
     # region private methods
@@ -244,10 +775,15 @@ class BotTests(unittest.TestCase):
             'src/analyst/test_files/AMZN_from_stockbot.csv')
         self.downloader_mock.get_stock_historical_data = MagicMock(
             return_value=expected_df)
+        self.downloader_mock.get_many = MagicMock(
+            side_effect=lambda symbols: BatchPrices(
+                prices={symbol: expected_df for symbol in symbols}, failed=[]))
 
     def _mock_downloader_to_get_empty_historical_data(self):
         expected_df = pd.DataFrame([])
         self.downloader_mock.get_stock_historical_data = MagicMock(
             return_value=expected_df)
+        self.downloader_mock.get_many = MagicMock(
+            side_effect=lambda symbols: BatchPrices(prices={}, failed=symbols))
 
     # endregion
@@ -0,0 +1,75 @@
+import unittest
+from unittest.mock import MagicMock
+
+import pandas as pd
+
+from src.bot.bot import Bot
+from src.bot.intraday import IntradayMonitor
+from src.common.types import BatchPrices
+from src.download.feed import ReplayFeed
+
+
+class IntradayMonitorTests(unittest.TestCase):
+
+    def setUp(self):
+        prices = pd.read_csv('src/analyst/test_files/AMZN_from_stockbot.csv')
+        self.downloader_mock = MagicMock()
+        self.downloader_mock.get_many = MagicMock(
+            side_effect=lambda symbols: BatchPrices(
+                prices={'AMZN': prices},
+                failed=[symbol for symbol in symbols if symbol != 'AMZN']))
+        self.fetcher_mock = MagicMock()
+        self.fetcher_mock.fetch = MagicMock(
+            side_effect=lambda symbols: BatchPrices(prices={}, failed=symbols))
+        self.bot = Bot(self.downloader_mock)
+
+    def test_check_given_repeated_breach_alert_once_per_session(self):
+        # arrange
+        feed = self._get_feed([
+            ('2022-08-01 09:30', 130.0),  # within the bounds
+            ('2022-08-01 09:31', 90.0),  # new 12mo min
+            ('2022-08-01 09:32', 80.0),  # same breach
+            ('2022-08-02 09:30', 80.0),  # same breach in a new session
+        ])
+        monitor = IntradayMonitor(self.bot, feed, self.fetcher_mock)
+        # act
+        messages = [monitor.check(['AMZN']) for _ in range(4)]
+        # assert
+        self.assertEqual(messages[0], [])
+        self.assertEqual(len(messages[1]), 1)
+        self.assertIn('New 12mo Min price: 90.00 (2022-08-01)', messages[1][0])
+        self.assertEqual(messages[2], [])
+        self.assertEqual(len(messages[3]), 1)
+        self.assertIn('New 12mo Min price: 80.00 (2022-08-02)', messages[3][0])
+        self.assertEqual(self.downloader_mock.get_many.call_count, 2)
+        self.assertEqual(monitor.summary(), 'intraday: 4 ticks, 2 alerts')
+
+    def test_check_given_breach_in_other_direction_alert_it(self):
+        # arrange
+        feed = self._get_feed([
+            ('2022-08-01 09:30', 90.0),  # new 12mo min
+            ('2022-08-01 09:31', 200.0),  # new 12mo max
+        ])
+        monitor = IntradayMonitor(self.bot, feed, self.fetcher_mock)
+        # act
+        messages = [monitor.check(['AMZN']) for _ in range(2)]
+        # assert
+        self.assertIn('New 12mo Min price', messages[0][0])
+        self.assertIn('New 12mo Max price', messages[1][0])
+
+    def test_check_given_failed_symbol_monitor_the_other_symbols(self):
+        # arrange
+        feed = self._get_feed([('2022-08-01 09:30', 90.0)])
+        monitor = IntradayMonitor(self.bot, feed, self.fetcher_mock)
+        # act
+        messages = monitor.check(['AAAA', 'AMZN'])
+        # assert
+        self.assertEqual(len(messages), 2)
+        self.assertEqual(messages[0], 'Could not get the prices of: AAAA')
+        self.assertIn('Price alert for AMZN', messages[1])
+
+    @staticmethod
+    def _get_feed(ticks: list[tuple[str, float]]) -> ReplayFeed:
+        times, prices = zip(*ticks)
+        return ReplayFeed(pd.DataFrame(
+            {'AMZN': prices, 'AAAA': prices}, index=pd.to_datetime(times)))
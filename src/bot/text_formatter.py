@@ -1,76 +1,337 @@
+"""
+Human readable messages of the bot.
+The layouts of the messages are format strings built once at import time,
+with the number formats inside the layout, and long messages are rendered
+in a single buffer. The numbers of a whole portfolio are formatted at once
+with vectorized operations.
+"""
+import io
+import itertools
+from functools import lru_cache
+from typing import TYPE_CHECKING, Optional
+
+import numpy as np
+
+from src.common.constants import MAX_MESSAGE_LENGTH
 from src.common.types import (
-    Period, PriceStats, AnnualStats, AnnualPriceStats, PriceAnomaly,
-    SymbolReport
+    ANNUAL_PERIODS, Period, PriceStats, AnnualStats, AnnualPriceStats,
+    PriceAnomaly, SymbolReport, ClosePrice, Indicator
 )
 
+if TYPE_CHECKING:
+    from src.analyst.correlation import PeriodCorrelation
+    from src.analyst.indicators import Indicators
+    from src.analyst.portfolio import PortfolioReport
+
+MESSAGE_SEPARATOR = '\n\n'
+REPORT_TITLE = 'Portfolio report\n'
+RISK_TITLE = 'Portfolio risk\n'
+
+# layouts
+
+_STATS_REPLY_LAYOUT = (
+    '{}:\n\n'
+    'Current price:\n'
+    '{:.2f} ({})\n\n'
+    'Stats:\n\n'
+)
+_PRICE_STATS_LAYOUT = (
+    '{}\n'
+    'min price: {:.2f} ({})\n'
+    'max price: {:.2f} ({})\n'
+    'min-max price diff: {:.2f}%\n'
+    'max negative 1-day change: {:.2f}%\n'
+    'max positive 1-day change: {:.2f}%\n'
+)
+_RETURN_VOLATILITY_LAYOUT = (
+    'return: {:.2f}%\n'
+    'volatility: {:.2f}%\n'
+)
+_ANNUAL_STATS_LAYOUT = '\n'.join(
+    f'{period.value}: {{:.2f}}%' for period in ANNUAL_PERIODS)
+_PERIOD_SEPARATOR = '---'
+_PRICE_ANOMALY_LAYOUT = (
+    'Price alert for {}:\n'
+    'New {} {} price: {:.2f} ({})\n'
+    'Old {} values: Min: {:.2f} ({}), Max: {:.2f} ({})'
+)
+_INDICATOR_ANOMALY_LAYOUT = (
+    '{} alert for {}:\n'
+    '{} {} the {} {}: {:.2f} ({})\n'
+    '{} {}: Lower: {:.2f}, Upper: {:.2f}'
+)
+# title, name of the value and name of the bounds of each indicator
+_INDICATOR_NAMES = {
+    Indicator.BOLLINGER: ('Bollinger', 'Price', 'band'),
+    Indicator.RSI: ('RSI', 'RSI', 'bound'),
+}
+# the prices and the RSI are decimals, the drawdowns are percentages
+_INDICATOR_LABELS = ['moving average', 'exponential average', 'lower band',
+                     'upper band', 'RSI', 'drawdown', 'max drawdown']
+_INDICATORS_LAYOUT = '\n'.join(
+    [f'{label}: {{:.2f}}' for label in _INDICATOR_LABELS[:5]]
+    + [f'{label}: {{:.2f}}%' for label in _INDICATOR_LABELS[5:]])
+_REPORT_PERIODS = tuple(period.value for period in Period)
+
+
+def human_readable_stats_reply(heading: str, current_price: ClosePrice,
+                               readable_stats: str) -> str:
+    """
+    Return the reply of a stats command.
+    :param heading: First line of the reply, without the colon.
+    :param current_price: Last close price of the symbol.
+    :param readable_stats: Human readable stats of the symbol.
+    """
+    return _STATS_REPLY_LAYOUT.format(
+        heading, current_price.value, current_price.date) + readable_stats
+
 
 def human_readable_prices(price_stats: AnnualPriceStats) -> str:
-    result = _human_readable_price_stats(Period.MONTH, price_stats.month)
-    result += '---\n'
-    result += _human_readable_price_stats(Period.QUARTER, price_stats.quarter)
-    result += '---\n'
-    result += _human_readable_price_stats(Period.HALF, price_stats.half)
-    result += '---\n'
-    result += _human_readable_price_stats(Period.YEAR, price_stats.year)
-    result += '---'
-    return result
+    buffer = io.StringIO()
+    for period, stats in zip(ANNUAL_PERIODS, price_stats):
+        _write_price_stats(buffer, period, stats)
+        buffer.write(_PERIOD_SEPARATOR)
+        buffer.write('\n')
+    return buffer.getvalue()[:-1]
 
 
 def human_readable_annual_stats(annual_stats: AnnualStats) -> str:
-    return (
-        f'{Period.MONTH}: {as_percentage(annual_stats.month)}\n'
-        f'{Period.QUARTER}: {as_percentage(annual_stats.quarter)}\n'
-        f'{Period.HALF}: {as_percentage(annual_stats.half)}\n'
-        f'{Period.YEAR}: {as_percentage(annual_stats.year)}'
-    )
+    return _ANNUAL_STATS_LAYOUT.format(*(value * 100 for value in annual_stats))
 
 
 def human_readable_all_annual_stats(price_stats: AnnualPriceStats,
                                     return_stats: AnnualStats,
                                     volatility_stats: AnnualStats) -> str:
-    result = _human_readable_price_stats(Period.MONTH, price_stats.month)
-    result += f'return: {as_percentage(return_stats.month)}\n'
-    result += f'volatility: {as_percentage(volatility_stats.month)}\n'
-    result += '---\n'
-    result += _human_readable_price_stats(Period.QUARTER, price_stats.quarter)
-    result += f'return: {as_percentage(return_stats.quarter)}\n'
-    result += f'volatility: {as_percentage(volatility_stats.quarter)}\n'
-    result += '---\n'
-    result += _human_readable_price_stats(Period.HALF, price_stats.half)
-    result += f'return: {as_percentage(return_stats.half)}\n'
-    result += f'volatility: {as_percentage(volatility_stats.half)}\n'
-    result += '---\n'
-    result += _human_readable_price_stats(Period.YEAR, price_stats.year)
-    result += f'return: {as_percentage(return_stats.year)}\n'
-    result += f'volatility: {as_percentage(volatility_stats.year)}\n'
-    result += '---'
-    return result
+    buffer = io.StringIO()
+    for period, stats, return_value, volatility in zip(
+            ANNUAL_PERIODS, price_stats, return_stats, volatility_stats):
+        _write_price_stats(buffer, period, stats)
+        buffer.write(_RETURN_VOLATILITY_LAYOUT.format(return_value * 100,
+                                                      volatility * 100))
+        buffer.write(_PERIOD_SEPARATOR)
+        buffer.write('\n')
+    return buffer.getvalue()[:-1]
 
 
 def human_readable_price_anomaly(symbol, price_anomaly: PriceAnomaly) -> str:
+    if price_anomaly.indicator is not None:
+        return _human_readable_indicator_anomaly(symbol, price_anomaly,
+                                                 price_anomaly.indicator)
+
     min_or_max = 'Min' if price_anomaly.is_new_min() else 'Max'
-    return (
-        f'Price alert for {symbol}:\n'
-        f'New {price_anomaly.period} {min_or_max} price:'
-        f' {as_decimal(price_anomaly.current_price.value)}'
-        f' ({price_anomaly.current_price.date})\n'
-        f'Old {price_anomaly.period} values:'
-        f' Min: {as_decimal(price_anomaly.min_price.value)} ({price_anomaly.min_price.date}),'
-        f' Max: {as_decimal(price_anomaly.max_price.value)} ({price_anomaly.max_price.date})'
-    )
+    period = price_anomaly.period.value
+    current_price = price_anomaly.current_price
+    min_price = price_anomaly.min_price
+    max_price = price_anomaly.max_price
+    return _PRICE_ANOMALY_LAYOUT.format(
+        symbol, period, min_or_max, current_price.value, current_price.date,
+        period, min_price.value, min_price.date, max_price.value,
+        max_price.date)
+
+
+def human_readable_indicators(indicators: 'Indicators') -> str:
+    """
+    Return the indicators of the last close of a symbol.
+    """
+    return _INDICATORS_LAYOUT.format(
+        *indicators[:5], indicators.drawdown * 100,
+        indicators.max_drawdown * 100)
 
 
 def human_readable_report(symbol_report: SymbolReport) -> str:
-    return (
-        f'\n{symbol_report.symbol} price: {as_decimal(symbol_report.current_price)}\n'
-        f'{symbol_report.week.period}: {as_percentage(symbol_report.week.change_in_period)}\n'
-        f'{symbol_report.two_weeks.period}: {as_percentage(symbol_report.two_weeks.change_in_period)}\n'
-        f'{symbol_report.three_weeks.period}: {as_percentage(symbol_report.three_weeks.change_in_period)}\n'
-        f'{symbol_report.month.period}: {as_percentage(symbol_report.month.change_in_period)}\n'
-        f'{symbol_report.quarter.period}: {as_percentage(symbol_report.quarter.change_in_period)}\n'
-        f'{symbol_report.half.period}: {as_percentage(symbol_report.half.change_in_period)}\n'
-        f'{symbol_report.year.period}: {as_percentage(symbol_report.year.change_in_period)}\n'
-    )
+    periods = symbol_report[2:]
+    return _get_symbol_report_layout(_REPORT_PERIODS).format(
+        symbol_report.symbol, as_decimal(symbol_report.current_price),
+        *(as_percentage(report.change_in_period) for report in periods))
+
+
+def human_readable_portfolio_report(report: 'PortfolioReport',
+                                    failed: list[str],
+                                    compact: bool = False) -> str:
+    """
+    Return the report of a portfolio.
+    :param report: Prices and changes of the symbols of the portfolio.
+    :param failed: Symbols that could not be reported.
+    :param compact: Render the symbols as the rows of a table, instead of a
+    paragraph per symbol.
+    """
+    buffer = io.StringIO()
+    buffer.write(REPORT_TITLE)
+    # the numbers of the report are formatted before rendering the layouts
+    prices = format_decimals(report.current_price)
+    changes = format_percentages(report.change_in_period)
+    periods = tuple(report.periods)
+    if compact:
+        titles = ['symbol', 'price', *periods]
+        _write_table(buffer, titles, [report.symbols, prices, *changes])
+    else:
+        layout = _get_symbol_report_layout(periods)
+        for row in zip(report.symbols, prices, *changes):
+            buffer.write(layout.format(*row))
+
+    if failed:
+        buffer.write(f'\n{human_readable_failed_symbols(failed)}\n')
+
+    return buffer.getvalue()
+
+
+def human_readable_annual_comparison(heading: str, symbols: list[str],
+                                     current_prices: list[ClosePrice],
+                                     annual_stats: list[AnnualStats]) -> str:
+    """
+    Return a table that compares the stats of many symbols, with a row per
+    period and a column per symbol.
+    :param heading: First line of the reply, without the colon.
+    """
+    rows = [[_PERIOD_SEPARATOR]]
+    for position, period in enumerate(ANNUAL_PERIODS):
+        rows.append([period.value, *(as_percentage(stats[position])
+                                     for stats in annual_stats)])
+    buffer = io.StringIO()
+    _write_comparison(buffer, heading, symbols, current_prices, rows)
+    return buffer.getvalue().rstrip('\n')
+
+
+def human_readable_price_comparison(
+        heading: str, symbols: list[str], current_prices: list[ClosePrice],
+        price_stats: list[AnnualPriceStats],
+        return_stats: Optional[list[AnnualStats]] = None,
+        volatility_stats: Optional[list[AnnualStats]] = None) -> str:
+    """
+    Return a table that compares the price stats of many symbols, with a
+    section per period and a column per symbol. The return and volatility
+    stats are added to each period when they are given.
+    :param heading: First line of the reply, without the colon.
+    """
+    rows = []
+    for position, period in enumerate(ANNUAL_PERIODS):
+        period_stats = [stats[position] for stats in price_stats]
+        rows.append([_PERIOD_SEPARATOR])
+        rows.append([period.value])
+        rows.append(['min price', *(as_decimal(stats.min_price.value)
+                                    for stats in period_stats)])
+        rows.append(['max price', *(as_decimal(stats.max_price.value)
+                                    for stats in period_stats)])
+        rows.append(['min-max price diff', *(
+            as_percentage(stats.min_price_max_price_difference)
+            for stats in period_stats)])
+        rows.append(['max negative 1-day change', *(
+            as_percentage(stats.max_negative_change) for stats in period_stats)])
+        rows.append(['max positive 1-day change', *(
+            as_percentage(stats.max_positive_change) for stats in period_stats)])
+        if return_stats is not None:
+            rows.append(['return', *(as_percentage(stats[position])
+                                     for stats in return_stats)])
+        if volatility_stats is not None:
+            rows.append(['volatility', *(as_percentage(stats[position])
+                                         for stats in volatility_stats)])
+    buffer = io.StringIO()
+    _write_comparison(buffer, heading, symbols, current_prices, rows)
+    return buffer.getvalue().rstrip('\n')
+
+
+def human_readable_indicator_comparison(heading: str, symbols: list[str],
+                                        current_prices: list[ClosePrice],
+                                        indicators: 'Indicators') -> str:
+    """
+    Return a table that compares the indicators of many symbols, with a row
+    per indicator and a column per symbol.
+    :param heading: First line of the reply, without the colon.
+    :param indicators: Indicators with a value per symbol.
+    """
+    rows = [[_PERIOD_SEPARATOR]]
+    values = [*format_decimals(np.array(indicators[:5])),
+              *format_percentages(np.array(indicators[5:]))]
+    rows.extend([label, *row] for label, row in zip(_INDICATOR_LABELS, values))
+    buffer = io.StringIO()
+    _write_comparison(buffer, heading, symbols, current_prices, rows)
+    return buffer.getvalue().rstrip('\n')
+
+
+def human_readable_correlation(heading: str, symbols: list[str],
+                               correlations: list['PeriodCorrelation']) -> str:
+    """
+    Return the correlation matrices of many symbols, with a section per
+    period, a row and a column per symbol, and the volatility of the
+    portfolio with the same weight for each symbol.
+    :param heading: First line of the reply, without the colon.
+    """
+    rows = []
+    for period_correlation in correlations:
+        rows.append([_PERIOD_SEPARATOR])
+        rows.append([period_correlation.period.value])
+        rows.extend([symbol, *values] for symbol, values in zip(
+            symbols, format_decimals(period_correlation.correlation)))
+        rows.append(['portfolio volatility',
+                     as_percentage(period_correlation.volatility)])
+    buffer = io.StringIO()
+    buffer.write(f'{heading}:\n')
+    _write_rows(buffer, ['', *symbols], rows)
+    return buffer.getvalue().rstrip('\n')
+
+
+def human_readable_portfolio_risk(
+        correlations: list['PeriodCorrelation'],
+        correlated_pairs: list[tuple[str, str, float]]) -> str:
+    """
+    Return the risk section of the portfolio report.
+    :param correlations: Correlations of the portfolio by period.
+    :param correlated_pairs: Most correlated pairs of symbols of the last
+    period, with their correlation.
+    """
+    buffer = io.StringIO()
+    buffer.write(RISK_TITLE)
+    _write_table(buffer, ['period', 'volatility'], [
+        [correlation.period.value for correlation in correlations],
+        [as_percentage(correlation.volatility)
+         for correlation in correlations],
+    ])
+    if correlated_pairs:
+        buffer.write(f'\nMost correlated in '
+                     f'{correlations[-1].period.value}:\n')
+        _write_table(buffer, ['pair', 'correlation'], [
+            [f'{first}-{second}' for first, second, _ in correlated_pairs],
+            [as_decimal(value) for _, _, value in correlated_pairs],
+        ])
+    return buffer.getvalue()
+
+
+def human_readable_failed_symbols(symbols: list[str]) -> str:
+    return f'Could not get the prices of: {", ".join(symbols)}'
+
+
+def join_messages(messages: list[str],
+                  max_length: int = MAX_MESSAGE_LENGTH) -> list[str]:
+    """
+    Join consecutive messages separated by a blank line, so they are sent
+    with as few messages as possible. A message longer than the maximum
+    length is not split.
+    """
+    joined: list[str] = []
+    for message in messages:
+        if joined and _joined_length(joined[-1], message) <= max_length:
+            joined[-1] += MESSAGE_SEPARATOR + message
+        else:
+            joined.append(message)
+    return joined
+
+
+def split_message(message: str,
+                  max_length: int = MAX_MESSAGE_LENGTH) -> list[str]:
+    """
+    Split a message in chunks no longer than the maximum length. The message
+    is split between paragraphs first, then between lines.
+    """
+    if len(message) <= max_length:
+        return [message]
+
+    pieces = []
+    for paragraph in message.split(MESSAGE_SEPARATOR):
+        if len(paragraph) <= max_length:
+            pieces.append(paragraph)
+        else:
+            pieces.extend(_split_lines(paragraph, max_length))
+    return join_messages(pieces, max_length)
 
 
 def as_percentage(value: float) -> str:
@@ -81,15 +342,122 @@ def as_decimal(value: float) -> str:
     return '{:.2f}'.format(value)
 
 
+def format_decimals(values: np.ndarray) -> list:
+    """
+    Return the values formatted like as_decimal, in lists of the same shape.
+    """
+    return _format_array('%.2f', values)
+
+
+def format_percentages(values: np.ndarray) -> list:
+    """
+    Return the values formatted like as_percentage, in lists of the same
+    shape.
+    """
+    return _format_array('%.2f%%', values * 100)
+
+
 # private methods
 
 
-def _human_readable_price_stats(period: Period, stats: PriceStats):
-    return (
-        f'{period}\n'
-        f'min price: {as_decimal(stats.min_price.value)} ({stats.min_price.date})\n'
-        f'max price: {as_decimal(stats.max_price.value)} ({stats.max_price.date})\n'
-        f'min-max price diff: {as_percentage(stats.min_price_max_price_difference)}\n'
-        f'max negative 1-day change: {as_percentage(stats.max_negative_change)}\n'
-        f'max positive 1-day change: {as_percentage(stats.max_positive_change)}\n'
-    )
+def _human_readable_indicator_anomaly(symbol: str,
+                                      price_anomaly: PriceAnomaly,
+                                      indicator: Indicator) -> str:
+    title, name, bound = _INDICATOR_NAMES[indicator]
+    is_new_min = price_anomaly.is_new_min()
+    current = price_anomaly.current_price
+    return _INDICATOR_ANOMALY_LAYOUT.format(
+        title, symbol, name, 'below' if is_new_min else 'above',
+        'lower' if is_new_min else 'upper', bound, current.value,
+        current.date, price_anomaly.period.value, bound + 's',
+        price_anomaly.min_price.value, price_anomaly.max_price.value)
+
+
+def _write_price_stats(buffer: io.StringIO, period: Period,
+                       stats: PriceStats) -> None:
+    buffer.write(_PRICE_STATS_LAYOUT.format(
+        period.value,
+        stats.min_price.value, stats.min_price.date,
+        stats.max_price.value, stats.max_price.date,
+        stats.min_price_max_price_difference * 100,
+        stats.max_negative_change * 100,
+        stats.max_positive_change * 100,
+    ))
+
+
+@lru_cache(maxsize=None)
+def _get_symbol_report_layout(periods: tuple[str, ...]) -> str:
+    # built once per list of periods
+    return '\n{} price: {}\n' + ''.join(
+        f'{period}: {{}}\n' for period in periods)
+
+
+def _write_table(buffer: io.StringIO, titles: list[str],
+                 columns: list[list[str]]) -> None:
+    """
+    Write the columns as a table, the first column is aligned to the left and
+    the other ones to the right.
+    """
+    if not columns[0]:
+        return
+
+    widths = [max(len(title), max(map(len, column)))
+              for title, column in zip(titles, columns)]
+    # the layout of the rows is built once per table
+    row_layout = f'{{:<{widths[0]}}}' + ''.join(
+        f'  {{:>{width}}}' for width in widths[1:])
+    buffer.write('\n')
+    for row in itertools.chain([titles], zip(*columns)):
+        buffer.write(row_layout.format(*row).rstrip())
+        buffer.write('\n')
+
+
+def _write_comparison(buffer: io.StringIO, heading: str, symbols: list[str],
+                      current_prices: list[ClosePrice],
+                      rows: list[list[str]]) -> None:
+    """
+    Write a table with a column per symbol, the first rows are the current
+    prices of the symbols.
+    """
+    buffer.write(f'{heading}:\n')
+    rows = [
+        ['current price', *(as_decimal(price.value)
+                            for price in current_prices)],
+        ['date', *(str(price.date) for price in current_prices)],
+        *rows,
+    ]
+    _write_rows(buffer, ['', *symbols], rows)
+
+
+def _write_rows(buffer: io.StringIO, titles: list[str],
+                rows: list[list[str]]) -> None:
+    """
+    Write the rows as a table, the rows shorter than the titles are padded
+    with empty values.
+    """
+    # rows without values are titles
+    columns = [[row[column] if column < len(row) else '' for row in rows]
+               for column in range(len(titles))]
+    _write_table(buffer, titles, columns)
+
+
+def _format_array(layout: str, values: np.ndarray) -> list:
+    # the printf-style layout is applied to the whole array at once
+    return np.char.mod(layout, values).tolist()
+
+
+def _joined_length(message: str, other_message: str) -> int:
+    return len(message) + len(MESSAGE_SEPARATOR) + len(other_message)
+
+
+def _split_lines(text: str, max_length: int) -> list[str]:
+    chunks: list[str] = []
+    for line in text.split('\n'):
+        # a line longer than the maximum length is cut
+        for start in range(0, max(len(line), 1), max_length):
+            piece = line[start:start + max_length]
+            if chunks and len(chunks[-1]) + 1 + len(piece) <= max_length:
+                chunks[-1] += '\n' + piece
+            else:
+                chunks.append(piece)
+    return chunks
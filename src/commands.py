@@ -1,24 +1,63 @@
-import yfinance as yf
+"""
+Commands supported by the bot.
+The bot and its downloader are created the first time a stats command is
+received: yfinance, pandas and numpy are not imported to answer /start or
+/help, which keeps the cold start of the push lambda short.
+"""
+import functools
+import threading
+from typing import TYPE_CHECKING, Callable, Optional
+
 from telegram import Update
 from telegram.ext import (
     CallbackContext, CommandHandler, MessageHandler, Filters, Dispatcher
 )
 
-from src.bot.bot import Bot
-from src.download.download import Download
+from src.bot import replies
+from src.common import env_validator, logs
+from src.common.rate_limit import RateLimiter
+
+if TYPE_CHECKING:
+    from src.bot.bot import Bot
+
+logger = logs.get_logger(__name__)
+
+# stats commands allowed per chat: a burst of CHAT_BURST commands, then
+# CHAT_RATE commands per minute
+chat_rate_limiter = RateLimiter(
+    rate=float(env_validator.get_or_default('CHAT_RATE', '10')) / 60,
+    capacity=float(env_validator.get_or_default('CHAT_BURST', '5')),
+)
 
-downloader = Download(yf)
-bot = Bot(downloader)
+_bot: Optional['Bot'] = None
+_bot_lock = threading.Lock()
 
+TOO_MANY_REQUESTS = 'Too many requests, please try again in a few seconds'
 
-def add_supported_commands(dispatcher: Dispatcher) -> None:
+
+def add_supported_commands(dispatcher: Dispatcher,
+                           run_async: bool = False) -> None:
+    """
+    Register the commands supported by the bot.
+    :param dispatcher: Dispatcher that receives the updates from Telegram.
+    :param run_async: Run the stats commands in the worker pool of the
+    dispatcher, so a slow download does not delay the replies to other users.
+    """
     # supported commands
     dispatcher.add_handler(CommandHandler("start", _start_command))
     dispatcher.add_handler(CommandHandler("help", _help_command))
-    dispatcher.add_handler(CommandHandler("price", _price_command))
-    dispatcher.add_handler(CommandHandler("return", _return_command))
-    dispatcher.add_handler(CommandHandler("vol", _volatility_command))
-    dispatcher.add_handler(CommandHandler("all", _all_command))
+    dispatcher.add_handler(
+        CommandHandler("price", _price_command, run_async=run_async))
+    dispatcher.add_handler(
+        CommandHandler("return", _return_command, run_async=run_async))
+    dispatcher.add_handler(
+        CommandHandler("vol", _volatility_command, run_async=run_async))
+    dispatcher.add_handler(
+        CommandHandler("all", _all_command, run_async=run_async))
+    dispatcher.add_handler(
+        CommandHandler("ind", _indicators_command, run_async=run_async))
+    dispatcher.add_handler(
+        CommandHandler("corr", _correlation_command, run_async=run_async))
 
     # handle unknown commands or text
     dispatcher.add_handler(
@@ -26,58 +65,138 @@ def add_supported_commands(dispatcher: Dispatcher) -> None:
     )
 
 
+def get_bot() -> 'Bot':
+    """
+    Return the bot, creating it the first time it is needed.
+    """
+    global _bot
+    with _bot_lock:
+        if _bot is None:
+            with logs.log_duration(logger, 'get_bot: created bot'):
+                _bot = _create_bot()
+        return _bot
+
+
+# private functions: creation of the bot.
+
+def _create_bot() -> 'Bot':
+    import yfinance as yf
+
+    from src.analyst.snapshot import Snapshot
+    from src.bot.bot import Bot
+    from src.common.ttl_cache import TTLCache
+    from src.download.cache import PriceCache
+    from src.download.download import Download
+
+    cache_directory = env_validator.get_or_default('PRICE_CACHE_DIR', '')
+    cache = PriceCache(cache_directory) if cache_directory else None
+    lean = env_validator.get_or_default('PRICE_FRAMES', 'full') == 'lean'
+    downloader = Download(yf, cache, lean=lean)
+    memory_cache = TTLCache(
+        max_size=int(env_validator.get_or_default('MEMORY_CACHE_SIZE', '256')),
+        ttl=float(env_validator.get_or_default('MEMORY_CACHE_TTL', '900')),
+    )
+    max_symbols = int(env_validator.get_or_default('BOT_MAX_SYMBOLS', '10'))
+    snapshot_directory = env_validator.get_or_default('STATS_SNAPSHOT_DIR', '')
+    snapshot = Snapshot(snapshot_directory) if snapshot_directory else None
+    return Bot(downloader, memory_cache, max_symbols=max_symbols,
+               snapshot=snapshot)
+
+
 # private functions: commands supported by the bot.
 
+def _rate_limited(command: Callable[[Update, CallbackContext], None]
+                  ) -> Callable[[Update, CallbackContext], None]:
+    """
+    Reply with an error instead of running the command when the chat
+    exceeded its rate limit.
+    """
+    @functools.wraps(command)
+    def wrapper(update: Update, context: CallbackContext) -> None:
+        if not chat_rate_limiter.allow(update.effective_chat.id):
+            update.message.reply_text(TOO_MANY_REQUESTS)
+            return
+        command(update, context)
+
+    return wrapper
+
+
 def _start_command(update: Update, _: CallbackContext) -> None:
     """Send a message when the command /start is issued."""
-    update.message.reply_text(bot.reply_start())
+    update.message.reply_text(replies.START)
 
 
 def _help_command(update: Update, _: CallbackContext) -> None:
     """Send a message when the command /help is issued."""
-    update.message.reply_text(bot.reply_help())
+    update.message.reply_text(replies.HELP)
 
 
+@_rate_limited
 def _price_command(update: Update, _: CallbackContext) -> None:
     """
-    This command expects the following: `/price symbol`
-    For example: `/price amzn`
+    This command expects the following: `/price symbol [symbol ...]`
+    For example: `/price amzn` or `/price amzn msft goog`
     """
     text = update.message.text
-    message = bot.reply_price_stats(text)
+    message = get_bot().reply_price_stats(text)
     update.message.reply_text(message)
 
 
+@_rate_limited
 def _return_command(update: Update, _: CallbackContext) -> None:
     """
-    This command expects the following: `/return symbol`
-    For example: `/return amzn`
+    This command expects the following: `/return symbol [symbol ...]`
+    For example: `/return amzn` or `/return amzn msft goog`
     """
     text = update.message.text
-    message = bot.reply_return_stats(text)
+    message = get_bot().reply_return_stats(text)
     update.message.reply_text(message)
 
 
+@_rate_limited
 def _volatility_command(update: Update, _: CallbackContext) -> None:
     """
-    This command expects the following: `/vol symbol`
-    For example: `/vol amzn`
+    This command expects the following: `/vol symbol [symbol ...]`
+    For example: `/vol amzn` or `/vol amzn msft goog`
     """
     text = update.message.text
-    message = bot.reply_volatility_stats(text)
+    message = get_bot().reply_volatility_stats(text)
     update.message.reply_text(message)
 
 
+@_rate_limited
 def _all_command(update: Update, _: CallbackContext) -> None:
     """
-    This command expects the following: `/all symbol`
-    For example: `/all amzn`
+    This command expects the following: `/all symbol [symbol ...]`
+    For example: `/all amzn` or `/all amzn msft goog`
+    """
+    text = update.message.text
+    message = get_bot().reply_all_stats(text)
+    update.message.reply_text(message)
+
+
+@_rate_limited
+def _indicators_command(update: Update, _: CallbackContext) -> None:
+    """
+    This command expects the following: `/ind symbol [symbol ...]`
+    For example: `/ind amzn` or `/ind amzn msft goog`
+    """
+    text = update.message.text
+    message = get_bot().reply_indicator_stats(text)
+    update.message.reply_text(message)
+
+
+@_rate_limited
+def _correlation_command(update: Update, _: CallbackContext) -> None:
+    """
+    This command expects the following: `/corr symbol symbol [symbol ...]`
+    For example: `/corr amzn msft goog`
     """
     text = update.message.text
-    message = bot.reply_all_stats(text)
+    message = get_bot().reply_correlation(text)
     update.message.reply_text(message)
 
 
 def _unknown_command(update: Update, _: CallbackContext) -> None:
-    message = "I don't understand that, but " + bot.reply_help()
+    message = "I don't understand that, but " + replies.HELP
     update.message.reply_text(message)
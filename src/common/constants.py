@@ -1 +1,4 @@
 DECIMAL_PLACES = 4
+
+# Maximum length of a Telegram message
+MAX_MESSAGE_LENGTH = 4096
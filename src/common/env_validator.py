@@ -6,3 +6,7 @@ def get_or_throw(variable_name: str) -> str:
     if not value:
         raise ValueError(f'{variable_name} environment variable is not defined')
     return value
+
+
+def get_or_default(variable_name: str, default: str) -> str:
+    return os.environ.get(variable_name) or default
@@ -1,5 +1,8 @@
 import logging
+import time
+from contextlib import contextmanager
 from logging import Logger
+from typing import Iterator
 
 
 def get_logger(name: str) -> Logger:
@@ -14,3 +17,15 @@ def get_logger(name: str) -> Logger:
         level=logging.INFO,
     )
     return logging.getLogger(name)
+
+
+@contextmanager
+def log_duration(logger: Logger, label: str) -> Iterator[None]:
+    """
+    Log the seconds that the code inside the context takes to run.
+    """
+    started_at = time.perf_counter()
+    try:
+        yield
+    finally:
+        logger.info(f'{label}: {time.perf_counter() - started_at:.3f}s')
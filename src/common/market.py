@@ -0,0 +1,28 @@
+import datetime
+
+# The US stock market closes at 1600 GMT-5 (2100 UTC), or at 2000 UTC during
+# daylight saving time. We use the latest of both to avoid reading a session
+# before it has closed.
+MARKET_CLOSE_UTC = datetime.time(21, 0)
+
+SATURDAY = 5
+
+
+def get_last_session_date(now: datetime.datetime,
+                          market_close: datetime.time = MARKET_CLOSE_UTC
+                          ) -> datetime.date:
+    """
+    Return the date of the last trading session that closed before now.
+    Weekends are skipped, market holidays are not known.
+    :param now: Current UTC datetime.
+    :param market_close: UTC time in which a trading session closes.
+    :return: The date of the last closed trading session.
+    """
+    session = now.date()
+    if now.time() < market_close:
+        session -= datetime.timedelta(days=1)
+
+    while session.weekday() >= SATURDAY:
+        session -= datetime.timedelta(days=1)
+
+    return session
@@ -0,0 +1,184 @@
+"""
+Registry of the periods of the stats.
+The window of a period contains the most recent sessions of a symbol. It is
+either a fixed number of trading days, like the periods of the Period enum,
+or a calendar window counted on the actual dates of the prices: the sessions
+after the same day N months before the last session, or after the end of the
+previous year (YTD). A calendar window follows the holidays and the trading
+calendar of each symbol.
+"""
+import math
+import re
+from typing import NamedTuple, Sequence
+
+import numpy as np
+
+from src.common.types import EPOCH_ORDINAL, Period
+
+TRADING_DAYS_PER_YEAR = 252
+
+# the windows of the Period enum include the session before the period
+TRADING_DAYS = {
+    Period.WEEK: 6,
+    Period.TWO_WEEKS: 11,
+    Period.THREE_WEEKS: 16,
+    Period.MONTH: 22,
+    Period.QUARTER: 63,
+    Period.HALF: 126,
+    Period.YEAR: TRADING_DAYS_PER_YEAR,
+}
+
+# the months of prices downloaded by default, see get_history_months
+HISTORY_MONTHS = 12
+
+
+class PeriodSpec(NamedTuple):
+    """
+    Definition of a period, the window is given by one of trading_days,
+    months or year_to_date.
+    """
+    name: str
+    trading_days: int = 0
+    months: int = 0
+    year_to_date: bool = False
+
+    def is_calendar(self) -> bool:
+        return self.trading_days == 0
+
+    def get_history_months(self) -> int:
+        """
+        Return the months of prices needed to fill the window.
+        """
+        if self.year_to_date:
+            return HISTORY_MONTHS
+        if self.months:
+            return self.months
+        return math.ceil(self.trading_days * 12 / TRADING_DAYS_PER_YEAR)
+
+
+def get_period(name: str) -> PeriodSpec:
+    """
+    Return the period of a name: a period of the registry (1wk to 12mo, 3y,
+    5y, 10y, ytd), or a custom period like 30d (trading days), 4wk, 9mo or
+    2y.
+    :raise ValueError: If the name is not a valid period.
+    """
+    name = name.strip().lower()
+    if name in _REGISTRY:
+        return _REGISTRY[name]
+
+    match = _CUSTOM_PERIOD.fullmatch(name)
+    if match is None or int(match.group(1)) == 0:
+        raise ValueError(f'Error: unknown period {name}')
+
+    count = int(match.group(1))
+    unit = match.group(2)
+    if unit == 'd':
+        return PeriodSpec(name, trading_days=count)
+    if unit == 'wk':
+        # like the weeks of the Period enum, 5 sessions per week
+        return PeriodSpec(name, trading_days=5 * count + 1)
+    if unit == 'mo':
+        return PeriodSpec(name, months=count)
+    return PeriodSpec(name, months=12 * count)
+
+
+def parse_periods(text: str) -> list[PeriodSpec]:
+    """
+    Return the periods of a comma separated list of names, see get_period.
+    :raise ValueError: If a name is not a valid period.
+    """
+    names = [name for name in text.split(',') if name.strip()]
+    return [get_period(name) for name in names]
+
+
+def get_default_periods() -> list[PeriodSpec]:
+    """
+    Return the periods of the Period enum, in the order of the enum.
+    """
+    return [_REGISTRY[period.value] for period in Period]
+
+
+def get_history_months(periods: Sequence[PeriodSpec]) -> int:
+    """
+    Return the months of prices to download to fill every period, never
+    less than the default of 12 months.
+    """
+    return max([HISTORY_MONTHS,
+                *[period.get_history_months() for period in periods]])
+
+
+def get_windows(periods: Sequence[PeriodSpec],
+                dates: np.ndarray) -> np.ndarray:
+    """
+    Return the rows of the window of each period.
+    :param periods: Periods of the windows.
+    :param dates: Ordinal dates (see types.get_ordinals) in descending order,
+    1-D for one symbol or 2-D (rows x symbols) padded with zeros.
+    :return: An array with the windows of the periods in the first axis and
+    a window per symbol in the second axis when dates is 2-D. The window of a
+    calendar period is the sessions after the start of the period plus the
+    last session before it, like the fixed windows.
+    """
+    windows = np.empty((len(periods), *dates.shape[1:]), dtype=int)
+    if len(dates) == 0:
+        windows[:] = [period.trading_days for period in periods]
+        return windows
+
+    last_dates = dates[0]
+    for position, period in enumerate(periods):
+        if not period.is_calendar():
+            windows[position] = period.trading_days
+            continue
+        if period.year_to_date:
+            start = _get_year_end_before(last_dates)
+        else:
+            start = _get_months_before(last_dates, period.months)
+        windows[position] = np.count_nonzero(dates > start, axis=0) + 1
+
+    return windows
+
+
+# private functions
+
+
+_CUSTOM_PERIOD = re.compile(r'(\d+)(d|wk|mo|y)')
+
+
+def _to_days(ordinals: np.ndarray) -> np.ndarray:
+    return (np.asarray(ordinals) - EPOCH_ORDINAL).astype('datetime64[D]')
+
+
+def _to_ordinals(days: np.ndarray) -> np.ndarray:
+    return days.astype(np.int64) + EPOCH_ORDINAL
+
+
+def _get_months_before(ordinals: np.ndarray, months: int) -> np.ndarray:
+    """
+    Return the same day of the month some months before each date, or the
+    last day of that month when it is shorter, like pandas DateOffset.
+    """
+    days = _to_days(ordinals)
+    month: np.ndarray = days.astype('datetime64[M]')
+    day_of_month = (days - month.astype('datetime64[D]')).astype(int)
+
+    start_month: np.ndarray = month - months
+    start_days: np.ndarray = start_month.astype('datetime64[D]')
+    month_length = ((start_month + 1).astype('datetime64[D]')
+                    - start_days).astype(int)
+    return _to_ordinals(start_days + np.minimum(day_of_month, month_length - 1))
+
+
+def _get_year_end_before(ordinals: np.ndarray) -> np.ndarray:
+    year: np.ndarray = _to_days(ordinals).astype('datetime64[Y]')
+    return _to_ordinals(year.astype('datetime64[D]') - 1)
+
+
+_REGISTRY = {
+    **{period.value: PeriodSpec(period.value, trading_days=days)
+       for period, days in TRADING_DAYS.items()},
+    'ytd': PeriodSpec('ytd', year_to_date=True),
+    '3y': PeriodSpec('3y', months=36),
+    '5y': PeriodSpec('5y', months=60),
+    '10y': PeriodSpec('10y', months=120),
+}
@@ -0,0 +1,93 @@
+import threading
+import time
+from typing import Callable, Hashable
+
+
+class TokenBucket:
+    """
+    Token bucket: it holds up to capacity tokens and refills rate tokens per
+    second. Each operation takes one token.
+    """
+
+    def __init__(self, rate: float, capacity: float,
+                 clock: Callable[[], float] = time.monotonic) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+        self.tokens = capacity
+        self.updated_at = clock()
+        self._lock = threading.Lock()
+
+    def try_acquire(self) -> bool:
+        """
+        Take a token if there is one available.
+        """
+        with self._lock:
+            self._refill()
+            if self.tokens < 1:
+                return False
+            self.tokens -= 1
+            return True
+
+    def get_wait_time(self) -> float:
+        """
+        Return the seconds until a token is available.
+        """
+        with self._lock:
+            self._refill()
+            return max(1 - self.tokens, 0) / self.rate
+
+    # private methods
+
+    def _refill(self) -> None:
+        now = self.clock()
+        elapsed = now - self.updated_at
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+        self.updated_at = now
+
+
+class RateLimiter:
+    """
+    Keeps a token bucket per key (for example, per chat). A bucket that has
+    refilled to capacity is the same as a new one, so the buckets of the keys
+    that stopped using the limiter are evicted.
+    """
+
+    def __init__(self, rate: float, capacity: float,
+                 clock: Callable[[], float] = time.monotonic) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+        self._buckets: dict[Hashable, TokenBucket] = {}
+        self._lock = threading.Lock()
+        self._evicted_at = clock()
+
+    def allow(self, key: Hashable) -> bool:
+        return self.get_bucket(key).try_acquire()
+
+    def get_bucket(self, key: Hashable) -> TokenBucket:
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                self._evict_full_buckets()
+                bucket = TokenBucket(self.rate, self.capacity, self.clock)
+                self._buckets[key] = bucket
+            return bucket
+
+    # private methods
+
+    def _evict_full_buckets(self) -> None:
+        """
+        Remove the buckets that have not been used for the time to refill
+        them, at most once in that time.
+        """
+        now = self.clock()
+        refill_time = self.capacity / self.rate
+        if now - self._evicted_at < refill_time:
+            return
+
+        self._evicted_at = now
+        self._buckets = {
+            key: bucket for key, bucket in self._buckets.items()
+            if now - bucket.updated_at < refill_time
+        }
@@ -0,0 +1,81 @@
+import threading
+from concurrent.futures import Future
+from typing import Callable, Hashable, Sequence, TypeVar
+
+T = TypeVar('T')
+K = TypeVar('K', bound=Hashable)
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key: the first caller runs the
+    function, the callers that arrive while it runs wait for it and share its
+    result (or its exception).
+    """
+
+    def __init__(self) -> None:
+        self._calls: dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, function: Callable[[], T]) -> T:
+        with self._lock:
+            call = self._calls.get(key)
+            is_owner = call is None
+            if call is None:
+                call = Future()
+                self._calls[key] = call
+
+        if not is_owner:
+            return call.result()
+
+        try:
+            result = function()
+            call.set_result(result)
+            return result
+        except Exception as e:
+            call.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+    def do_many(self, keys: Sequence[K],
+                function: Callable[[list[K]], dict[K, T]]
+                ) -> dict[K, Future]:
+        """
+        Like do for many keys: the function runs once with the keys that are
+        not in flight and returns the result of each of them, the keys that
+        are in flight wait for their calls.
+        :return: The finished call of each key, the call of a key without a
+        result fails with a KeyError.
+        """
+        owned: dict[K, Future] = {}
+        calls: dict[K, Future] = {}
+        with self._lock:
+            for key in keys:
+                call = self._calls.get(key)
+                if call is None:
+                    call = Future()
+                    self._calls[key] = owned[key] = call
+                calls[key] = call
+
+        try:
+            results = function(list(owned)) if owned else {}
+            for key, call in owned.items():
+                if key in results:
+                    call.set_result(results[key])
+                else:
+                    call.set_exception(KeyError(key))
+        except Exception as e:
+            for call in owned.values():
+                if not call.done():
+                    call.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                for key in owned:
+                    del self._calls[key]
+
+        for call in calls.values():
+            call.exception()  # wait for the calls of the other callers
+        return calls
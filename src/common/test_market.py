@@ -0,0 +1,39 @@
+import datetime
+import unittest
+
+from src.common.market import get_last_session_date
+
+
+class MarketTests(unittest.TestCase):
+
+    def test_get_last_session_date_after_close_return_today(self):
+        # arrange
+        now = datetime.datetime(2022, 7, 29, 23, 0)  # Friday
+        # act
+        session_date = get_last_session_date(now)
+        # assert
+        self.assertEqual(session_date, datetime.date(2022, 7, 29))
+
+    def test_get_last_session_date_before_close_return_previous_day(self):
+        # arrange
+        now = datetime.datetime(2022, 7, 29, 15, 0)  # Friday
+        # act
+        session_date = get_last_session_date(now)
+        # assert
+        self.assertEqual(session_date, datetime.date(2022, 7, 28))
+
+    def test_get_last_session_date_on_weekend_return_friday(self):
+        # arrange
+        now = datetime.datetime(2022, 7, 31, 23, 0)  # Sunday
+        # act
+        session_date = get_last_session_date(now)
+        # assert
+        self.assertEqual(session_date, datetime.date(2022, 7, 29))
+
+    def test_get_last_session_date_on_monday_before_close_return_friday(self):
+        # arrange
+        now = datetime.datetime(2022, 8, 1, 10, 0)  # Monday
+        # act
+        session_date = get_last_session_date(now)
+        # assert
+        self.assertEqual(session_date, datetime.date(2022, 7, 29))
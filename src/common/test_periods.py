@@ -0,0 +1,80 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from src.common import periods
+from src.common.periods import PeriodSpec
+from src.common.types import Period, get_ordinals
+
+
+class PeriodsTests(unittest.TestCase):
+
+    def test_get_period_given_registered_names_return_their_windows(self):
+        # act and assert
+        self.assertEqual(periods.get_period('3mo'),
+                         PeriodSpec('3mo', trading_days=63))
+        self.assertEqual(periods.get_period(' YTD '),
+                         PeriodSpec('ytd', year_to_date=True))
+        self.assertEqual(periods.get_period('5y'), PeriodSpec('5y', months=60))
+        self.assertEqual([period.trading_days
+                          for period in periods.get_default_periods()],
+                         [6, 11, 16, 22, 63, 126, 252])
+
+    def test_get_period_given_custom_names_return_their_windows(self):
+        # act and assert
+        self.assertEqual(periods.get_period('30d'),
+                         PeriodSpec('30d', trading_days=30))
+        self.assertEqual(periods.get_period('4wk'),
+                         PeriodSpec('4wk', trading_days=21))
+        self.assertEqual(periods.get_period('9mo'), PeriodSpec('9mo', months=9))
+        self.assertEqual(periods.get_period('2y'), PeriodSpec('2y', months=24))
+
+    def test_get_period_given_invalid_name_raise_an_exception(self):
+        for name in ['', '0d', '3', 'y', '1week', '-2mo']:
+            with self.assertRaises(ValueError):
+                periods.get_period(name)
+
+    def test_get_windows_given_calendar_periods_count_the_sessions(self):
+        # arrange
+        prices = pd.read_csv('src/analyst/test_files/AMZN_from_stockbot.csv')
+        dates = get_ordinals(prices.Date)
+        specs = periods.parse_periods('1mo,ytd,9mo,30d')
+        # act
+        windows = periods.get_windows(specs, dates)
+        # assert
+        # the last session is 2022-07-29, each window includes the session
+        # before its start
+        self.assertEqual(windows.tolist(), [
+            (prices.Date > '2022-06-29').sum() + 1,
+            (prices.Date > '2021-12-31').sum() + 1,
+            (prices.Date > '2021-10-29').sum() + 1,
+            30,
+        ])
+
+    def test_get_windows_given_many_symbols_return_a_window_per_symbol(self):
+        # arrange
+        end_of_march = get_ordinals(pd.Series(
+            pd.bdate_range(end='2022-03-31', periods=30)[::-1]))
+        end_of_june = get_ordinals(pd.Series(
+            pd.bdate_range(end='2022-06-30', periods=10)[::-1]))
+        dates = np.zeros((30, 2), dtype=np.int64)
+        dates[:, 0] = end_of_march
+        dates[:10, 1] = end_of_june
+        # act
+        windows = periods.get_windows([PeriodSpec('month', months=1)], dates)
+        # assert
+        # a month before 2022-03-31 is 2022-02-28, then 23 sessions in
+        # March, the second symbol has fewer sessions than the window
+        self.assertEqual(windows.tolist(), [[24, 11]])
+
+    def test_get_history_months_return_the_longest_period(self):
+        # act and assert
+        self.assertEqual(periods.get_history_months([]), 12)
+        self.assertEqual(
+            periods.get_history_months(periods.parse_periods('ytd,6mo,30d')),
+            12)
+        self.assertEqual(
+            periods.get_history_months(periods.parse_periods('3y,500d,ytd')),
+            36)
+        self.assertEqual(periods.TRADING_DAYS[Period.YEAR], 252)
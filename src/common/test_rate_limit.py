@@ -0,0 +1,61 @@
+import unittest
+
+from src.common.rate_limit import RateLimiter, TokenBucket
+from src.common.testing import FakeClock
+
+
+class TokenBucketTests(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.bucket = TokenBucket(rate=1, capacity=2, clock=self.clock)
+
+    def test_try_acquire_given_empty_bucket_return_false(self):
+        # act
+        results = [self.bucket.try_acquire() for _ in range(3)]
+        # assert
+        self.assertEqual(results, [True, True, False])
+
+    def test_try_acquire_after_refill_return_true(self):
+        # arrange
+        self.bucket.try_acquire()
+        self.bucket.try_acquire()
+        self.clock.now = 1
+        # act and assert
+        self.assertTrue(self.bucket.try_acquire())
+        self.assertFalse(self.bucket.try_acquire())
+
+    def test_get_wait_time_given_empty_bucket_return_time_to_next_token(self):
+        # arrange
+        self.bucket.try_acquire()
+        self.bucket.try_acquire()
+        self.clock.now = 0.25
+        # act and assert
+        self.assertEqual(self.bucket.get_wait_time(), 0.75)
+        self.clock.now = 1
+        self.assertEqual(self.bucket.get_wait_time(), 0)
+
+
+class RateLimiterTests(unittest.TestCase):
+
+    def test_allow_keeps_a_bucket_per_key(self):
+        # arrange
+        rate_limiter = RateLimiter(rate=1, capacity=1, clock=FakeClock())
+        # act and assert
+        self.assertTrue(rate_limiter.allow('chat-1'))
+        self.assertFalse(rate_limiter.allow('chat-1'))
+        self.assertTrue(rate_limiter.allow('chat-2'))
+
+    def test_get_bucket_after_refill_time_evicts_full_buckets(self):
+        # arrange
+        clock = FakeClock()
+        rate_limiter = RateLimiter(rate=1, capacity=2, clock=clock)
+        rate_limiter.allow('chat-1')
+        rate_limiter.allow('chat-2')
+        clock.now = 1.5
+        rate_limiter.allow('chat-2')
+        clock.now = 2
+        # act
+        rate_limiter.get_bucket('chat-3')
+        # assert
+        self.assertEqual(list(rate_limiter._buckets), ['chat-2', 'chat-3'])
@@ -0,0 +1,83 @@
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from src.common.single_flight import SingleFlight
+
+
+class SingleFlightTests(unittest.TestCase):
+
+    def setUp(self):
+        self.single_flight = SingleFlight()
+
+    def test_do_given_concurrent_calls_run_the_function_once(self):
+        # arrange
+        calls = []
+        started = threading.Event()
+        release = threading.Event()
+
+        def function():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return 'prices'
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            first = executor.submit(self.single_flight.do, 'AMZN', function)
+            started.wait(5)
+            others = [executor.submit(self.single_flight.do, 'AMZN', function)
+                      for _ in range(3)]
+            time.sleep(0.1)  # let the other calls reach the single flight
+            # act
+            release.set()
+            results = [first.result()] + [other.result() for other in others]
+        # assert
+        self.assertEqual(results, ['prices'] * 4)
+        self.assertEqual(len(calls), 1)
+
+    def test_do_given_sequential_calls_run_the_function_each_time(self):
+        # arrange
+        calls = []
+        # act
+        self.single_flight.do('AMZN', lambda: calls.append(1))
+        self.single_flight.do('AMZN', lambda: calls.append(1))
+        # assert
+        self.assertEqual(len(calls), 2)
+
+    def test_do_given_function_error_raise_it(self):
+        # arrange
+        def function():
+            raise ValueError('error')
+
+        # act and assert
+        self.assertRaises(ValueError, self.single_flight.do, 'AMZN', function)
+
+    def test_do_many_given_key_in_flight_wait_for_it(self):
+        # arrange
+        started = threading.Event()
+        release = threading.Event()
+        batches = []
+
+        def function():
+            started.set()
+            release.wait(5)
+            return 'AMZN prices'
+
+        def get_many(keys):
+            batches.append(keys)
+            return {key: f'{key} prices' for key in keys if key != 'AAAA'}
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            single = executor.submit(self.single_flight.do, 'AMZN', function)
+            started.wait(5)
+            threading.Timer(0.1, release.set).start()
+            # act
+            calls = self.single_flight.do_many(['AMZN', 'MSFT', 'AAAA'],
+                                               get_many)
+        # assert
+        self.assertEqual(batches, [['MSFT', 'AAAA']])
+        self.assertEqual(single.result(), 'AMZN prices')
+        self.assertEqual(calls['AMZN'].result(), 'AMZN prices')
+        self.assertEqual(calls['MSFT'].result(), 'MSFT prices')
+        self.assertIsInstance(calls['AAAA'].exception(), KeyError)
@@ -0,0 +1,63 @@
+import unittest
+
+from src.common.testing import FakeClock
+from src.common.ttl_cache import TTLCache
+
+
+class TTLCacheTests(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.cache = TTLCache(max_size=2, ttl=10, clock=self.clock)
+
+    def test_get_given_missing_key_return_none_and_count_miss(self):
+        # act
+        value = self.cache.get('AMZN')
+        # assert
+        self.assertIsNone(value)
+        self.assertEqual(self.cache.misses, 1)
+        self.assertEqual(self.cache.hits, 0)
+
+    def test_get_given_stored_key_return_value_and_count_hit(self):
+        # arrange
+        self.cache.put('AMZN', 1)
+        # act
+        value = self.cache.get('AMZN')
+        # assert
+        self.assertEqual(value, 1)
+        self.assertEqual(self.cache.hits, 1)
+        self.assertEqual(self.cache.misses, 0)
+
+    def test_get_given_expired_key_return_none(self):
+        # arrange
+        self.cache.put('AMZN', 1)
+        self.clock.now = 10
+        # act and assert
+        self.assertIsNone(self.cache.get('AMZN'))
+
+    def test_put_with_ttl_overrides_the_default_ttl(self):
+        # arrange
+        self.cache.put('AAAA', 1, ttl=1)
+        self.clock.now = 2
+        # act and assert
+        self.assertIsNone(self.cache.get('AAAA'))
+
+    def test_put_given_full_cache_evict_least_recently_used(self):
+        # arrange
+        self.cache.put('AMZN', 1)
+        self.cache.put('GOOGL', 2)
+        self.cache.get('AMZN')
+        # act
+        self.cache.put('MSFT', 3)
+        # assert
+        self.assertEqual(self.cache.get('AMZN'), 1)
+        self.assertIsNone(self.cache.get('GOOGL'))
+        self.assertEqual(self.cache.get('MSFT'), 3)
+
+    def test_invalidate_removes_the_key(self):
+        # arrange
+        self.cache.put('AMZN', 1)
+        # act
+        self.cache.invalidate('AMZN')
+        # assert
+        self.assertIsNone(self.cache.get('AMZN'))
@@ -1,9 +1,10 @@
 import datetime
 import unittest
 
+import numpy as np
 import pandas as pd
 
-from src.common.types import ClosePrice
+from src.common.types import ClosePrice, get_ordinals
 
 
 class TypesTests(unittest.TestCase):
@@ -53,6 +54,47 @@ class TypesTests(unittest.TestCase):
         self.assertEqual(close_price.date, a_date)
         self.assertEqual(close_price.value, close_value)
 
+    def test_create_ClosePrice_given_date_as_datetime64_return_a_ClosePrice(self):
+        # arrange
+        a_datetime64 = np.datetime64('2022-08-22T15:30:00.000000000')
+        close_value = 100
+        # act
+        close_price = ClosePrice(a_datetime64, close_value)
+        # assert
+        self.assertEqual(close_price.date, datetime.date(2022, 8, 22))
+        self.assertEqual(close_price.value, close_value)
+
+    def test_from_ordinal_given_an_ordinal_return_a_ClosePrice(self):
+        # arrange
+        a_date = datetime.date(2022, 8, 22)
+        close_value = 100
+        # act
+        close_price = ClosePrice.from_ordinal(a_date.toordinal(), close_value)
+        # assert
+        self.assertEqual(close_price, ClosePrice(a_date, close_value))
+
+    def test_get_ordinals_given_timestamps_with_timezone_return_local_dates(self):
+        # arrange
+        dates = pd.Series(pd.to_datetime(
+            ['2022-08-19 00:00', '2022-08-22 23:00']
+        ).tz_localize('America/New_York'))
+        expected_dates = [datetime.date(2022, 8, 19), datetime.date(2022, 8, 22)]
+        # act
+        ordinals = get_ordinals(dates)
+        # assert
+        self.assertEqual([datetime.date.fromordinal(int(ordinal))
+                          for ordinal in ordinals], expected_dates)
+
+    def test_get_ordinals_given_iso_strings_return_the_same_dates(self):
+        # arrange
+        dates = pd.Series(['2021-07-30', '2022-07-29'])
+        expected_dates = [datetime.date(2021, 7, 30), datetime.date(2022, 7, 29)]
+        # act
+        ordinals = get_ordinals(dates)
+        # assert
+        self.assertEqual([datetime.date.fromordinal(int(ordinal))
+                          for ordinal in ordinals], expected_dates)
+
     def test_create_ClosePrice_given_date_as_int_raise_an_exception(self):
         # arrange
         date_millis = datetime.datetime(2022, 8, 22).timestamp() * 1_000
@@ -0,0 +1,51 @@
+"""
+Helpers shared by the tests of the components.
+"""
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+
+class FakeClock:
+    """
+    Clock whose time only moves when a test changes it or sleeps.
+    """
+
+    def __init__(self) -> None:
+        self.now = 0.0
+        self.waits: list[float] = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.waits.append(seconds)
+        self.now += seconds
+
+
+def get_random_prices(length: int, seed: int = 42, walk: bool = False,
+                      decimals: Optional[int] = None,
+                      holidays: float = 0.0) -> pd.DataFrame:
+    """
+    Return random prices in descending order, the last one on 2022-07-29.
+    :param walk: The closes are a random walk from 100, otherwise uniform
+    between 90 and 110.
+    :param decimals: Decimals of the uniform closes, rounding forces ties.
+    :param holidays: Fraction of the business days without a session.
+    """
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range(end='2022-07-29', periods=length)[::-1]
+    if holidays:
+        dates = dates[rng.random(length) >= holidays]
+    if walk:
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, len(dates))))
+    else:
+        close = rng.uniform(90, 110, len(dates))
+    if decimals is not None:
+        close = np.round(close, decimals)
+    prices = pd.DataFrame({'Date': dates, 'Close': close})
+    previous_close = prices.Close.shift(-1)
+    prices['change'] = (prices.Close - previous_close) / previous_close
+    prices['log_return'] = np.log(prices.Close / previous_close)
+    return prices
@@ -0,0 +1,67 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+
+class TTLCache:
+    """
+    Bounded least recently used cache whose entries expire after a time to
+    live. It is safe to use from many threads.
+    """
+
+    def __init__(self, max_size: int, ttl: float,
+                 clock: Callable[[], float] = time.monotonic) -> None:
+        """
+        :param max_size: Maximum number of entries, the least recently used
+        entry is evicted when the cache is full.
+        :param ttl: Default time to live of the entries in seconds.
+        :param clock: Function that returns the current time in seconds.
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Return the value of the key, or None if it is missing or expired.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, value = entry
+            if expires_at <= self.clock():
+                del self._entries[key]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """
+        Add or replace the value of the key.
+        :param ttl: Time to live of this entry, defaults to the cache ttl.
+        """
+        ttl = self.ttl if ttl is None else ttl
+        with self._lock:
+            self._entries[key] = (self.clock() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def summary(self) -> str:
+        return f'cache: {len(self._entries)} entries, ' \
+               f'{self.hits} hits, {self.misses} misses'
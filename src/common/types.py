@@ -1,12 +1,16 @@
 import datetime
 from datetime import date
 from enum import Enum
-from typing import NamedTuple
+from typing import NamedTuple, Optional, Sequence
 
+import numpy as np
 import pandas as pd
 
 from src.common.constants import DECIMAL_PLACES
 
+# ordinal of the day 0 of the numpy dates (datetime64[D])
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
 
 class Period(str, Enum):
     WEEK = '1wk'
@@ -18,6 +22,16 @@ class Period(str, Enum):
     YEAR = '12mo'
 
 
+class Direction(str, Enum):
+    MIN = 'min'
+    MAX = 'max'
+
+
+class Indicator(str, Enum):
+    BOLLINGER = 'bollinger'
+    RSI = 'rsi'
+
+
 class AnnualStats(NamedTuple):
     month: float
     quarter: float
@@ -34,39 +48,38 @@ class AnnualStats(NamedTuple):
 
 
 class ClosePrice:
+    __slots__ = ('date', 'value')
 
-    def __init__(self, a_date: str, close_value: float) -> None:
-        str_date = self._get_date_as_string(a_date)
-        self.date = date.fromisoformat(str_date)
+    def __init__(self, a_date, close_value: float) -> None:
+        self.date = get_date(a_date)
         self.value = close_value
 
+    @classmethod
+    def from_ordinal(cls, ordinal: int, close_value: float) -> 'ClosePrice':
+        """
+        Create a ClosePrice from a proleptic Gregorian ordinal, see
+        get_ordinals.
+        """
+        return cls(date.fromordinal(ordinal), close_value)
+
     def round(self):
         return ClosePrice(
-            str(self.date),
+            self.date,
             round(self.value, DECIMAL_PLACES),
         )
 
-    @staticmethod
-    def _get_date_as_string(value) -> str:
-        date_type = type(value)
-        if date_type is str:
-            return value
-        elif date_type is pd.Timestamp:
-            return value.date().isoformat()
-        elif date_type is datetime.datetime:
-            return value.date().isoformat()
-        elif date_type is datetime.date:
-            return value.isoformat()
-        else:
-            raise ValueError(f'unsupported date type {date_type}')
-
     def __eq__(self, other) -> bool:
         if not isinstance(other, ClosePrice):
             return False
         return self.date == other.date and self.value == other.value
 
+    def __repr__(self) -> str:
+        return f'ClosePrice({self.date}, {self.value})'
+
 
 class PriceStats:
+    __slots__ = ('min_price', 'max_price', 'min_price_max_price_difference',
+                 'max_negative_change', 'max_positive_change')
 
     def __init__(self, min_price: ClosePrice, max_price: ClosePrice,
                  close_price_difference: float, max_negative_change: float,
@@ -104,11 +117,21 @@ class AnnualPriceStats(NamedTuple):
     year: PriceStats
 
 
+# periods of the fields of AnnualStats and AnnualPriceStats
+ANNUAL_PERIODS = [Period.MONTH, Period.QUARTER, Period.HALF, Period.YEAR]
+
+
 class PriceAnomaly(NamedTuple):
+    """
+    A close out of the bounds of a period. The anomalies of an indicator
+    have the bounds of the indicator instead of the min and max closes, and
+    the value of the indicator instead of the current close.
+    """
     period: Period
     min_price: ClosePrice
     current_price: ClosePrice
     max_price: ClosePrice
+    indicator: Optional[Indicator] = None
 
     def round(self):
         return PriceAnomaly(
@@ -116,10 +139,14 @@ class PriceAnomaly(NamedTuple):
             min_price=self.min_price.round(),
             current_price=self.current_price.round(),
             max_price=self.max_price.round(),
+            indicator=self.indicator,
         )
 
     def is_new_min(self) -> bool:
-        return self.min_price.value == self.current_price.value
+        return self.current_price.value <= self.min_price.value
+
+    def get_direction(self) -> Direction:
+        return Direction.MIN if self.is_new_min() else Direction.MAX
 
     def __str__(self) -> str:
         return f'{self.period}, {self.min_price.value}, ' \
@@ -143,3 +170,61 @@ class SymbolReport(NamedTuple):
     quarter: ReportInPeriod
     half: ReportInPeriod
     year: ReportInPeriod
+
+
+class Alert(NamedTuple):
+    """
+    Last alert sent for a breach of the bounds of a period.
+    """
+    symbol: str
+    period: Period
+    direction: Direction
+    date: date
+
+
+class BatchPrices(NamedTuple):
+    prices: dict[str, pd.DataFrame]
+    failed: list[str]
+    # the failed symbols that do not exist, a new download will not help
+    unknown: Sequence[str] = ()
+
+
+def get_date(value) -> date:
+    """
+    Return the date of a value of the Date column of the prices.
+    :param value: A date, datetime, timestamp, NumPy datetime, ISO string or
+    proleptic Gregorian ordinal (the dates of the lean prices).
+    """
+    date_type = type(value)
+    if date_type is datetime.date:
+        return value
+    elif date_type is pd.Timestamp or date_type is datetime.datetime:
+        return value.date()
+    elif date_type is np.datetime64:
+        days = value.astype('datetime64[D]').astype(np.int64)
+        return date.fromordinal(EPOCH_ORDINAL + int(days))
+    elif date_type is str:
+        return date.fromisoformat(value)
+    elif issubclass(date_type, (int, np.integer)):
+        return date.fromordinal(int(value))
+    else:
+        raise ValueError(f'unsupported date type {date_type}')
+
+
+def get_ordinals(dates: pd.Series) -> np.ndarray:
+    """
+    Return the dates as proleptic Gregorian ordinals (date.toordinal), so
+    many ClosePrice objects can be created without converting each date.
+    :param dates: Dates as strings, datetimes or timestamps with or without
+    a timezone, the local date of each timestamp is used. Integer dates are
+    already ordinals.
+    """
+    if pd.api.types.is_integer_dtype(dates):
+        return dates.to_numpy(dtype=np.int64)
+    if not pd.api.types.is_datetime64_any_dtype(dates):
+        dates = pd.to_datetime(dates)
+    if dates.dt.tz is not None:
+        dates = dates.dt.tz_localize(None)
+    days = dates.to_numpy().astype('datetime64[D]').astype(np.int64)
+    return days + EPOCH_ORDINAL
+
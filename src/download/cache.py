@@ -0,0 +1,75 @@
+import datetime
+import os
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+
+from src.common.market import MARKET_CLOSE_UTC, get_last_session_date
+from src.common.types import get_date
+
+
+class PriceCache:
+    """
+    On-disk cache of historical prices: one memory-mapped NumPy file per
+    symbol in a local directory. Rows are stored in ascending order, so the
+    new sessions of a symbol are appended at the end of its file.
+    """
+
+    def __init__(self, directory: str,
+                 market_close: datetime.time = MARKET_CLOSE_UTC) -> None:
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.market_close = market_close
+
+    def read(self, symbol: str) -> Optional[DataFrame]:
+        """
+        Return the cached historical data of a symbol in descending order,
+        or None if the symbol is not cached.
+        """
+        path = self._get_path(symbol)
+        if not path.exists():
+            return None
+
+        records = np.load(path, mmap_mode='r')
+        return DataFrame(records[::-1])
+
+    def write(self, symbol: str, prices: DataFrame) -> None:
+        """
+        Replace the cached historical data of a symbol.
+        :param symbol: Symbol of the stock.
+        :param prices: Historical data in descending order.
+        """
+        prices = prices.iloc[::-1]
+        if isinstance(prices.Date.dtype, pd.DatetimeTZDtype):
+            prices = prices.assign(Date=prices.Date.dt.tz_localize(None))
+        records = prices.to_records(index=False)
+
+        # write to a temporary file first, readers never see a partial file
+        path = self._get_path(symbol)
+        temporary_path = path.with_suffix('.tmp')
+        with open(temporary_path, 'wb') as file:
+            np.save(file, records)
+        os.replace(temporary_path, path)
+
+    def is_fresh(self, prices: DataFrame,
+                 now: Optional[datetime.datetime] = None) -> bool:
+        """
+        Return True if the cached prices contain the last closed session.
+        :param prices: Cached historical data in descending order.
+        :param now: Current UTC datetime, defaults to the system time.
+        """
+        if prices.empty:
+            return False
+
+        now = now or datetime.datetime.utcnow()
+        last_cached_date = get_date(prices.Date.iloc[0])
+        last_session_date = get_last_session_date(now, self.market_close)
+        return last_cached_date >= last_session_date
+
+    # private methods
+
+    def _get_path(self, symbol: str) -> Path:
+        return self.directory / f'{symbol.upper()}.npy'
@@ -1,26 +1,339 @@
+import datetime
+from typing import Optional
+
 import numpy as np
+import pandas as pd
 from pandas import DataFrame
 
-from src.common.types import Period
+from src.common.periods import HISTORY_MONTHS
+from src.common.types import Period, BatchPrices, get_date, get_ordinals
+from src.download.cache import PriceCache
+
+ACTION_COLUMNS = ['Dividends', 'Stock Splits']
+# the only columns read by the analyst, see Download lean
+LEAN_COLUMNS = ['Date', 'Close', 'change', 'log_return']
+# float32 keeps the cents of the closes below this value
+MAX_FLOAT32_CLOSE = 2 ** 16
+# the longer ranges accepted by the period of yfinance, in months
+YAHOO_RANGES = [(24, '2y'), (60, '5y'), (120, '10y')]
 
 
 class Download:
 
-    def __init__(self, financelib) -> None:
+    def __init__(self, financelib, cache: Optional[PriceCache] = None,
+                 timeout: Optional[float] = None,
+                 history_months: int = HISTORY_MONTHS,
+                 lean: bool = False) -> None:
+        """
+        :param financelib: Library used to download the prices (yfinance).
+        :param cache: Optional on-disk cache of the prices.
+        :param timeout: Seconds to wait for the response of each request,
+        None waits forever.
+        :param history_months: Months of prices to download, see
+        periods.get_history_months.
+        :param lean: Keep only the LEAN_COLUMNS of the prices, with the dates
+        as int32 ordinals (see types.get_ordinals) and float32 numbers when
+        they keep the cents of the closes.
+        """
         self.financelib = financelib
+        self.cache = cache
+        self.timeout = timeout
+        self.history_months = history_months
+        self.period = _get_yahoo_period(history_months)
+        self.lean = lean
 
     def get_stock_historical_data(self, symbol: str) -> DataFrame:
         """
         Returns historical data in descending order.
+        When the downloader has a cache, only the sessions after the last
+        cached date are downloaded.
         :param symbol: Symbol of the stock we want to get historical data.
         :return: A pandas dataframe with the historical data in descending order.
         """
+        if self.cache is None:
+            return self._download(symbol)
+
+        cached_prices = self._read_cache(self.cache, symbol)
+        if cached_prices is not None:
+            return self._update_cache(self.cache, symbol, cached_prices)
+
+        prices = self._download(symbol)
+        if not prices.empty:
+            self.cache.write(symbol, prices)
+        return prices
+
+    def get_many(self, symbols: list[str]) -> BatchPrices:
+        """
+        Returns historical data of many symbols using a single bulk request.
+        When the downloader has a cache, the fresh symbols are read from it,
+        the stale ones only download their new sessions, and the bulk
+        request only downloads the symbols that are not cached.
+        A symbol that fails to download does not abort the batch, it is
+        reported in the failed list instead.
+        :param symbols: Symbols of the stocks we want to get historical data.
+        :return: A BatchPrices object containing a dataframe in descending
+        order per downloaded symbol, and the list of symbols that failed.
+        """
+        prices = {}
+        failed = []
+        missing = symbols
+        if self.cache is not None:
+            missing = []
+            for symbol in symbols:
+                cached_prices = self._read_cache(self.cache, symbol)
+                if cached_prices is None:
+                    missing.append(symbol)
+                    continue
+                try:
+                    prices[symbol] = self._update_cache(self.cache, symbol,
+                                                        cached_prices)
+                except Exception:
+                    failed.append(symbol)  # the caller may retry it alone
+
+        if not missing:
+            return BatchPrices(prices=prices, failed=failed)
+
+        data = self.financelib.download(
+            missing, period=self.period, group_by='ticker',
+            auto_adjust=True, actions=True, progress=False, show_errors=False,
+            timeout=self.timeout
+        )
+
+        for symbol in missing:
+            symbol_prices = _get_symbol_prices(data, symbol, len(missing))
+            if symbol_prices.empty:
+                failed.append(symbol)
+                continue
+            prices[symbol] = self._to_descending_with_returns(symbol_prices)
+            if self.cache is not None:
+                self.cache.write(symbol, prices[symbol])
+
+        return BatchPrices(prices=prices, failed=failed)
+
+    # private methods
+
+    def _download(self, symbol: str) -> DataFrame:
+        ticker = self.financelib.Ticker(symbol)
+        prices = ticker.history(period=self.period, timeout=self.timeout)
+        return self._to_descending_with_returns(prices)
+
+    def _read_cache(self, cache: PriceCache,
+                    symbol: str) -> Optional[DataFrame]:
+        """
+        Return the cached prices of a symbol, or None if they are missing or
+        shorter than the history of the downloader.
+        """
+        cached_prices = cache.read(symbol)
+        if cached_prices is None or cached_prices.empty:
+            return None
+        if self.lean:
+            # the cache may be written by a downloader of full prices
+            cached_prices = _to_lean(cached_prices)
+        if not self._covers_history(cached_prices):
+            return None
+        return cached_prices
+
+    def _update_cache(self, cache: PriceCache, symbol: str,
+                      cached_prices: DataFrame) -> DataFrame:
+        """
+        Return the cached prices of a symbol with the sessions after its last
+        cached date, they are written to the cache.
+        """
+        if cache.is_fresh(cached_prices):
+            return cached_prices
+
+        prices = self._download_after(symbol, cached_prices)
+        if prices is cached_prices:
+            return prices  # there are no new sessions yet
+
+        if not prices.empty:
+            cache.write(symbol, prices)
+        return prices
+
+    def _download_after(self, symbol: str, cached_prices: DataFrame) -> DataFrame:
+        """
+        Download the sessions after the last cached date and add them on top
+        of the cached prices. Only the derived columns of the new rows are
+        computed.
+        """
+        last_cached_date = _get_timestamp(cached_prices.Date.iloc[0])
+        start = last_cached_date + datetime.timedelta(days=1)
         ticker = self.financelib.Ticker(symbol)
-        prices = ticker.history(period=Period.YEAR)
+        new_prices = ticker.history(start=start.date().isoformat(),
+                                    timeout=self.timeout)
+        new_prices = _without_timezone(new_prices)
+        new_prices = new_prices[new_prices.index > last_cached_date]
+        if new_prices.empty:
+            return cached_prices
+
+        if _has_actions(new_prices):
+            # dividends and splits adjust the whole history
+            return self._download(symbol)
 
-        prices.sort_index(ascending=False, inplace=True)  # Today's index should be 0
-        prices = prices.reset_index()  # Required to add row number as index
+        new_prices = self._to_descending_with_returns(
+            new_prices, previous_close=cached_prices.Close.iloc[0])
+        prices = pd.concat([new_prices, cached_prices], ignore_index=True)
+        return _trim_to_period(prices, self.history_months)
 
-        prices['change'] = (prices.Close - prices.Close.shift(-1)) / prices.Close.shift(-1)
-        prices['log_return'] = (np.log(prices.Close / prices.Close.shift(-1)))
+    def _covers_history(self, cached_prices: DataFrame) -> bool:
+        """
+        Return False if the cached prices were downloaded with a shorter
+        history, for example before the history was raised for longer
+        periods. The default history does not check the cache, so a symbol
+        listed recently is not downloaded again.
+        """
+        if self.history_months <= HISTORY_MONTHS:
+            return True
+        last_date = _get_timestamp(cached_prices.Date.iloc[0])
+        oldest_date = _get_timestamp(cached_prices.Date.iloc[-1])
+        # a week of slack for the holidays at the start of the history
+        expected_date = last_date - pd.DateOffset(months=self.history_months)
+        return oldest_date <= expected_date + pd.DateOffset(days=7)
+
+    def _to_descending_with_returns(self, prices: DataFrame,
+                                    previous_close: float = np.nan
+                                    ) -> DataFrame:
+        if self.lean:
+            return _to_lean_descending_with_returns(prices, previous_close)
+        return _to_descending_with_returns(prices, previous_close)
+
+
+def get_memory_usage(prices: DataFrame) -> int:
+    """
+    Return the bytes used by the prices, including the index.
+    """
+    return int(prices.memory_usage(index=True, deep=True).sum())
+
+
+# private functions
+
+
+def _get_symbol_prices(data: DataFrame, symbol: str,
+                       batch_size: int) -> DataFrame:
+    """
+    Return the columns of a symbol from the wide dataframe returned by a
+    bulk download. The rows where the symbol did not trade (other symbols
+    of the batch may trade in other calendars) are dropped.
+    """
+    if batch_size == 1:
+        symbol_prices = data  # a batch of one symbol is not grouped by ticker
+    elif symbol.upper() in data.columns.get_level_values(0):
+        symbol_prices = data[symbol.upper()]
+    else:
+        return DataFrame()
+
+    if 'Close' not in symbol_prices.columns:
+        return DataFrame()
+
+    return symbol_prices.dropna(subset=['Close'])
+
+
+def _to_descending_with_returns(prices: DataFrame,
+                                previous_close: float = np.nan) -> DataFrame:
+    """
+    Sort the prices in descending order and add the change and log_return
+    columns.
+    :param prices: Historical data as returned by the finance library.
+    :param previous_close: Close price of the session before the oldest row,
+    used to compute the derived columns of the oldest row.
+    """
+    prices = _without_timezone(prices)
+    prices = prices.sort_index(ascending=False)  # Today's index should be 0
+    prices = prices.reset_index()  # Required to add row number as index
+
+    previous = prices.Close.shift(-1, fill_value=previous_close)
+    prices['change'] = (prices.Close - previous) / previous
+    prices['log_return'] = (np.log(prices.Close / previous))
+    return prices
+
+
+def _without_timezone(prices: DataFrame) -> DataFrame:
+    """
+    Return the prices with the local dates of their market, like the dates
+    read from the price cache.
+    """
+    if isinstance(prices.index, pd.DatetimeIndex) \
+            and prices.index.tz is not None:
+        return prices.tz_localize(None)
+    return prices
+
+
+def _to_lean_descending_with_returns(prices: DataFrame,
+                                     previous_close: float = np.nan
+                                     ) -> DataFrame:
+    """
+    Return the LEAN_COLUMNS of the prices in descending order, see
+    _to_descending_with_returns. Only the close prices and the dates are
+    read, the other columns of the prices are not copied.
+    """
+    close = prices['Close'].to_numpy(dtype=float)[::-1]
+    previous: np.ndarray = np.append(close[1:], previous_close)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        change = (close - previous) / previous
+        log_return = np.log(close / previous)
+    dates = get_ordinals(prices.index.to_series())[::-1]
+    return DataFrame({
+        'Date': dates.astype(np.int32),
+        'Close': _downcast_close(close),
+        'change': change.astype(np.float32),
+        'log_return': log_return.astype(np.float32),
+    })
+
+
+def _to_lean(prices: DataFrame) -> DataFrame:
+    """
+    Return the LEAN_COLUMNS of full prices in descending order, lean prices
+    are returned as they are.
+    """
+    if list(prices.columns) == LEAN_COLUMNS \
+            and pd.api.types.is_integer_dtype(prices.Date):
         return prices
+    return DataFrame({
+        'Date': get_ordinals(prices.Date).astype(np.int32),
+        'Close': _downcast_close(prices.Close.to_numpy(dtype=float)),
+        'change': prices.change.to_numpy(dtype=np.float32),
+        'log_return': prices.log_return.to_numpy(dtype=np.float32),
+    })
+
+
+def _downcast_close(close: np.ndarray) -> np.ndarray:
+    if len(close) and np.nanmax(np.abs(close), initial=0) >= MAX_FLOAT32_CLOSE:
+        return close
+    return close.astype(np.float32)
+
+
+def _get_timestamp(value) -> pd.Timestamp:
+    if isinstance(value, (int, np.integer)):
+        return pd.Timestamp(get_date(value))  # an ordinal of lean prices
+    return pd.Timestamp(value)
+
+
+def _has_actions(prices: DataFrame) -> bool:
+    return any(
+        column in prices.columns and prices[column].fillna(0).any()
+        for column in ACTION_COLUMNS
+    )
+
+
+def _get_yahoo_period(months: int) -> str:
+    """
+    Return the shortest period of yfinance that contains the months.
+    """
+    if months <= HISTORY_MONTHS:
+        return Period.YEAR
+    for range_months, period in YAHOO_RANGES:
+        if months <= range_months:
+            return period
+    return 'max'
+
+
+def _trim_to_period(prices: DataFrame, months: int) -> DataFrame:
+    """
+    Keep the rows of the last months, like a download of the history.
+    The oldest row has no previous session, so its derived columns are NaN.
+    """
+    last_date = _get_timestamp(prices.Date.iloc[0])
+    first_date = (last_date - pd.DateOffset(months=months)).date()
+    prices = prices[get_ordinals(prices.Date) > first_date.toordinal()].copy()
+    prices.loc[prices.index[-1], ['change', 'log_return']] = np.nan
+    return prices
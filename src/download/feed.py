@@ -0,0 +1,124 @@
+"""
+Feeds of the latest prices of many symbols, used by the intraday mode.
+A feed returns the prices of every requested symbol in a single array, so a
+tick of thousands of symbols is checked with vectorized operations.
+"""
+import datetime
+from typing import NamedTuple, Optional
+
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+
+MINUTE_INTERVAL = '1m'
+DAY_PERIOD = '1d'
+
+
+class Quotes(NamedTuple):
+    """
+    Latest prices of a list of symbols, NaN when a symbol has no price.
+    """
+    time: datetime.datetime  # local time of the market
+    prices: np.ndarray
+
+
+class YahooFeed:
+    """
+    Polls the last minute bar of every symbol using one bulk request.
+    """
+
+    def __init__(self, financelib, timeout: Optional[float] = None) -> None:
+        """
+        :param financelib: Library used to download the prices (yfinance).
+        :param timeout: Seconds to wait for the response of each request.
+        """
+        self.financelib = financelib
+        self.timeout = timeout
+
+    def get_quotes(self, symbols: list[str]) -> Optional[Quotes]:
+        """
+        Return the last price of the symbols, or None if there are no
+        minute bars.
+        """
+        if not symbols:
+            return None
+
+        data = self.financelib.download(
+            symbols, period=DAY_PERIOD, interval=MINUTE_INTERVAL,
+            group_by='ticker', progress=False, show_errors=False,
+            timeout=self.timeout
+        )
+        closes = _get_closes(data, symbols)
+        if closes.empty:
+            return None
+
+        # the last bar of each symbol, symbols without bars are NaN
+        prices = closes.ffill().iloc[-1].to_numpy(dtype=float)
+        return Quotes(time=_to_local_time(closes.index[-1]), prices=prices)
+
+    def is_finished(self) -> bool:
+        return False  # the market keeps trading
+
+
+class ReplayFeed:
+    """
+    Replays recorded prices, one row per tick. It runs the intraday mode
+    offline, for example to test it with the prices of a past session.
+    """
+
+    def __init__(self, prices: DataFrame) -> None:
+        """
+        :param prices: Prices with a datetime index and a column per symbol.
+        """
+        self.prices = prices.sort_index()
+        self.prices.columns = self.prices.columns.str.upper()
+        self.position = 0
+
+    @classmethod
+    def from_csv(cls, path: str) -> 'ReplayFeed':
+        """
+        Read a CSV file with a Datetime column and a column per symbol.
+        """
+        prices = pd.read_csv(path, index_col='Datetime', parse_dates=True)
+        return cls(prices)
+
+    def get_quotes(self, symbols: list[str]) -> Optional[Quotes]:
+        """
+        Return the prices of the next row, or None when the replay ended.
+        """
+        if self.position >= len(self.prices):
+            return None
+
+        row = self.prices.iloc[self.position]
+        self.position += 1
+        prices = row.reindex([symbol.upper() for symbol in symbols])
+        return Quotes(time=_to_local_time(row.name),
+                      prices=prices.to_numpy(dtype=float))
+
+    def is_finished(self) -> bool:
+        return self.position >= len(self.prices)
+
+
+# private functions
+
+
+def _get_closes(data: DataFrame, symbols: list[str]) -> DataFrame:
+    """
+    Return the close prices of the bulk download with a column per symbol.
+    """
+    if data.empty:
+        return DataFrame()
+
+    if len(symbols) == 1:
+        # a batch of one symbol is not grouped by ticker
+        return DataFrame({symbols[0].upper(): data['Close']})
+
+    closes = data.xs('Close', axis=1, level=1)
+    return closes.reindex(columns=[symbol.upper() for symbol in symbols])
+
+
+def _to_local_time(value) -> datetime.datetime:
+    timestamp = pd.Timestamp(value)
+    if timestamp.tz is not None:
+        timestamp = timestamp.tz_localize(None)
+    return timestamp.to_pydatetime()
@@ -0,0 +1,92 @@
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Callable, Optional
+
+from pandas import DataFrame
+
+from src.common import logs
+from src.common.types import BatchPrices
+from src.download.download import Download
+
+logger = logs.get_logger(__name__)
+
+
+class Fetcher:
+    """
+    Downloads many symbols concurrently with a bounded number of threads.
+    A symbol that is slow or fails is retried and then reported as failed,
+    it does not block or abort the download of the other symbols.
+    """
+
+    def __init__(self, downloader: Download, max_workers: int = 8,
+                 retries: int = 2, backoff: float = 1.0,
+                 deadline: Optional[float] = None,
+                 sleep: Callable[[float], None] = time.sleep) -> None:
+        """
+        :param downloader: Downloader of the historical prices, its timeout
+        limits the time of each request.
+        :param max_workers: Maximum number of concurrent downloads.
+        :param retries: Number of retries after a failed download.
+        :param backoff: Base seconds to wait before a retry, it doubles after
+        each retry and it is randomized (jitter) to spread the retries.
+        :param deadline: Maximum seconds to wait for all the symbols, the
+        symbols that are not ready are reported as failed.
+        :param sleep: Function used to wait between retries.
+        """
+        self.downloader = downloader
+        self.max_workers = max_workers
+        self.retries = retries
+        self.backoff = backoff
+        self.deadline = deadline
+        self.sleep = sleep
+
+    def fetch(self, symbols: list[str]) -> BatchPrices:
+        """
+        Download the historical data of the symbols concurrently.
+        :param symbols: Symbols of the stocks we want to get historical data.
+        :return: A BatchPrices object with the prices in the order of the
+        given symbols, the list of symbols that failed, and the failed symbols
+        that do not exist.
+        """
+        if not symbols:
+            return BatchPrices(prices={}, failed=[])
+
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        futures = [executor.submit(self._fetch_one, symbol) for symbol in symbols]
+        wait(futures, timeout=self.deadline)
+        # do not wait for the downloads that missed the deadline
+        executor.shutdown(wait=False, cancel_futures=True)
+
+        prices = {}
+        failed = []
+        unknown = []
+        for symbol, future in zip(symbols, futures):
+            is_ready = future.done() and not future.cancelled()
+            symbol_prices = future.result() if is_ready else None
+            if symbol_prices is None or symbol_prices.empty:
+                failed.append(symbol)
+            else:
+                prices[symbol] = symbol_prices
+            if symbol_prices is not None and symbol_prices.empty:
+                unknown.append(symbol)
+
+        return BatchPrices(prices=prices, failed=failed, unknown=unknown)
+
+    # private methods
+
+    def _fetch_one(self, symbol: str) -> Optional[DataFrame]:
+        for attempt in range(self.retries + 1):
+            try:
+                # empty prices mean an unknown symbol, a retry will not help
+                return self.downloader.get_stock_historical_data(symbol)
+            except Exception as e:
+                logger.error(f'_fetch_one: {symbol} attempt {attempt + 1} '
+                             f'failed: {e}')
+                if attempt < self.retries:
+                    self.sleep(self._get_backoff(attempt))
+
+        return None
+
+    def _get_backoff(self, attempt: int) -> float:
+        return self.backoff * 2 ** attempt * random.uniform(0.5, 1.5)
@@ -0,0 +1,99 @@
+from typing import Optional
+
+from pandas import DataFrame
+
+from src.common import logs
+from src.download import download
+from src.download.download import Download
+from src.download.fetcher import Fetcher
+
+logger = logs.get_logger(__name__)
+
+
+class PriceStore:
+    """
+    Holds the historical prices downloaded during a single run.
+    Each symbol is downloaded at most once, every task of the run
+    (monitor, report, etc.) reads the same dataframe from the store.
+    """
+
+    def __init__(self, downloader: Download,
+                 fetcher: Optional[Fetcher] = None) -> None:
+        """
+        :param downloader: Downloader of the historical prices.
+        :param fetcher: Concurrent downloader used to retry the symbols that
+        failed in the bulk download.
+        """
+        self.downloader = downloader
+        self.fetcher = fetcher or Fetcher(downloader)
+        self.prices: dict[str, DataFrame] = {}
+        self.failed: set[str] = set()
+        # the failed symbols that do not exist
+        self.unknown: set[str] = set()
+        self.fetches = 0
+        self.hits = 0
+
+    def get_stock_historical_data(self, symbol: str) -> DataFrame:
+        """
+        Returns historical data in descending order, downloading it only
+        the first time the symbol is requested.
+        :param symbol: Symbol of the stock we want to get historical data.
+        :return: A pandas dataframe with the historical data in descending order.
+        """
+        if symbol in self.prices:
+            self.hits += 1
+            return self.prices[symbol]
+
+        self.fetches += 1
+        prices = self.downloader.get_stock_historical_data(symbol)
+        self.prices[symbol] = prices
+        return prices
+
+    def prefetch(self, symbols: list[str]) -> list[str]:
+        """
+        Download the symbols that are not in the store using one bulk request.
+        The symbols that fail in the bulk request are downloaded again
+        concurrently, one by one.
+        :param symbols: Symbols that the tasks of the run are going to read.
+        :return: The symbols that failed to download. They are not downloaded
+        again by the next calls to prefetch.
+        """
+        missing = [symbol for symbol in dict.fromkeys(symbols)
+                   if symbol not in self.prices and symbol not in self.failed]
+        if not missing:
+            return []
+
+        self.fetches += len(missing)
+        try:
+            batch = self.downloader.get_many(missing)
+            self.prices.update(batch.prices)
+            retry = batch.failed
+        except Exception as e:
+            logger.error(f'prefetch: bulk download failed: {e}')
+            retry = missing
+
+        if retry:
+            batch = self.fetcher.fetch(retry)
+            self.prices.update(batch.prices)
+            self.failed.update(batch.failed)
+            self.unknown.update(batch.unknown)
+
+        failed = [symbol for symbol in missing if symbol in self.failed]
+        if failed:
+            logger.error(f'prefetch: failed symbols {failed}')
+        return failed
+
+    def get_memory_usage(self) -> int:
+        """
+        Return the bytes used by the prices of the store.
+        """
+        return sum(download.get_memory_usage(prices)
+                   for prices in self.prices.values())
+
+    def summary(self) -> str:
+        memory = self.get_memory_usage()
+        per_symbol = memory / len(self.prices) if self.prices else 0
+        return f'price store: {self.fetches} fetches, {self.hits} hits, ' \
+               f'{len(self.failed)} failed, {memory / 1024:.1f} KiB in ' \
+               f'{len(self.prices)} symbols ({per_symbol / 1024:.1f} KiB ' \
+               f'per symbol)'
@@ -0,0 +1,46 @@
+import datetime
+import tempfile
+import unittest
+
+import pandas as pd
+
+from src.download.cache import PriceCache
+
+
+class PriceCacheTests(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache = PriceCache(self.directory.name)
+        self.prices = pd.read_csv(
+            'src/analyst/test_files/AMZN_from_stockbot.csv',
+            parse_dates=['Date'])
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_read_given_symbol_not_cached_return_none(self):
+        # act
+        prices = self.cache.read('AMZN')
+        # assert
+        self.assertIsNone(prices)
+
+    def test_read_given_cached_symbol_return_same_prices(self):
+        # arrange
+        self.cache.write('AMZN', self.prices)
+        # act
+        prices = self.cache.read('amzn')
+        # assert
+        pd.testing.assert_frame_equal(prices, self.prices)
+
+    def test_is_fresh_given_last_session_cached_return_true(self):
+        # arrange
+        now = datetime.datetime(2022, 7, 30, 12, 0)  # Saturday
+        # act and assert
+        self.assertTrue(self.cache.is_fresh(self.prices, now))
+
+    def test_is_fresh_given_new_session_closed_return_false(self):
+        # arrange
+        now = datetime.datetime(2022, 8, 1, 22, 0)  # Monday after close
+        # act and assert
+        self.assertFalse(self.cache.is_fresh(self.prices, now))
@@ -1,9 +1,14 @@
+import tempfile
 import unittest
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 
+import numpy as np
 import pandas as pd
 import yfinance as yf
 
+from src.common.types import get_ordinals
+from src.download import download
+from src.download.cache import PriceCache
 from src.download.download import Download
 
 
@@ -22,6 +27,261 @@ class DownloadTests(unittest.TestCase):
         self.assertEqual(len(prices.change), 252)
         self.assertEqual(len(prices.log_return), 252)
 
+    def test_get_many_returns_descending_data_per_symbol(self):
+        # arrange
+        symbols = ['AMZN', 'amzn2']
+        mocked_yf = self._get_mocked_yfinance_bulk(['AMZN', 'AMZN2'])
+        downloader = Download(mocked_yf)
+        expected_prices = Download(
+            self._get_mocked_yfinance()).get_stock_historical_data('AMZN')
+        # act
+        batch = downloader.get_many(symbols)
+        # assert
+        self.assertEqual(batch.failed, [])
+        self.assertEqual(list(batch.prices.keys()), symbols)
+        for symbol in symbols:
+            prices = batch.prices[symbol]
+            self.assertEqual(len(prices), 252)
+            self.assertTrue(prices.Date.is_monotonic_decreasing)
+            pd.testing.assert_series_equal(prices.Close, expected_prices.Close)
+            pd.testing.assert_series_equal(prices.change, expected_prices.change)
+            pd.testing.assert_series_equal(
+                prices.log_return, expected_prices.log_return)
+
+    def test_get_many_reports_failed_symbols_without_aborting(self):
+        # arrange
+        mocked_yf = self._get_mocked_yfinance_bulk(['AMZN'], failed=['AAAA'])
+        downloader = Download(mocked_yf)
+        # act
+        batch = downloader.get_many(['AMZN', 'AAAA', 'BBBB'])
+        # assert
+        self.assertEqual(list(batch.prices.keys()), ['AMZN'])
+        self.assertEqual(batch.failed, ['AAAA', 'BBBB'])
+
+    def test_get_many_given_no_symbols_does_not_download(self):
+        # arrange
+        mocked_yf = MagicMock()
+        downloader = Download(mocked_yf)
+        # act
+        batch = downloader.get_many([])
+        # assert
+        self.assertEqual(batch.prices, {})
+        self.assertEqual(batch.failed, [])
+        mocked_yf.download.assert_not_called()
+
+    def test_get_stock_historical_data_given_empty_cache_writes_the_cache(self):
+        # arrange
+        history = self._read_yfinance_history()
+        mocked_yf = self._get_fake_yfinance(history)
+        with tempfile.TemporaryDirectory() as directory:
+            cache = PriceCache(directory)
+            downloader = Download(mocked_yf, cache)
+            # act
+            prices = downloader.get_stock_historical_data('AMZN')
+            # assert
+            pd.testing.assert_frame_equal(cache.read('AMZN'), prices)
+
+    @patch('src.download.cache.PriceCache.is_fresh', return_value=True)
+    def test_get_stock_historical_data_given_fresh_cache_does_not_download(
+            self, _):
+        # arrange
+        history = self._read_yfinance_history()
+        mocked_yf = self._get_fake_yfinance(history)
+        with tempfile.TemporaryDirectory() as directory:
+            downloader = Download(mocked_yf, PriceCache(directory))
+            expected_prices = downloader.get_stock_historical_data('AMZN')
+            # act
+            prices = downloader.get_stock_historical_data('AMZN')
+            # assert
+            self.assertEqual(mocked_yf.Ticker.call_count, 1)
+            pd.testing.assert_frame_equal(prices, expected_prices)
+
+    def test_get_stock_historical_data_given_stale_cache_appends_new_sessions(
+            self):
+        # arrange
+        history = self._read_yfinance_history()
+        with tempfile.TemporaryDirectory() as directory:
+            cache = PriceCache(directory)
+            # the cache has all the sessions but the last two
+            Download(self._get_fake_yfinance(history[:-2]), cache) \
+                .get_stock_historical_data('AMZN')
+            mocked_yf = self._get_fake_yfinance(history)
+            downloader = Download(mocked_yf, cache)
+            expected_prices = Download(
+                self._get_fake_yfinance(history)).get_stock_historical_data('AMZN')
+            # act
+            prices = downloader.get_stock_historical_data('AMZN')
+            # assert
+            mocked_yf.Ticker.return_value.history.assert_called_once_with(
+                start='2022-07-28', timeout=None)
+            pd.testing.assert_frame_equal(prices, expected_prices)
+            pd.testing.assert_frame_equal(cache.read('AMZN'), expected_prices)
+
+    def test_get_stock_historical_data_given_stale_cache_and_timezone_appends_new_sessions(
+            self):
+        # arrange
+        history = self._read_yfinance_history()
+        # yfinance returns the dates in the timezone of the market
+        history.index = history.index.tz_localize('America/New_York')
+        with tempfile.TemporaryDirectory() as directory:
+            cache = PriceCache(directory)
+            Download(self._get_fake_yfinance(history[:-2]), cache) \
+                .get_stock_historical_data('AMZN')
+            downloader = Download(self._get_fake_yfinance(history), cache)
+            expected_prices = Download(
+                self._get_fake_yfinance(history)).get_stock_historical_data('AMZN')
+            # act
+            prices = downloader.get_stock_historical_data('AMZN')
+            # assert
+            self.assertEqual(len(prices), len(expected_prices))
+            np.testing.assert_array_equal(get_ordinals(prices.Date),
+                                          get_ordinals(expected_prices.Date))
+            np.testing.assert_allclose(prices.Close, expected_prices.Close)
+            np.testing.assert_allclose(prices.change, expected_prices.change)
+
+    @patch('src.download.cache.PriceCache.is_fresh', return_value=True)
+    def test_get_stock_historical_data_given_longer_history_downloads_again(
+            self, _):
+        # arrange
+        history = self._read_yfinance_history()
+        with tempfile.TemporaryDirectory() as directory:
+            cache = PriceCache(directory)
+            Download(self._get_fake_yfinance(history), cache) \
+                .get_stock_historical_data('AMZN')
+            mocked_yf = self._get_fake_yfinance(history)
+            downloader = Download(mocked_yf, cache, history_months=60)
+            # act
+            downloader.get_stock_historical_data('AMZN')
+            # assert
+            mocked_yf.Ticker.return_value.history.assert_called_once_with(
+                period='5y', timeout=None)
+
+    def test_get_stock_historical_data_given_lean_returns_lean_columns(self):
+        # arrange
+        history = self._read_yfinance_history()
+        expected_prices = Download(
+            self._get_fake_yfinance(history)).get_stock_historical_data('AMZN')
+        downloader = Download(self._get_fake_yfinance(history), lean=True)
+        # act
+        prices = downloader.get_stock_historical_data('AMZN')
+        # assert
+        self.assertEqual(list(prices.columns), download.LEAN_COLUMNS)
+        self.assertEqual([str(dtype) for dtype in prices.dtypes],
+                         ['int32', 'float32', 'float32', 'float32'])
+        np.testing.assert_array_equal(
+            prices.Date, get_ordinals(expected_prices.Date))
+        for column in ['Close', 'change', 'log_return']:
+            np.testing.assert_allclose(prices[column], expected_prices[column],
+                                       rtol=1e-6)
+        self.assertLess(download.get_memory_usage(prices),
+                        download.get_memory_usage(expected_prices) / 4)
+
+    def test_get_stock_historical_data_given_lean_and_full_cache_appends_new_sessions(
+            self):
+        # arrange
+        history = self._read_yfinance_history()
+        with tempfile.TemporaryDirectory() as directory:
+            cache = PriceCache(directory)
+            # the cache has the full prices of all the sessions but the last two
+            Download(self._get_fake_yfinance(history[:-2]), cache) \
+                .get_stock_historical_data('AMZN')
+            downloader = Download(self._get_fake_yfinance(history), cache,
+                                  lean=True)
+            expected_prices = Download(self._get_fake_yfinance(history),
+                                       lean=True).get_stock_historical_data('AMZN')
+            # act
+            prices = downloader.get_stock_historical_data('AMZN')
+            # assert
+            pd.testing.assert_frame_equal(prices, expected_prices)
+            pd.testing.assert_frame_equal(cache.read('AMZN'), expected_prices)
+
+    def test_get_many_given_cache_downloads_only_missing_symbols(self):
+        # arrange
+        history = self._read_yfinance_history()
+        last_ordinal = history.index[-1].toordinal()
+
+        def is_fresh(prices):
+            return get_ordinals(prices.Date)[0] >= last_ordinal
+
+        symbols = ['AMZN', 'GOOG', 'MSFT', 'NFLX']
+        with tempfile.TemporaryDirectory() as directory:
+            cache = PriceCache(directory)
+            Download(self._get_fake_yfinance(history), cache) \
+                .get_stock_historical_data('AMZN')
+            # the cache of MSFT has all the sessions but the last two
+            Download(self._get_fake_yfinance(history[:-2]), cache) \
+                .get_stock_historical_data('MSFT')
+            mocked_yf = self._get_fake_yfinance(history)
+            mocked_yf.download = self._get_mocked_yfinance_bulk(
+                ['GOOG', 'NFLX']).download
+            downloader = Download(mocked_yf, cache)
+            expected_prices = Download(
+                self._get_fake_yfinance(history)).get_stock_historical_data('AMZN')
+            # act
+            with patch.object(PriceCache, 'is_fresh', side_effect=is_fresh):
+                batch = downloader.get_many(symbols)
+            # assert
+            self.assertEqual(mocked_yf.download.call_args[0][0],
+                             ['GOOG', 'NFLX'])
+            mocked_yf.Ticker.return_value.history.assert_called_once_with(
+                start='2022-07-28', timeout=None)
+            self.assertEqual(batch.failed, [])
+            self.assertEqual(sorted(batch.prices), symbols)
+            for symbol in symbols:
+                prices = batch.prices[symbol]
+                self.assertEqual(prices.Date.dtype, expected_prices.Date.dtype)
+                np.testing.assert_array_equal(
+                    get_ordinals(prices.Date), get_ordinals(expected_prices.Date))
+                np.testing.assert_allclose(prices.Close, expected_prices.Close)
+            pd.testing.assert_frame_equal(cache.read('GOOG'), batch.prices['GOOG'])
+
+    def test_get_stock_historical_data_given_timezone_returns_cached_dates(self):
+        # arrange
+        history = self._read_yfinance_history()
+        # yfinance returns the dates in the timezone of the market
+        history.index = history.index.tz_localize('America/New_York')
+        with tempfile.TemporaryDirectory() as directory:
+            cache = PriceCache(directory)
+            downloader = Download(self._get_fake_yfinance(history), cache)
+            # act
+            prices = downloader.get_stock_historical_data('AMZN')
+            # assert
+            self.assertIsNone(prices.Date.dt.tz)
+            pd.testing.assert_frame_equal(cache.read('AMZN'), prices)
+
+    @staticmethod
+    def _read_yfinance_history():
+        return pd.read_csv('src/download/test_files/AMZN_from_yfinance.csv',
+                           index_col='Date', parse_dates=True)
+
+    @staticmethod
+    def _get_fake_yfinance(history):
+        """
+        Return a finance library that serves the given history.
+        """
+        def get_history(period=None, start=None, timeout=None):
+            if start is None:
+                return history.copy()
+            return history[history.index >= start].copy()
+
+        mocked_ticker = MagicMock()
+        mocked_ticker.history = MagicMock(side_effect=get_history)
+        mocked_yf = MagicMock()
+        mocked_yf.Ticker = MagicMock(return_value=mocked_ticker)
+        return mocked_yf
+
+    @staticmethod
+    def _get_mocked_yfinance_bulk(symbols: list[str], failed=()):
+        prices = pd.read_csv('src/download/test_files/AMZN_from_yfinance.csv',
+                             index_col='Date', parse_dates=True)
+        empty = pd.DataFrame(np.nan, index=prices.index,
+                             columns=prices.columns)
+        frames = [prices] * len(symbols) + [empty] * len(failed)
+        data = pd.concat(frames, axis=1, keys=[*symbols, *failed])
+        mocked_yf = MagicMock()
+        mocked_yf.download = MagicMock(return_value=data)
+        return mocked_yf
+
     @staticmethod
     def _get_mocked_yfinance():
         expected_df = pd.read_csv('src/download/test_files/AMZN_from_yfinance.csv')
@@ -0,0 +1,71 @@
+import datetime
+import unittest
+from unittest.mock import MagicMock
+
+import numpy as np
+import pandas as pd
+
+from src.download.feed import ReplayFeed, YahooFeed
+
+
+class FeedTests(unittest.TestCase):
+
+    def setUp(self):
+        times = pd.date_range('2022-08-01 09:30', periods=3, freq='min',
+                              tz='America/New_York')
+        self.bars = pd.concat(
+            [
+                pd.DataFrame({'Close': [10.0, 11.0, 12.0]}, index=times),
+                pd.DataFrame({'Close': [20.0, 21.0, np.nan]}, index=times),
+            ],
+            axis=1, keys=['AMZN', 'MSFT'])
+
+    def test_get_quotes_given_minute_bars_return_last_price_per_symbol(self):
+        # arrange
+        mocked_yf = MagicMock()
+        mocked_yf.download = MagicMock(return_value=self.bars)
+        feed = YahooFeed(mocked_yf)
+        # act
+        quotes = feed.get_quotes(['msft', 'AMZN', 'AAAA'])
+        # assert
+        self.assertEqual(quotes.time, datetime.datetime(2022, 8, 1, 9, 32))
+        np.testing.assert_array_equal(quotes.prices, [21.0, 12.0, np.nan])
+
+    def test_get_quotes_given_one_symbol_return_its_last_price(self):
+        # arrange
+        mocked_yf = MagicMock()
+        mocked_yf.download = MagicMock(return_value=self.bars['AMZN'])
+        feed = YahooFeed(mocked_yf)
+        # act
+        quotes = feed.get_quotes(['AMZN'])
+        # assert
+        np.testing.assert_array_equal(quotes.prices, [12.0])
+
+    def test_get_quotes_given_no_bars_return_none(self):
+        # arrange
+        mocked_yf = MagicMock()
+        mocked_yf.download = MagicMock(return_value=pd.DataFrame())
+        feed = YahooFeed(mocked_yf)
+        # act
+        quotes = feed.get_quotes(['AMZN', 'MSFT'])
+        # assert
+        self.assertIsNone(quotes)
+
+    def test_get_quotes_given_replay_return_one_row_per_tick(self):
+        # arrange
+        prices = pd.DataFrame(
+            {'amzn': [10.0, 11.0], 'MSFT': [20.0, 21.0]},
+            index=pd.to_datetime(['2022-08-01 09:31', '2022-08-01 09:30']))
+        feed = ReplayFeed(prices)
+        # act
+        ticks = []
+        while not feed.is_finished():
+            ticks.append(feed.get_quotes(['AMZN', 'AAAA']))
+        # assert
+        self.assertEqual([quotes.time for quotes in ticks], [
+            datetime.datetime(2022, 8, 1, 9, 30),
+            datetime.datetime(2022, 8, 1, 9, 31),
+        ])
+        np.testing.assert_array_equal(ticks[0].prices, [11.0, np.nan])
+        np.testing.assert_array_equal(ticks[1].prices, [10.0, np.nan])
+        self.assertIsNone(feed.get_quotes(['AMZN']))
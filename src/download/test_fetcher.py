@@ -0,0 +1,97 @@
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock
+
+import pandas as pd
+
+from src.download.fetcher import Fetcher
+
+
+class FetcherTests(unittest.TestCase):
+
+    def setUp(self):
+        self.prices = pd.read_csv(
+            'src/analyst/test_files/AMZN_from_stockbot.csv')
+        self.downloader_mock = MagicMock()
+        self.sleep_mock = MagicMock()
+
+    def test_fetch_return_prices_in_the_order_of_the_symbols(self):
+        # arrange
+        symbols = ['C', 'A', 'B']
+        delays = {'A': 0.02, 'B': 0.0, 'C': 0.04}
+
+        def get_prices(symbol):
+            time.sleep(delays[symbol])
+            return self.prices.assign(symbol=symbol)
+
+        self.downloader_mock.get_stock_historical_data = MagicMock(
+            side_effect=get_prices)
+        fetcher = Fetcher(self.downloader_mock, max_workers=3)
+        # act
+        batch = fetcher.fetch(symbols)
+        # assert
+        self.assertEqual(list(batch.prices.keys()), symbols)
+        self.assertEqual(batch.failed, [])
+        for symbol, prices in batch.prices.items():
+            self.assertEqual(prices.symbol[0], symbol)
+
+    def test_fetch_retries_with_backoff_and_isolates_failures(self):
+        # arrange
+        attempts = {'AMZN': 0}
+
+        def get_prices(symbol):
+            if symbol == 'AAAA':
+                raise OSError('connection reset')
+            attempts[symbol] += 1
+            if attempts[symbol] == 1:
+                raise OSError('timed out')
+            return self.prices
+
+        self.downloader_mock.get_stock_historical_data = MagicMock(
+            side_effect=get_prices)
+        fetcher = Fetcher(self.downloader_mock, retries=2, backoff=1.0,
+                          sleep=self.sleep_mock)
+        # act
+        batch = fetcher.fetch(['AAAA', 'AMZN'])
+        # assert
+        self.assertEqual(list(batch.prices.keys()), ['AMZN'])
+        self.assertEqual(batch.failed, ['AAAA'])
+        self.assertEqual(batch.unknown, [])
+        self.assertEqual(attempts['AMZN'], 2)
+        # AMZN waited once, AAAA waited twice
+        self.assertEqual(self.sleep_mock.call_count, 3)
+        for call in self.sleep_mock.call_args_list:
+            self.assertTrue(0.5 <= call.args[0] <= 3.0)
+
+    def test_fetch_given_unknown_symbol_does_not_retry(self):
+        # arrange
+        self.downloader_mock.get_stock_historical_data = MagicMock(
+            return_value=pd.DataFrame([]))
+        fetcher = Fetcher(self.downloader_mock, sleep=self.sleep_mock)
+        # act
+        batch = fetcher.fetch(['AAAA'])
+        # assert
+        self.assertEqual(batch.failed, ['AAAA'])
+        self.assertEqual(batch.unknown, ['AAAA'])
+        self.downloader_mock.get_stock_historical_data.assert_called_once()
+        self.sleep_mock.assert_not_called()
+
+    def test_fetch_given_slow_symbol_does_not_wait_after_deadline(self):
+        # arrange
+        release = threading.Event()
+
+        def get_prices(symbol):
+            if symbol == 'SLOW':
+                release.wait(5)
+            return self.prices
+
+        self.downloader_mock.get_stock_historical_data = MagicMock(
+            side_effect=get_prices)
+        fetcher = Fetcher(self.downloader_mock, max_workers=2, deadline=0.1)
+        # act
+        batch = fetcher.fetch(['SLOW', 'AMZN'])
+        release.set()
+        # assert
+        self.assertEqual(list(batch.prices.keys()), ['AMZN'])
+        self.assertEqual(batch.failed, ['SLOW'])
@@ -0,0 +1,100 @@
+import unittest
+from unittest.mock import MagicMock
+
+import pandas as pd
+
+from src.common.types import BatchPrices
+from src.download.price_store import PriceStore
+
+
+class PriceStoreTests(unittest.TestCase):
+
+    def setUp(self):
+        self.prices = pd.read_csv(
+            'src/analyst/test_files/AMZN_from_stockbot.csv')
+        self.downloader_mock = MagicMock()
+        self.downloader_mock.get_stock_historical_data = MagicMock(
+            return_value=self.prices)
+        self.fetcher_mock = MagicMock()
+        self.price_store = PriceStore(self.downloader_mock, self.fetcher_mock)
+
+    def test_get_stock_historical_data_first_time_downloads_the_symbol(self):
+        # act
+        prices = self.price_store.get_stock_historical_data('AMZN')
+        # assert
+        self.assertIs(prices, self.prices)
+        self.downloader_mock.get_stock_historical_data.assert_called_once_with(
+            'AMZN')
+        self.assertEqual(self.price_store.fetches, 1)
+        self.assertEqual(self.price_store.hits, 0)
+
+    def test_get_stock_historical_data_twice_downloads_the_symbol_once(self):
+        # act
+        self.price_store.get_stock_historical_data('AMZN')
+        prices = self.price_store.get_stock_historical_data('AMZN')
+        # assert
+        self.assertIs(prices, self.prices)
+        self.downloader_mock.get_stock_historical_data.assert_called_once_with(
+            'AMZN')
+        self.assertEqual(self.price_store.fetches, 1)
+        self.assertEqual(self.price_store.hits, 1)
+
+    def test_prefetch_downloads_missing_symbols_in_one_batch(self):
+        # arrange
+        self.price_store.get_stock_historical_data('AMZN')
+        self.downloader_mock.get_many = MagicMock(
+            return_value=BatchPrices(prices={'GOOGL': self.prices},
+                                     failed=['AAAA']))
+        self.fetcher_mock.fetch = MagicMock(
+            return_value=BatchPrices(prices={}, failed=['AAAA']))
+        # act
+        failed = self.price_store.prefetch(['AMZN', 'GOOGL', 'AAAA', 'GOOGL'])
+        # assert
+        self.assertEqual(failed, ['AAAA'])
+        self.downloader_mock.get_many.assert_called_once_with(['GOOGL', 'AAAA'])
+        self.fetcher_mock.fetch.assert_called_once_with(['AAAA'])
+        self.assertIs(self.price_store.get_stock_historical_data('GOOGL'),
+                      self.prices)
+        self.assertEqual(self.price_store.hits, 1)
+
+    def test_prefetch_retries_symbols_that_failed_in_the_batch(self):
+        # arrange
+        self.downloader_mock.get_many = MagicMock(
+            return_value=BatchPrices(prices={}, failed=['AMZN']))
+        self.fetcher_mock.fetch = MagicMock(
+            return_value=BatchPrices(prices={'AMZN': self.prices}, failed=[]))
+        # act
+        failed = self.price_store.prefetch(['AMZN'])
+        # assert
+        self.assertEqual(failed, [])
+        self.assertIs(self.price_store.get_stock_historical_data('AMZN'),
+                      self.prices)
+
+    def test_prefetch_given_batch_error_retries_all_symbols(self):
+        # arrange
+        self.downloader_mock.get_many = MagicMock(side_effect=OSError('down'))
+        self.fetcher_mock.fetch = MagicMock(
+            return_value=BatchPrices(prices={'AMZN': self.prices},
+                                     failed=['AAAA']))
+        # act
+        failed = self.price_store.prefetch(['AMZN', 'AAAA'])
+        again = self.price_store.prefetch(['AMZN', 'AAAA'])
+        # assert
+        self.assertEqual(failed, ['AAAA'])
+        self.assertEqual(again, [])
+        self.fetcher_mock.fetch.assert_called_once_with(['AMZN', 'AAAA'])
+
+    def test_summary_contains_fetches_hits_and_memory(self):
+        # arrange
+        self.price_store.get_stock_historical_data('AMZN')
+        self.price_store.get_stock_historical_data('AMZN')
+        self.price_store.get_stock_historical_data('GOOGL')
+        # act
+        summary = self.price_store.summary()
+        # assert
+        memory = self.prices.memory_usage(index=True, deep=True).sum()
+        self.assertEqual(self.price_store.get_memory_usage(), 2 * memory)
+        self.assertEqual(summary,
+                         f'price store: 2 fetches, 1 hits, 0 failed, '
+                         f'{2 * memory / 1024:.1f} KiB in 2 symbols '
+                         f'({memory / 1024:.1f} KiB per symbol)')
@@ -0,0 +1,65 @@
+"""
+Execute the monitor in Intraday mode.
+Intraday mode: the bot checks the latest price of every symbol of the
+portfolio at a fixed interval, and alerts the breaches of the anomaly periods
+right away.
+"""
+import time
+from typing import Union
+
+import yfinance as yf
+from telegram import Bot as TelegramBot
+
+from src.bot.bot import Bot
+from src.bot.intraday import IntradayMonitor
+from src.common import env_validator, logs
+from src.download.download import Download
+from src.download.feed import ReplayFeed, YahooFeed
+from src.download.fetcher import Fetcher
+from src.sender.sender import Sender
+
+logger = logs.get_logger(__name__)
+
+
+def intraday() -> None:
+    """Start the bot in intraday mode"""
+    channel_id = env_validator.get_or_throw('CHANNEL_ID')
+    telegram_token = env_validator.get_or_throw('TELEGRAM_BOT_TOKEN')
+    portfolio = env_validator.get_or_throw('SYMBOLS').split(',')
+    interval = float(env_validator.get_or_default('INTRADAY_INTERVAL', '60'))
+    timeout = float(env_validator.get_or_default('FETCH_TIMEOUT', '30'))
+
+    replay_file = env_validator.get_or_default('INTRADAY_REPLAY_FILE', '')
+    feed: Union[ReplayFeed, YahooFeed] = \
+        ReplayFeed.from_csv(replay_file) if replay_file else YahooFeed(yf, timeout)
+
+    lean = env_validator.get_or_default('PRICE_FRAMES', 'full') == 'lean'
+    downloader = Download(yf, timeout=timeout, lean=lean)
+    monitor = IntradayMonitor(Bot(downloader), feed, Fetcher(downloader))
+    sender = Sender(
+        TelegramBot(token=telegram_token),
+        rate=float(env_validator.get_or_default('SEND_RATE', '20')) / 60,
+        capacity=float(env_validator.get_or_default('SEND_BURST', '3')),
+    )
+
+    while not feed.is_finished():
+        started_at = time.monotonic()
+        try:
+            messages = monitor.check(portfolio)
+            for message in messages:
+                logger.info(message)
+            if messages:
+                # the alerts of a tick are sent with as few messages as possible
+                sender.send(channel_id, messages)
+        except Exception as e:
+            # a failed tick does not stop the monitor, the next tick retries
+            logger.error(e)
+
+        elapsed = time.monotonic() - started_at
+        time.sleep(max(interval - elapsed, 0))
+
+    logger.info(f'intraday: {monitor.summary()}')
+
+
+if __name__ == '__main__':
+    intraday()
@@ -1,31 +1,41 @@
 """
 Monitor
+The clients are created the first time the lambda is invoked and then reused
+by the next invocations of the same container.
 """
-import yfinance as yf
-from telegram import Bot as TelegramBot
-import telegram as tl
+import time
 
-from src.bot.bot import Bot
-from src.common import env_validator, logs
-from src.download.download import Download
+_imported_at = time.perf_counter()
 
-logger = logs.get_logger(__name__)
+from functools import lru_cache
+from typing import TYPE_CHECKING, Optional
 
-channel_id = env_validator.get_or_throw('CHANNEL_ID')
-telegram_token = env_validator.get_or_throw('TELEGRAM_BOT_TOKEN')
+from src.common import env_validator, logs
 
-symbols = env_validator.get_or_throw('SYMBOLS')
-portfolio = symbols.split(',')
+if TYPE_CHECKING:
+    from src.alerts.store import AlertStore
+    from src.analyst.detector import AnomalyDetector
+    from src.bot.bot import Bot
+    from src.common.periods import PeriodSpec
+    from src.common.types import Indicator
+    from src.download.fetcher import Fetcher
+    from src.download.price_store import PriceStore
+    from src.sender.sender import Sender
 
-telegram = TelegramBot(token=telegram_token)
-downloader = Download(yf)
-bot = Bot(downloader)
+logger = logs.get_logger(__name__)
+logger.info(f'monitor: imported modules: '
+            f'{time.perf_counter() - _imported_at:.3f}s')
 
 
 def lambda_handler(event, context):
     try:
-        _monitor(portfolio)
-        _report(portfolio)
+        portfolio = _get_portfolio()
+        # every task of this run reads the prices from the same store
+        price_store = _create_price_store()
+        _monitor(portfolio, price_store)
+        _report(portfolio, price_store)
+        _write_snapshot(portfolio, price_store)
+        logger.info(f'lambda_handler: {price_store.summary()}')
         return {"statusCode": 200}
     except Exception as e:
         logger.error(e)
@@ -35,18 +45,156 @@ def lambda_handler(event, context):
 # private functions
 
 
-def _monitor(portfolio: list[str]) -> None:
-    messages = bot.monitor_portfolio(portfolio)
+def _monitor(portfolio: list[str], price_store: 'PriceStore') -> None:
+    cooldown_days = int(env_validator.get_or_default('ALERT_COOLDOWN_DAYS', '7'))
+    detector = _create_detector()
+    alert_store = _get_alert_store()
+    messages, pending_alerts = _get_bot().get_portfolio_alerts(
+        portfolio, price_store, alert_store, cooldown_days,
+        _get_alert_triggers(), detector)
+    if detector is not None:
+        # the next run only processes the sessions after this one
+        detector.save()
+        logger.info(f'_monitor: {detector.summary()}')
     for message in messages:
         logger.info(message)
-        telegram.send_message(channel_id, message)
+    # the alerts are sent with as few messages as possible
+    report = _get_sender().send(env_validator.get_or_throw('CHANNEL_ID'),
+                                messages)
+    # an alert that was not delivered is sent again in the next run
+    if alert_store is not None and report.failed == 0:
+        alert_store.replace(pending_alerts)
 
 
-def _report(portfolio: list[str]) -> None:
-    message = bot.report_portfolio(portfolio)
+def _report(portfolio: list[str], price_store: 'PriceStore') -> None:
+    compact = env_validator.get_or_default('REPORT_LAYOUT', 'text') == 'table'
+    risk = env_validator.get_or_default('REPORT_RISK', 'false') == 'true'
+    message = _get_bot().report_portfolio(portfolio, price_store, compact,
+                                          _get_report_periods(), risk)
     logger.info(f'_report: {message}')
-    telegram.send_message(channel_id, message)
+    # a long report is split in many messages
+    _get_sender().send(env_validator.get_or_throw('CHANNEL_ID'), [message])
+
+
+def _write_snapshot(portfolio: list[str], price_store: 'PriceStore') -> None:
+    # the stats commands of the bot read the snapshot until the next run
+    directory = env_validator.get_or_default('STATS_SNAPSHOT_DIR', '')
+    if not directory:
+        return
+
+    extra_symbols = env_validator.get_or_default('SNAPSHOT_SYMBOLS', '')
+    symbols = list(dict.fromkeys(
+        portfolio + [symbol for symbol in extra_symbols.split(',') if symbol]))
+    _get_bot().write_snapshot(symbols, directory, price_store)
+
+
+def _get_portfolio() -> list[str]:
+    symbols = env_validator.get_or_throw('SYMBOLS')
+    return symbols.split(',')
+
+
+def _create_price_store() -> 'PriceStore':
+    from src.download.price_store import PriceStore
+
+    fetcher = _get_fetcher()
+    return PriceStore(fetcher.downloader, fetcher)
+
+
+def _create_detector() -> Optional['AnomalyDetector']:
+    from src.analyst.detector import AnomalyDetector
+
+    state_file = env_validator.get_or_default('DETECTOR_STATE_FILE', '')
+    return AnomalyDetector(state_file) if state_file else None
+
+
+@lru_cache(maxsize=None)
+def _get_sender() -> 'Sender':
+    with logs.log_duration(logger, '_get_sender: created client'):
+        from telegram import Bot as TelegramBot
+
+        from src.sender.sender import Sender
+
+        telegram_token = env_validator.get_or_throw('TELEGRAM_BOT_TOKEN')
+        return Sender(
+            TelegramBot(token=telegram_token),
+            rate=float(env_validator.get_or_default('SEND_RATE', '20')) / 60,
+            capacity=float(env_validator.get_or_default('SEND_BURST', '3')),
+        )
+
+
+@lru_cache(maxsize=None)
+def _get_fetcher() -> 'Fetcher':
+    with logs.log_duration(logger, '_get_fetcher: created downloader'):
+        import yfinance as yf
+
+        from src.common import periods
+        from src.download.cache import PriceCache
+        from src.download.download import Download
+        from src.download.fetcher import Fetcher
+
+        cache_directory = env_validator.get_or_default('PRICE_CACHE_DIR', '')
+        cache = PriceCache(cache_directory) if cache_directory else None
+        timeout = float(env_validator.get_or_default('FETCH_TIMEOUT', '30'))
+        # the history is long enough for the longest period of the report
+        history_months = periods.get_history_months(_get_report_periods())
+        lean = env_validator.get_or_default('PRICE_FRAMES', 'full') == 'lean'
+        downloader = Download(yf, cache, timeout=timeout,
+                              history_months=history_months, lean=lean)
+        return Fetcher(
+            downloader,
+            max_workers=int(env_validator.get_or_default('FETCH_WORKERS', '8')),
+            retries=int(env_validator.get_or_default('FETCH_RETRIES', '2')),
+            deadline=float(env_validator.get_or_default('FETCH_DEADLINE', '300')),
+        )
+
+
+@lru_cache(maxsize=None)
+def _get_alert_store() -> Optional['AlertStore']:
+    from src.alerts.store import SQLiteAlertStore
+
+    alert_store_file = env_validator.get_or_default('ALERT_STORE_FILE', '')
+    return SQLiteAlertStore(alert_store_file) if alert_store_file else None
+
+
+@lru_cache(maxsize=None)
+def _get_alert_triggers() -> list['Indicator']:
+    """
+    Return the indicators that alert besides the periods, like
+    'bollinger,rsi'.
+    """
+    from src.common.types import Indicator
+
+    names = env_validator.get_or_default('ALERT_INDICATORS', '')
+    return [Indicator(name.strip().lower())
+            for name in names.split(',') if name.strip()]
+
+
+@lru_cache(maxsize=None)
+def _get_report_periods() -> list['PeriodSpec']:
+    """
+    Return the extra periods of the report, like 'ytd,3y,5y'.
+    """
+    from src.common import periods
+
+    return periods.parse_periods(
+        env_validator.get_or_default('REPORT_PERIODS', ''))
+
+
+@lru_cache(maxsize=None)
+def _get_bot() -> 'Bot':
+    with logs.log_duration(logger, '_get_bot: created bot'):
+        from src.analyst import parallel
+        from src.analyst.parallel import ParallelAnalyst
+        from src.bot.bot import Bot
+
+        # the analysis of a large portfolio is split in many processes
+        analyst = ParallelAnalyst(
+            workers=int(env_validator.get_or_default('ANALYST_WORKERS', '1')),
+            min_symbols=int(env_validator.get_or_default(
+                'ANALYST_MIN_SYMBOLS', str(parallel.MIN_PARALLEL_SYMBOLS))),
+        )
+        return Bot(_get_fetcher().downloader, parallel=analyst)
 
 
 if __name__ == '__main__':
-    _monitor(portfolio)
+    _monitor(_get_portfolio(), _create_price_store())
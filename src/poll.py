@@ -11,11 +11,13 @@ from src.common import env_validator
 def poll() -> None:
     """Start the bot in polling mode"""
     telegram_token = env_validator.get_or_throw('TELEGRAM_BOT_TOKEN')
-    updater = Updater(telegram_token)
+    workers = int(env_validator.get_or_default('BOT_WORKERS', '8'))
+    updater = Updater(telegram_token, workers=workers)
 
-    # get the dispatcher to register handlers
+    # get the dispatcher to register handlers,
+    # the stats commands run in the worker pool of the dispatcher
     dispatcher = updater.dispatcher  # type: ignore
-    commands.add_supported_commands(dispatcher)
+    commands.add_supported_commands(dispatcher, run_async=True)
 
     # start the bot
     updater.start_polling()
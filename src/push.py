@@ -1,8 +1,16 @@
 """
 Execute the bot in Push mode.
 Push mode: the bot receives new messages from webhooks sent by Telegram.
+The dispatcher is created once per container, the heavy libraries used to
+answer the stats commands are imported the first time they are needed.
 """
+import time
+
+_imported_at = time.perf_counter()
+
 import json
+import threading
+from typing import Optional
 
 from telegram import Update, Bot as TelegramBot
 from telegram.ext import Dispatcher
@@ -11,19 +19,18 @@ import src.commands as commands
 from src.common import env_validator, logs
 
 logger = logs.get_logger(__name__)
+logger.info(f'push: imported modules: '
+            f'{time.perf_counter() - _imported_at:.3f}s')
 
-telegram_token = env_validator.get_or_throw('TELEGRAM_BOT_TOKEN')
-
-telegram = TelegramBot(token=telegram_token)
-dispatcher = Dispatcher(telegram, None, use_context=True)  # type: ignore
+_dispatcher: Optional[Dispatcher] = None
+_dispatcher_lock = threading.Lock()
 
 
 def lambda_handler(event, context):
     try:
-        commands.add_supported_commands(dispatcher)
-
+        dispatcher = _get_dispatcher()
         dispatcher.process_update(
-            Update.de_json(json.loads(event["body"]), telegram)
+            Update.de_json(json.loads(event["body"]), dispatcher.bot)
         )
 
         return {"statusCode": 200}
@@ -31,3 +38,23 @@ def lambda_handler(event, context):
     except Exception as e:
         logger.error(e)
         return {"statusCode": 500}
+
+
+# private functions
+
+
+def _get_dispatcher() -> Dispatcher:
+    """
+    Return the dispatcher of this container, the commands are registered
+    only when it is created.
+    """
+    global _dispatcher
+    with _dispatcher_lock:
+        if _dispatcher is None:
+            with logs.log_duration(logger, '_get_dispatcher: created dispatcher'):
+                telegram_token = env_validator.get_or_throw('TELEGRAM_BOT_TOKEN')
+                telegram = TelegramBot(token=telegram_token)
+                dispatcher = Dispatcher(telegram, None, use_context=True)  # type: ignore
+                commands.add_supported_commands(dispatcher)
+                _dispatcher = dispatcher
+        return _dispatcher
@@ -0,0 +1,51 @@
+"""
+Execute the replay of the price anomalies.
+Replay mode: the anomaly rules of the monitor are evaluated for every session
+of long local histories, to know how many alerts each period would have sent:
+
+    python -m src.replay histories/ --output anomalies.csv --cooldown-days 7
+"""
+import argparse
+import os
+import sys
+import time
+
+from src.alerts import rules
+from src.analyst import replay
+from src.common import logs
+
+logger = logs.get_logger(__name__)
+
+
+def main(arguments: list[str]) -> int:
+    parser = argparse.ArgumentParser(
+        description='Replay the price anomalies of the monitor.')
+    parser.add_argument('paths', nargs='+',
+                        help='history files (CSV, Parquet or price cache) or '
+                             'directories of them, one file per symbol')
+    parser.add_argument('--output', help='CSV file to write the anomalies')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='processes that replay the symbols')
+    parser.add_argument('--cooldown-days', type=int,
+                        default=rules.COOLDOWN_DAYS,
+                        help='days before the same breach is alerted again')
+    parser.add_argument('--min-history', type=int, default=replay.MIN_HISTORY,
+                        help='sessions needed to replay a session')
+    options = parser.parse_args(arguments)
+
+    started_at = time.perf_counter()
+    files = replay.get_history_files(options.paths)
+    anomalies = replay.replay_files(files, options.workers,
+                                    min_history=options.min_history,
+                                    cooldown_days=options.cooldown_days)
+    logger.info(f'replay: {len(files)} symbols, {len(anomalies)} anomalies: '
+                f'{time.perf_counter() - started_at:.3f}s')
+
+    if options.output:
+        anomalies.to_csv(options.output, index=False)
+    print(replay.summarize(anomalies).to_string())
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,137 @@
+"""
+Delivery of messages to Telegram.
+The messages are packed in as few chunks as possible under the size limit of
+Telegram, each chat is rate limited with a token bucket, and the requests
+rejected with 429 (too many requests) or 5xx are retried.
+"""
+import random
+import time
+from typing import Callable, Hashable, NamedTuple
+
+from telegram.error import (
+    BadRequest, NetworkError, RetryAfter, TelegramError
+)
+
+import src.bot.text_formatter as formatter
+from src.common import logs
+from src.common.constants import MAX_MESSAGE_LENGTH
+from src.common.rate_limit import RateLimiter
+
+logger = logs.get_logger(__name__)
+
+# Telegram allows 20 messages per minute to the same group or channel
+MESSAGES_PER_MINUTE = 20
+BURST = 3
+
+
+class DeliveryReport(NamedTuple):
+    sent: int
+    failed: int
+    retries: int
+    characters: int
+    seconds: float
+
+    def summary(self) -> str:
+        throughput = self.sent / self.seconds if self.seconds > 0 else 0.0
+        return f'sender: {self.sent} sent, {self.failed} failed, ' \
+               f'{self.retries} retries, {self.characters} characters in ' \
+               f'{self.seconds:.2f}s ({throughput:.2f} messages/s)'
+
+
+class Sender:
+    """
+    Sends messages to the chats of a Telegram bot.
+    """
+
+    def __init__(self, client, rate: float = MESSAGES_PER_MINUTE / 60,
+                 capacity: float = BURST, retries: int = 3,
+                 backoff: float = 1.0, max_length: int = MAX_MESSAGE_LENGTH,
+                 clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep) -> None:
+        """
+        :param client: Telegram client (telegram.Bot).
+        :param rate: Messages per second allowed for each chat.
+        :param capacity: Messages that a chat can receive at once.
+        :param retries: Number of retries of a rejected message.
+        :param backoff: Base seconds to wait before retrying a 5xx error, it
+        doubles after each retry. A 429 error waits the seconds given by
+        Telegram instead.
+        :param max_length: Maximum length of each message.
+        :param clock: Function that returns the current time in seconds.
+        :param sleep: Function used to wait.
+        """
+        self.client = client
+        self.rate_limiter = RateLimiter(rate, capacity, clock)
+        self.retries = retries
+        self.backoff = backoff
+        self.max_length = max_length
+        self.clock = clock
+        self.sleep = sleep
+
+    def send(self, chat_id: Hashable, messages: list[str]) -> DeliveryReport:
+        """
+        Send the messages to a chat, packed in as few messages as possible.
+        A message that cannot be delivered does not stop the others.
+        :param chat_id: Identifier of the chat or channel.
+        :param messages: Messages in the order they should be received.
+        :return: A DeliveryReport of the messages sent to Telegram.
+        """
+        started_at = self.clock()
+        sent = failed = retries = characters = 0
+        for chunk in self.pack(messages):
+            delivered, attempts = self._send_chunk(chat_id, chunk)
+            retries += attempts - 1
+            if delivered:
+                sent += 1
+                characters += len(chunk)
+            else:
+                failed += 1
+
+        report = DeliveryReport(sent, failed, retries, characters,
+                                self.clock() - started_at)
+        logger.info(f'send: {report.summary()}')
+        return report
+
+    def pack(self, messages: list[str]) -> list[str]:
+        """
+        Return the messages joined and split in chunks under the size limit.
+        """
+        pieces = [piece for message in messages
+                  for piece in formatter.split_message(message, self.max_length)]
+        return formatter.join_messages(pieces, self.max_length)
+
+    # private methods
+
+    def _send_chunk(self, chat_id: Hashable, chunk: str) -> tuple[bool, int]:
+        """
+        Return True if the chunk was delivered, and the number of attempts.
+        """
+        bucket = self.rate_limiter.get_bucket(chat_id)
+        for attempt in range(self.retries + 1):
+            while not bucket.try_acquire():
+                self.sleep(bucket.get_wait_time())
+
+            try:
+                self.client.send_message(chat_id, chunk)
+                return True, attempt + 1
+            except RetryAfter as e:
+                wait_time = float(e.retry_after)
+            except BadRequest as e:
+                logger.error(f'_send_chunk: message rejected: {e}')
+                return False, attempt + 1
+            except NetworkError as e:  # timeouts and 5xx errors
+                wait_time = self._get_backoff(attempt)
+                logger.error(f'_send_chunk: attempt {attempt + 1} failed: {e}')
+            except TelegramError as e:  # like 403 when the bot was removed
+                logger.error(f'_send_chunk: message not sent: {e}')
+                return False, attempt + 1
+
+            if attempt < self.retries:
+                self.sleep(wait_time)
+
+        logger.error(f'_send_chunk: message not sent after '
+                     f'{self.retries + 1} attempts')
+        return False, self.retries + 1
+
+    def _get_backoff(self, attempt: int) -> float:
+        return self.backoff * 2 ** attempt * random.uniform(0.5, 1.5)
@@ -0,0 +1,171 @@
+import json
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Union
+from urllib.parse import parse_qs
+
+from telegram import Bot as TelegramBot
+
+from src.common.testing import FakeClock
+from src.sender.sender import Sender
+
+TOKEN = '123456:ABCdefGHIjklMNOpqrSTUvwxYZ0123456789'
+
+
+class FakeTelegram:
+    """
+    Local HTTP endpoint of the Telegram Bot API. It answers sendMessage with
+    the given status codes in order, and with 200 once they are used.
+    """
+
+    def __init__(self, statuses: list[int]):
+        self.statuses = list(statuses)
+        self.messages: list[str] = []
+        self.requests = 0
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+
+            def do_POST(self):
+                length = int(self.headers['Content-Length'])
+                body = self.rfile.read(length).decode()
+                fake.requests += 1
+                status = fake.statuses.pop(0) if fake.statuses else 200
+                if status == 200:
+                    fake.messages.append(_get_text(self.headers, body))
+                self._reply(status, _get_response(status))
+
+            def log_message(self, *args):
+                pass  # keep the test output clean
+
+            def _reply(self, status: int, content: dict):
+                data = json.dumps(content).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever,
+                                       daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        address: Union[str, bytes, bytearray] = \
+            self.server.server_address[0]
+        port = self.server.server_address[1]
+        host = address if isinstance(address, str) else address.decode()
+        return f'http://{host}:{port}/bot'
+
+    def __enter__(self) -> 'FakeTelegram':
+        self.thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class SenderTests(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+
+    def test_send_given_many_messages_pack_them_under_the_limit(self):
+        with FakeTelegram([]) as telegram:
+            # arrange
+            sender = self._get_sender(telegram, max_length=25)
+            messages = ['first alert', 'second alert', 'third alert']
+            # act
+            report = sender.send('@channel', messages)
+            # assert
+            self.assertEqual(telegram.messages, [
+                'first alert\n\nsecond alert', 'third alert'
+            ])
+            self.assertEqual((report.sent, report.failed, report.retries),
+                             (2, 0, 0))
+
+    def test_send_given_long_report_split_it_between_paragraphs(self):
+        with FakeTelegram([]) as telegram:
+            # arrange
+            sender = self._get_sender(telegram, max_length=31)
+            report = 'Portfolio report\n\nAMZN price: 1\n\nMSFT price: 2\n'
+            # act
+            sender.send('@channel', [report])
+            # assert
+            self.assertEqual(telegram.messages, [
+                'Portfolio report\n\nAMZN price: 1', 'MSFT price: 2\n'
+            ])
+
+    def test_send_given_too_many_requests_wait_the_given_seconds(self):
+        with FakeTelegram([429, 502]) as telegram:
+            # arrange
+            sender = self._get_sender(telegram, backoff=0)
+            # act
+            report = sender.send('@channel', ['alert'])
+            # assert
+            self.assertEqual(telegram.messages, ['alert'])
+            self.assertEqual(telegram.requests, 3)
+            self.assertEqual(report.retries, 2)
+            self.assertIn(7.0, self.clock.waits)  # retry_after of the 429
+
+    def test_send_given_server_errors_report_failed_message(self):
+        with FakeTelegram([500, 500, 500, 500, 400]) as telegram:
+            # arrange
+            sender = self._get_sender(telegram, backoff=0, max_length=10)
+            # act
+            report = sender.send('@channel', ['not sent', 'rejected', 'sent'])
+            # assert
+            self.assertEqual(telegram.messages, ['sent'])
+            self.assertEqual((report.sent, report.failed, report.retries),
+                             (1, 2, 3))
+
+    def test_send_given_forbidden_chat_report_failed_message(self):
+        with FakeTelegram([403]) as telegram:
+            # arrange
+            sender = self._get_sender(telegram, max_length=10)
+            # act
+            report = sender.send('@channel', ['forbidden', 'sent'])
+            # assert
+            self.assertEqual(telegram.messages, ['sent'])
+            self.assertEqual(telegram.requests, 2)
+            self.assertEqual((report.sent, report.failed, report.retries),
+                             (1, 1, 0))
+
+    def test_send_given_rate_limit_wait_between_messages(self):
+        with FakeTelegram([]) as telegram:
+            # arrange
+            sender = self._get_sender(telegram, rate=0.5, capacity=1,
+                                      max_length=10)
+            # act
+            report = sender.send('@channel', ['first', 'second', 'third'])
+            # assert
+            self.assertEqual(report.sent, 3)
+            self.assertEqual(self.clock.waits, [2.0, 2.0])
+            self.assertEqual(report.seconds, 4.0)
+            self.assertIn('0.75 messages/s', report.summary())
+
+    def _get_sender(self, telegram: FakeTelegram, **kwargs) -> Sender:
+        client = TelegramBot(TOKEN, base_url=telegram.base_url)
+        return Sender(client, clock=self.clock, sleep=self.clock.sleep,
+                      **kwargs)
+
+
+def _get_text(headers, body: str) -> str:
+    if headers['Content-Type'].startswith('application/json'):
+        return json.loads(body)['text']
+    return parse_qs(body)['text'][0]
+
+
+def _get_response(status: int) -> dict:
+    if status == 200:
+        return {'ok': True, 'result': {
+            'message_id': 1, 'date': 0, 'chat': {'id': 1, 'type': 'channel'}
+        }}
+    if status == 429:
+        return {'ok': False, 'error_code': 429,
+                'description': 'Too Many Requests: retry after 7',
+                'parameters': {'retry_after': 7}}
+    return {'ok': False, 'error_code': status, 'description': 'Error'}